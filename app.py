@@ -1,26 +1,37 @@
+from backend.startup_profile import PROFILE
+
 import sys
 import os
-import asyncio
-import threading
-from concurrent.futures import ThreadPoolExecutor
-from PyQt5.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QScrollArea, QFrame, QGroupBox, QLineEdit, QComboBox, QDialog, QCheckBox, QLayout, QTreeWidget, QTreeWidgetItem, QToolBar, QAction, QWidget, QInputDialog  # Ensure QWidget is imported
-from PyQt5.QtCore import Qt, QTimer, QSize, QThread, pyqtSignal, QPropertyAnimation, QPoint, QEasingCurve, QRect, QDateTime
-from PyQt5.QtGui import QIcon, QColor, QPalette, QFont, QPixmap
-import docker
-from fastapi import FastAPI
-from datetime import datetime
-from typing import Optional
-from PyQt5 import QtWidgets
-from PyQt5.QtCore import qDebug
-
-from backend.settings import Settings
-from backend.async_worker import AsyncWorker
-from backend.iso_manager import ISOManager
-from frontend.notification import NotificationManager
+from PyQt5.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QDialog, QToolBar, QAction, QWidget, QInputDialog, QMessageBox
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QIcon
+
+from backend.paths import WORKSPACE_DIR
+from backend.docker_service import DockerService
+from backend.event_stream import ContainerEventStream
+from backend.container_cache import ContainerCache
+from backend.stats_monitor import StatsMonitor
+from backend.operation_queue import OperationQueue
+from backend.bulk_operations import BulkOperation, DEFAULT_CONCURRENCY
+from backend.container_actions import start_container, stop_container, remove_container, commit_container, provision_container, pull_image, prune_snapshots, reap_expired
+from backend.image_puller import ImagePuller, DEFAULT_PREFETCH_CONCURRENCY
+from backend.image_builder import ImageBuilder
+from backend.image_index import ImageIndex
+from backend.warm_pool import WarmPool, is_pool_container
+from backend.presets import preset_images
+from backend.reaper import Reaper
+from backend.async_docker import AsyncDockerClient, is_supported as async_supported
 from frontend.log_panel import LogPanel
-from frontend.container_card import ContainerCard
-from frontend.create_container_dialog import CreateContainerDialog
-from frontend.qflow_layout import QFlowLayout
+from frontend.container_grid import ContainerGrid
+from frontend.event_bridge import ContainerEventBridge
+from frontend.async_bridge import AsyncBridge
+from frontend.notification import NotificationManager
+
+# Docker (docker-py), SQLAlchemy, pydantic (settings), the create dialog and
+# the log viewer are imported where they are first needed, after the window
+# is on screen.
+
+PROFILE.mark("imports")
 
 # Modern style sheet
 STYLE_SHEET = """
@@ -31,23 +42,45 @@ QMainWindow, QDialog {
 """
 
 # Backend setup
-app = FastAPI()
-docker_client = docker.DockerClient(base_url='tcp://localhost:2375')
+docker_service = DockerService.instance()
 
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Docker Container Manager")
         self.workers = []
-        self.client = docker.from_env()
-        self.snapshots = {}  # Initialize snapshots attribute
-        self.workspace_dir = os.path.join(os.path.expanduser("~"), "docker_workspace")
+        self.settings = None  # Loaded by start_services(); services start with their defaults
+        self.bulk_concurrency = DEFAULT_CONCURRENCY
+        self.operations = OperationQueue(max_workers=self.bulk_concurrency, parent=self)
+        self.bulk_operations = []
+        self.docker_service = DockerService.instance()  # Connects on first use, off the GUI thread
+        self.container_cache = ContainerCache(self.docker_service)
+        # Listing, events, the inspects they trigger and stats streams run on
+        # the asyncio client unless the host needs docker-py (named pipe, TLS)
+        self.async_bridge = None
+        if async_supported(self.docker_service.base_url):
+            self.async_bridge = AsyncBridge(lambda: AsyncDockerClient(self.docker_service.base_url), parent=self)
+        self.stats_monitor = StatsMonitor(self.docker_service, runner=self.async_bridge)
+        self.image_index = ImageIndex(self.docker_service)
+        self.image_puller = ImagePuller(self.docker_service, self.image_index)
+        self.image_builder = ImageBuilder(self.docker_service)
+        self.selected_ids = set()
+        self.log_viewers = {}  # container id -> ContainerLogViewer
+        self.edit_mode = False
+        self.workspace_dir = WORKSPACE_DIR
         os.makedirs(self.workspace_dir, exist_ok=True)  # Create workspace directory
+        self.warm_pool = WarmPool(self.docker_service, self.workspace_dir, self.image_index, preset_images())
+        self.reaper = None  # Created on the first pass; needs the snapshot catalog
+        self.notifications = NotificationManager(parent=self)  # Toast widgets are created on first use
         
         # Initialize debug tools
         self.setup_debug()
         
         self.setup_ui()
+        PROFILE.mark("main window built")
+
+        # Everything that talks to Docker starts once the window is showing
+        QTimer.singleShot(0, self.start_services)
         
         # Set minimum window size
         self.setMinimumSize(1200, 800)
@@ -71,8 +104,60 @@ class MainWindow(QMainWindow):
         #toggle_borders.triggered.connect(self.toggle_debug_borders)
         #debug_toolbar.addAction(toggle_borders)
         
+        prefetch = QAction("Prefetch Presets", self)
+        prefetch.triggered.connect(self.prefetch_presets)
+        debug_toolbar.addAction(prefetch)
+        
+        prune = QAction("Prune Snapshots", self)
+        prune.triggered.connect(self.prune_snapshots)
+        debug_toolbar.addAction(prune)
+
+        docker_stats = QAction("Docker Stats", self)
+        docker_stats.triggered.connect(self.log_docker_stats)
+        debug_toolbar.addAction(docker_stats)
+        
         self.debug_borders = False
 
+    def log_docker_stats(self):
+        stats = self.docker_service.stats()
+        self.log_panel.add_log(
+            "Docker Client",
+            f"{stats['calls']} calls, avg {stats['avg_latency_ms']:.1f} ms, "
+            f"max {stats['max_latency_ms']:.1f} ms, errors {stats['errors']}, "
+            f"busiest pool {stats['pool_busiest_in_use']}/{stats['pool_size']} in use "
+            f"(peak in flight {stats['peak_in_flight']})",
+            "Info"
+        )
+        cache = self.container_cache.stats()
+        self.log_panel.add_log(
+            "Container Cache",
+            f"{cache['containers']} containers, {cache['images']} images cached, "
+            f"{cache['hits']} hits / {cache['misses']} misses",
+            "Info"
+        )
+        pool = self.warm_pool.stats()
+        self.log_panel.add_log(
+            "Warm Pool",
+            f"{sum(pool['available'].values())} warm containers, {pool['hits']} hits / {pool['misses']} misses, "
+            f"{pool['refills']} refills (avg lag {pool['avg_refill_lag']:.1f}s, max {pool['max_refill_lag']:.1f}s), "
+            f"{pool['refill_errors']} errors",
+            "Info"
+        )
+        index = self.image_index.stats()
+        self.log_panel.add_log(
+            "Image Index",
+            f"{index['refs']} refs for {index['images']} images, "
+            f"{index['hits']} hits / {index['misses']} misses, {index['refreshes']} refreshes",
+            "Info"
+        )
+        slowest = sorted(stats["per_call"].items(), key=lambda kv: kv[1]["avg_ms"], reverse=True)[:5]
+        for key, call in slowest:
+            self.log_panel.add_log(
+                "Docker Client",
+                f"{key}: {call['count']} calls, avg {call['avg_ms']:.1f} ms, max {call['max_ms']:.1f} ms",
+                "Info"
+            )
+
     def toggle_debug_window(self):
         if self.debug_window.isVisible():
             self.debug_window.hide()
@@ -163,25 +248,38 @@ class MainWindow(QMainWindow):
 
         left_layout.addLayout(header_layout)
         
-        # Container scroll area
-        self.container_scroll = QScrollArea()
-        self.container_scroll.setWidgetResizable(True)
-        self.container_scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
-        self.container_scroll.setStyleSheet("""
-            QScrollArea {
+        # Bulk actions for the selected cards (edit mode only)
+        self.bulk_bar = QWidget()
+        bulk_layout = QHBoxLayout(self.bulk_bar)
+        bulk_layout.setContentsMargins(0, 0, 0, 0)
+        self.selection_label = QLabel("0 selected")
+        bulk_layout.addWidget(self.selection_label)
+        bulk_layout.addStretch()
+        for text, slot in [
+            ("Select All", self.select_all),
+            ("Clear", self.clear_selection),
+            ("Start", self.bulk_start),
+            ("Stop", self.bulk_stop),
+            ("Snapshot", self.bulk_snapshot),
+            ("Remove", self.bulk_remove),
+        ]:
+            button = QPushButton(text)
+            button.clicked.connect(slot)
+            bulk_layout.addWidget(button)
+        self.bulk_bar.setVisible(False)
+        left_layout.addWidget(self.bulk_bar)
+        
+        # Virtualized container grid: only cards in the viewport exist
+        self.container_grid = ContainerGrid(self, spacing=20)  # Increased spacing between cards
+        self.container_grid.setStyleSheet("""
+            QAbstractScrollArea {
                 background-color: #f8f9fa;
                 border: none;
                 border-radius: 15px;
             }
         """)
         
-        # Container widget with flow layout
-        self.container_widget = QWidget()
-        self.container_layout = QFlowLayout(self.container_widget)
-        self.container_layout.setSpacing(20)  # Increased spacing between cards
-        self.container_scroll.setWidget(self.container_widget)
-        
-        left_layout.addWidget(self.container_scroll)
+        left_layout.addWidget(self.container_grid)
         layout.addWidget(left_panel)
         
         # Right panel (Log panel)
@@ -192,23 +290,201 @@ class MainWindow(QMainWindow):
         layout.setStretch(0, 2)  # Container list takes 2/3
         layout.setStretch(1, 1)  # Log panel takes 1/3
         
-        # Initial container refresh
-        self.refresh_containers()
+        # Cards are kept in sync by the Docker events stream; it performs the
+        # initial full listing itself. Until then the grid shows placeholders.
+        self.event_stream = ContainerEventStream(self.docker_service, self.container_cache, self.image_index,
+                                                 runner=self.async_bridge)
+        self.event_bridge = ContainerEventBridge(self.event_stream, self)
+        self.event_bridge.synced.connect(self.sync_cards)
+        self.event_bridge.updated.connect(self.add_or_update_card)
+        self.event_bridge.removed.connect(self.remove_card)
+        self.container_grid.set_loading(True)
+        self.first_sync_done = False
+
+        # Expired boxes are removed in the background; every removal is logged
+        self.reaper_timer = QTimer(self)
+        self.reaper_timer.timeout.connect(self.run_reaper)
+        self.stats_timer = QTimer(self)
+        self.stats_timer.timeout.connect(self.refresh_stats)
+        # Edits to settings.json made while running are re-applied
+        self.settings_timer = QTimer(self)
+        self.settings_timer.timeout.connect(self.check_settings)
+        self.settings_generation = None
+
+    def start_services(self):
+        # Runs on the first event-loop turn after show(). The stream thread
+        # connects to Docker and lists containers; apart from reading the
+        # settings file, nothing here blocks.
+        PROFILE.mark("first event loop turn")
+        from backend.settings import Settings, RELOAD_CHECK_INTERVAL
+        self.settings = Settings.instance()
+        self.apply_settings()
+        PROFILE.mark("settings loaded")
+        self.event_stream.start()
+
+        # Live stats are collected continuously but only pushed to the
+        # visible cards once per stats_refresh_ms
+        self.stats_monitor.start()
+        self.warm_pool.start()
+        self.reaper_timer.start()
+        self.stats_timer.start()
+        self.settings_timer.start(int(RELOAD_CHECK_INTERVAL * 1000))
+
+        # Open the snapshot catalog (and import SQLAlchemy) in the background
+        # so the create dialog does not pay for it
+        self.operations.submit(lambda operation: self.snapshot_catalog.image_ids(), key="warm:snapshots")
+        PROFILE.mark("services started")
+
+    def check_settings(self):
+        if self.settings.poll() != self.settings_generation:
+            self.apply_settings()
+
+    def apply_settings(self):
+        # The Docker pool size only applies before the shared client has
+        # connected, i.e. on the first call; everything else takes effect
+        # immediately
+        self.settings_generation = self.settings.generation
+        preferences = self.settings.values
+        self.docker_service.pool_size = preferences.docker_pool_size
+        self.bulk_concurrency = preferences.bulk_concurrency
+        self.operations.pool.setMaxThreadCount(self.bulk_concurrency)
+        self.container_cache.ttl = preferences.container_cache_ttl
+        self.container_cache.max_entries = preferences.container_cache_max_entries
+        self.warm_pool.resize(preferences.warm_pool_size)
+        self.warm_pool.start()  # No-op while running or at size 0; needed when it grows from 0
+        self.reaper_timer.setInterval(preferences.reaper_interval * 1000)
+        self.stats_timer.setInterval(preferences.stats_refresh_ms)
+
+    @property
+    def snapshot_catalog(self):
+        from backend.snapshot_catalog import SnapshotCatalog
+        return SnapshotCatalog.instance()
 
     def toggle_edit_mode(self, edit_mode):
-        for i in range(self.container_layout.count()):
-            item = self.container_layout.itemAt(i)
-            if item and item.widget():
-                item.widget().set_edit_mode(edit_mode)
+        self.edit_mode = edit_mode
+        self.bulk_bar.setVisible(edit_mode)
+        for card in self.container_grid.visible_cards():
+            card.set_edit_mode(edit_mode)
+
+    def set_selected(self, container_id, selected):
+        if selected:
+            self.selected_ids.add(container_id)
+        else:
+            self.selected_ids.discard(container_id)
+        self.selection_label.setText(f"{len(self.selected_ids)} selected")
+
+    def select_all(self):
+        self.selected_ids = set(self.container_grid.containers)
+        self.selection_changed()
+
+    def clear_selection(self):
+        self.selected_ids = set()
+        self.selection_changed()
+
+    def selection_changed(self):
+        self.selection_label.setText(f"{len(self.selected_ids)} selected")
+        self.container_grid.rebind_visible()
+
+    def selected_containers(self):
+        containers = self.container_grid.containers
+        return [containers[i] for i in self.selected_ids if i in containers]
+
+    def bulk_start(self):
+        self.run_bulk_operation("Bulk Start", start_container)
+
+    def bulk_stop(self):
+        self.run_bulk_operation("Bulk Stop", stop_container)
+
+    def bulk_remove(self):
+        count = len(self.selected_ids)
+        if not count:
+            return
+        reply = QMessageBox.question(
+            self, "Remove Containers", f"Remove {count} selected containers?",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if reply == QMessageBox.Yes:
+            self.run_bulk_operation("Bulk Remove", remove_container)
+
+    def bulk_snapshot(self):
+        if not self.selected_ids:
+            return
+        prefix, ok = QInputDialog.getText(self, 'Bulk Snapshot', 'Enter image name prefix:')
+        if ok and prefix:
+            self.run_bulk_operation(
+                "Bulk Snapshot",
+                commit_container,
+                extra_args=lambda container: (f"{prefix}-{container.name.lower()}",),
+                on_result=self.bulk_snapshot_created
+            )
+
+    def bulk_snapshot_created(self, label, result):
+        _, image_name, snapshot = result
+        self.log_panel.add_log("Bulk Snapshot", f"{label}: {image_name} ({snapshot.short_id})", "Success")
+
+    def run_bulk_operation(self, title, func, extra_args=None, on_result=None, containers=None):
+        if containers is None:
+            containers = self.selected_containers()
+        if not containers:
+            self.log_panel.add_log(title, "No containers selected", "Warning")
+            return
+        items = [
+            (c.id, c.name, (c.id,) + (extra_args(c) if extra_args else ()))
+            for c in containers
+        ]
+
+        bulk = BulkOperation(self.operations, title, func, items, self.bulk_concurrency, self)
+        if on_result is not None:
+            bulk.item_succeeded.connect(on_result)
+        bulk.item_failed.connect(
+            lambda label, error: self.log_panel.add_log(title, f"{label}: {error}", "Error")
+        )
+        # Failures coalesce into one toast per operation, with a counter
+        bulk.item_failed.connect(
+            lambda label, error: self.notifications.show_notification(f"{title} failed", f"{label}: {error}", "error")
+        )
+        bulk.progress.connect(self.bulk_operation_progress)
+        bulk.finished.connect(
+            lambda succeeded, failed, elapsed: self.bulk_operation_finished(bulk, succeeded, failed, elapsed)
+        )
+        self.bulk_operations.append(bulk)
+        self.log_panel.add_log(
+            title,
+            f"Running on {len(items)} containers ({self.bulk_concurrency} at a time)",
+            "In Progress"
+        )
+        bulk.start()
+
+    def bulk_operation_progress(self, done, total, failed):
+        # Aggregate progress in ~10% steps instead of one line per item
+        step = max(1, total // 10)
+        if done % step == 0 and done < total:
+            self.log_panel.add_log(
+                self.sender().title,
+                f"{done}/{total} done ({failed} failed)",
+                "In Progress"
+            )
+
+    def bulk_operation_finished(self, bulk, succeeded, failed, elapsed):
+        if bulk in self.bulk_operations:
+            self.bulk_operations.remove(bulk)
+        self.log_panel.add_log(
+            bulk.title,
+            f"{succeeded}/{bulk.total} succeeded, {failed} failed in {elapsed:.1f}s",
+            "Success" if not failed else "Warning"
+        )
+        bulk.deleteLater()
 
     def create_container(self):
         try:
             print("Opening create container dialog...")
+            from frontend.create_container_dialog import CreateContainerDialog
             dialog = CreateContainerDialog(self)
             dialog.setMinimumWidth(500)  # Set minimum dialog width
             
             if dialog.exec_() == QDialog.Accepted:
                 name, image_or_dockerfile, dockerfile_content, is_dockerfile = dialog.get_container_info()
+                ttl, idle_timeout = dialog.get_expiry()
                 print(f"Creating container with name: {name}, image_or_dockerfile: {image_or_dockerfile}, is_dockerfile: {is_dockerfile}")
                 
                 self.log_panel.add_log(
@@ -217,67 +493,32 @@ class MainWindow(QMainWindow):
                     "In Progress"
                 )
                 
-                try:
-                    if is_dockerfile:
-                        if dockerfile_content:
-                            # Save Dockerfile content to a temporary file
-                            dockerfile_path = os.path.join(self.workspace_dir, "Dockerfile")
-                            with open(dockerfile_path, 'w') as file:
-                                file.write(dockerfile_content)
-                            image_or_dockerfile = dockerfile_path
-                        
-                        # Build the image from Dockerfile
-                        image, _ = self.client.images.build(path=os.path.dirname(image_or_dockerfile), dockerfile=image_or_dockerfile)
-                    else:
-                        # Pull the image if it's not a snapshot
-                        if image_or_dockerfile not in self.snapshots:
-                            print(f"Pulling image: {image_or_dockerfile}")
-                            self.client.images.pull(image_or_dockerfile)
-                        image = image_or_dockerfile
-                    
-                    # Generate container name if not provided
-                    if not name:
-                        base_name = image.split(':')[0].split('/')[-1]
-                        existing_names = [c.name for c in self.client.containers.list(all=True)]
-                        index = 1
-                        while f"{base_name}{index}" in existing_names:
-                            index += 1
-                        name = f"{base_name}{index}"
-                    
-                    print(f"Creating container with name: {name}")
-                    
-                    # Create the container
-                    container = self.client.containers.create(
-                        image=image,
-                        name=name,
-                        tty=True,
-                        stdin_open=True,
-                        detach=True,
-                        volumes={os.path.join(self.workspace_dir, name): {'bind': '/workspace', 'mode': 'rw'}}
-                    )
-                    
-                    print(f"Container created successfully: {container.id}")
-                    
-                    # Create workspace directory for the container
-                    container_workspace = os.path.join(self.workspace_dir, name)
-                    os.makedirs(container_workspace, exist_ok=True)
-                    
-                    self.log_panel.add_log(
-                        "Container Creation",
-                        f"Created container: {name}",
-                        "Success"
-                    )
-                    
-                    self.refresh_containers()
-                    
-                except Exception as e:
-                    error_msg = f"Error creating container: {str(e)}"
-                    print(error_msg)
-                    self.log_panel.add_log(
-                        "Container Creation",
-                        error_msg,
-                        "Error"
-                    )
+                # Pull/build and create on the operation queue; the card
+                # itself appears through the events stream
+                operation = self.operations.create(
+                    provision_container,
+                    self.image_puller,
+                    self.image_builder,
+                    name,
+                    image_or_dockerfile,
+                    dockerfile_content,
+                    is_dockerfile,
+                    self.workspace_dir,
+                    self.snapshot_catalog.image_ids(),
+                    refresh=dialog.refresh_check.isChecked(),
+                    pool=self.warm_pool,
+                    ttl=ttl,
+                    idle_timeout=idle_timeout,
+                    key=f"create:{name}" if name else None
+                )
+                operation.signals.progress.connect(
+                    lambda percent, message: self.log_panel.add_log("Container Creation", message, "In Progress")
+                )
+                operation.signals.finished.connect(
+                    lambda created: self.log_panel.add_log("Container Creation", f"Created container: {created}", "Success")
+                )
+                operation.signals.error.connect(self.container_creation_failed)
+                self.operations.start(operation)
                     
         except Exception as e:
             error_msg = f"Error in create_container: {str(e)}"
@@ -288,22 +529,134 @@ class MainWindow(QMainWindow):
                 "Error"
             )
 
+    def container_creation_failed(self, error):
+        error_msg = f"Error creating container: {error}"
+        print(error_msg)
+        self.log_panel.add_log(
+            "Container Creation",
+            error_msg,
+            "Error"
+        )
+        self.notifications.show_notification("Container Creation", error_msg, "error")
+
+    def prefetch_presets(self):
+        # Pull every preset image in the background, a few at a time, so
+        # that creating from a preset only has to create the container.
+        # Images the index already knows are skipped.
+        refs = [ref for ref in preset_images() if self.image_index.resolve(ref) is None]
+        if not refs:
+            self.log_panel.add_log("Prefetch", "All preset images are already present", "Success")
+            return
+        bulk = BulkOperation(
+            self.operations,
+            "Prefetch",
+            pull_image,
+            [(f"pull:{ref}", ref, (self.image_puller, ref)) for ref in refs],
+            DEFAULT_PREFETCH_CONCURRENCY,
+            self
+        )
+        bulk.item_failed.connect(
+            lambda label, error: self.log_panel.add_log("Prefetch", f"{label}: {error}", "Error")
+        )
+        bulk.item_succeeded.connect(
+            lambda label, _: self.log_panel.add_log("Prefetch", f"Pulled {label}", "Success")
+        )
+        bulk.finished.connect(
+            lambda succeeded, failed, elapsed: self.bulk_operation_finished(bulk, succeeded, failed, elapsed)
+        )
+        self.bulk_operations.append(bulk)
+        self.log_panel.add_log(
+            "Prefetch",
+            f"Prefetching {len(refs)} preset images ({DEFAULT_PREFETCH_CONCURRENCY} at a time)",
+            "In Progress"
+        )
+        bulk.start()
+
+    def run_reaper(self):
+        if self.operations.is_busy("reaper"):
+            return
+        if self.reaper is None:
+            self.reaper = Reaper(self.docker_service, self.workspace_dir, self.snapshot_catalog)
+        operation = self.operations.create(reap_expired, self.reaper, key="reaper")
+        operation.signals.progress.connect(
+            lambda percent, message: self.log_panel.add_log("Reaper", message, "Info")
+        )
+        operation.signals.finished.connect(self.reaper_finished)
+        operation.signals.error.connect(
+            lambda error: self.log_panel.add_log("Reaper", f"Reaper pass failed: {error}", "Error")
+        )
+        self.operations.start(operation)
+
+    def reaper_finished(self, summary):
+        if summary["containers"] or summary["images"] or summary["errors"]:
+            self.log_panel.add_log(
+                "Reaper",
+                f"Removed {summary['containers']} expired containers, {summary['workspaces']} workspaces "
+                f"and {summary['images']} dangling snapshot images ({summary['errors']} errors)",
+                "Success" if not summary["errors"] else "Warning"
+            )
+
+    def prune_snapshots(self):
+        from backend.snapshot_catalog import DEFAULT_KEEP_LAST, DEFAULT_MAX_AGE_DAYS
+        operation = self.operations.create(
+            prune_snapshots,
+            DEFAULT_KEEP_LAST,
+            DEFAULT_MAX_AGE_DAYS,
+            key="snapshots:prune"
+        )
+        operation.signals.progress.connect(
+            lambda percent, message: self.log_panel.add_log("Prune Snapshots", message, "In Progress")
+        )
+        operation.signals.finished.connect(
+            lambda result: self.log_panel.add_log(
+                "Prune Snapshots",
+                f"Removed {len(result[0])} snapshot images, forgot {len(result[1])} already gone",
+                "Success"
+            )
+        )
+        operation.signals.error.connect(
+            lambda error: self.log_panel.add_log("Prune Snapshots", error, "Error")
+        )
+        self.operations.start(operation)
+
+    def open_log_viewer(self, container):
+        viewer = self.log_viewers.get(container.id)
+        if viewer is None:
+            from frontend.container_log_viewer import ContainerLogViewer
+            viewer = ContainerLogViewer(container, self.docker_service, parent=self)
+            viewer.destroyed.connect(lambda _=None, cid=container.id: self.log_viewers.pop(cid, None))
+            self.log_viewers[container.id] = viewer
+        viewer.show()
+        viewer.raise_()
+        viewer.activateWindow()
+
     def refresh_containers(self):
-        try:
-            print("Refreshing container list...")
-            # Clear existing containers from layout
-            while self.container_layout.count():
-                child = self.container_layout.takeAt(0)
-                if child.widget():
-                    child.widget().deleteLater()
-
-            # Add containers to grid
-            containers = self.client.containers.list(all=True)
-            for container in containers:
-                print(f"Adding container to grid: {container.name} ({container.id})")
-                card = ContainerCard(container, self)
-                self.container_layout.addWidget(card)
+        # Full relisting is only needed on demand; normal updates arrive
+        # through the events stream
+        self.event_stream.resync()
 
+    def refresh_stats(self):
+        updates = self.stats_monitor.take_updates()
+        if not updates:
+            return
+        for card in self.container_grid.visible_cards():
+            series = updates.get(card.container.id)
+            if series is not None:
+                card.update_stats(series)
+
+    def sync_cards(self, containers):
+        try:
+            if not self.first_sync_done:
+                PROFILE.mark("containers listed")
+            containers = [c for c in containers if not is_pool_container(c)]
+            self.container_grid.set_loading(False)
+            self.selected_ids &= {container.id for container in containers}
+            self.selection_label.setText(f"{len(self.selected_ids)} selected")
+            self.container_grid.set_containers(containers)
+            self.stats_monitor.sync(c.id for c in containers if c.status == "running")
+            if not self.first_sync_done:
+                self.first_sync_done = True
+                QTimer.singleShot(0, self.first_cards_rendered)
         except Exception as e:
             error_msg = f"Error refreshing containers: {str(e)}"
             print(error_msg)
@@ -313,10 +666,44 @@ class MainWindow(QMainWindow):
                 "Error"
             )
 
+    def first_cards_rendered(self):
+        PROFILE.mark("cards rendered")
+        PROFILE.report()
+
+    def add_or_update_card(self, container):
+        if is_pool_container(container):
+            return
+        self.container_grid.add_or_update(container)
+        if container.status == "running":
+            self.stats_monitor.watch(container.id)
+        else:
+            self.stats_monitor.unwatch(container.id)
+
+    def remove_card(self, container_id):
+        if container_id in self.selected_ids:
+            self.set_selected(container_id, False)
+        self.container_grid.remove(container_id)
+        self.stats_monitor.unwatch(container_id)
+
     def closeEvent(self, event):
         # Clean up workers when closing
         for worker in self.workers:
             worker.quit()
+        for bulk in list(self.bulk_operations):  # cancel() may remove it via finished
+            bulk.cancel()
+        for viewer in list(self.log_viewers.values()):
+            viewer.close()
+        self.event_stream.stop()
+        self.stats_monitor.stop()
+        if self.async_bridge is not None:
+            self.async_bridge.stop()
+        self.warm_pool.stop()
+        self.operations.shutdown()
+        self.notifications.clear()
+        self.docker_service.close()
+        if self.settings is not None:
+            self.settings.flush()
+        PROFILE.report()  # In case Docker never answered
         super().closeEvent(event)
 
 def run_app():
@@ -327,9 +714,11 @@ def run_app():
     
     # Set fusion style for better debugging
     app.setStyle("Fusion")
+    PROFILE.mark("QApplication created")
     
     window = MainWindow()
     window.show()
+    PROFILE.mark("window shown")
     
     sys.exit(app.exec_())
 
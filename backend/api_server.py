@@ -0,0 +1,319 @@
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import List, Optional, Union
+
+import docker
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+from backend.container_actions import (
+    commit_container, provision_container, remove_container, start_container, stop_container
+)
+from backend.container_cache import ContainerCache, image_id_of
+from backend.docker_service import DockerService
+from backend.event_stream import ContainerEventStream
+from backend.image_builder import ImageBuilder
+from backend.image_index import ImageIndex
+from backend.image_puller import ImagePuller
+from backend.operation_context import OperationContext
+from backend.paths import WORKSPACE_DIR
+from backend.presets import preset_images
+from backend.snapshot_catalog import SnapshotCatalog
+from backend.warm_pool import WarmPool, is_pool_container
+
+# Headless control plane over the same backend services as the GUI:
+#
+#     uvicorn backend.api_server:app
+#     python -m backend.api_server --port 8000
+#
+# Nothing here imports PyQt5.
+
+API_WORKERS = int(os.environ.get("DISPOSABLEBOX_API_WORKERS", "16"))
+MAX_PAGE_SIZE = 500
+EVENT_QUEUE_SIZE = 1000  # Per SSE client; a slower client drops events
+KEEPALIVE_SECONDS = 15
+
+
+class CreateRequest(BaseModel):
+    image: Optional[str] = None
+    dockerfile: Optional[str] = None  # Dockerfile content, built instead of pulling image
+    name: Optional[str] = None
+    ttl: Optional[int] = None
+    idle_timeout: Optional[int] = None
+    refresh: bool = False
+
+
+class SnapshotRequest(BaseModel):
+    image_name: str
+
+
+class ExecRequest(BaseModel):
+    cmd: Union[str, List[str]]
+    workdir: Optional[str] = None
+    user: str = ""
+
+
+def container_json(container):
+    return {
+        "id": container.id,
+        "name": container.name,
+        "status": container.status,
+        # Inspect results keep the ref in Config.Image, list rows in Image
+        "image": (container.attrs.get("Config") or {}).get("Image") or container.attrs.get("Image"),
+        "image_id": image_id_of(container),
+        "labels": container.labels or {}
+    }
+
+
+class EventHub:
+    # Fans Docker events from the event stream thread out to SSE clients
+    def __init__(self, loop):
+        self.loop = loop
+        self.queues = set()
+        self.dropped = 0
+
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=EVENT_QUEUE_SIZE)
+        self.queues.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self.queues.discard(queue)
+
+    def publish(self, event):
+        # Called on the event stream thread
+        self.loop.call_soon_threadsafe(self._fan_out, event)
+
+    def _fan_out(self, event):
+        for queue in self.queues:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.dropped += 1
+
+
+class ApiServices:
+    def __init__(self, loop):
+        self.docker_service = DockerService.instance()
+        self.executor = ThreadPoolExecutor(max_workers=API_WORKERS, thread_name_prefix="api")
+        self.pending = set()  # Submitted executor futures, cancelled on stop()
+        self.container_cache = ContainerCache(self.docker_service)
+        self.image_index = ImageIndex(self.docker_service)
+        self.image_puller = ImagePuller(self.docker_service, self.image_index)
+        self.image_builder = ImageBuilder(self.docker_service)
+        self.snapshot_catalog = SnapshotCatalog.instance()
+        self.warm_pool = WarmPool(self.docker_service, WORKSPACE_DIR, self.image_index, preset_images())
+        self.event_stream = ContainerEventStream(self.docker_service, self.container_cache, self.image_index)
+        self.events = EventHub(loop)
+        self.event_stream.subscribe(on_event=self.events.publish)
+
+    def start(self):
+        os.makedirs(WORKSPACE_DIR, exist_ok=True)
+        self.event_stream.start()
+        self.warm_pool.start()
+
+    def stop(self):
+        self.warm_pool.stop()
+        self.event_stream.stop()
+        # shutdown(cancel_futures=True) needs Python 3.9; cancel by hand
+        for future in list(self.pending):
+            future.cancel()
+        self.executor.shutdown(wait=False)
+        self.docker_service.close()
+
+    async def run(self, func, *args, **kwargs):
+        # Blocking docker-py calls run on the bounded pool, never on the loop
+        future = self.executor.submit(lambda: func(*args, **kwargs))
+        self.pending.add(future)
+        future.add_done_callback(self.pending.discard)
+        return await asyncio.wrap_future(future)
+
+    async def action(self, func, *args, **kwargs):
+        return await self.run(func, OperationContext(), *args, **kwargs)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    services = ApiServices(asyncio.get_running_loop())
+    services.start()
+    app.state.services = services
+    try:
+        yield
+    finally:
+        services.stop()
+
+
+app = FastAPI(title="DisposableBox", lifespan=lifespan)
+
+
+@app.exception_handler(docker.errors.NotFound)
+async def not_found(request, exc):
+    return JSONResponse(status_code=404, content={"detail": exc.explanation or str(exc)})
+
+
+@app.exception_handler(docker.errors.APIError)
+async def docker_error(request, exc):
+    return JSONResponse(status_code=exc.status_code or 500, content={"detail": exc.explanation or str(exc)})
+
+
+@app.get("/containers")
+async def list_containers(request: Request, offset: int = Query(0, ge=0),
+                          limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE), status: Optional[str] = None):
+    services = request.app.state.services
+    containers = await services.run(services.container_cache.list_containers)
+    containers = [c for c in containers if not is_pool_container(c)]
+    if status:
+        containers = [c for c in containers if c.status == status]
+    containers.sort(key=lambda c: c.name)
+    return {
+        "total": len(containers),
+        "offset": offset,
+        "limit": limit,
+        "items": [container_json(c) for c in containers[offset:offset + limit]]
+    }
+
+
+@app.get("/containers/{container_id}")
+async def get_container(request: Request, container_id: str):
+    services = request.app.state.services
+    return container_json(await services.run(services.container_cache.get_container, container_id))
+
+
+@app.post("/containers", status_code=201)
+async def create_container(request: Request, body: CreateRequest):
+    if not body.image and not body.dockerfile:
+        raise HTTPException(status_code=422, detail="Either image or dockerfile is required")
+    services = request.app.state.services
+    is_dockerfile = bool(body.dockerfile)
+    snapshot_ids = await services.run(services.snapshot_catalog.image_ids)
+    name = await services.action(
+        provision_container,
+        services.image_puller,
+        services.image_builder,
+        body.name,
+        None if is_dockerfile else body.image,
+        body.dockerfile,
+        is_dockerfile,
+        WORKSPACE_DIR,
+        snapshot_ids,
+        refresh=body.refresh,
+        pool=services.warm_pool,
+        ttl=body.ttl,
+        idle_timeout=body.idle_timeout
+    )
+    container = await services.run(services.container_cache.get_container, name, 0)
+    return container_json(container)
+
+
+@app.post("/containers/{container_id}/start")
+async def start(request: Request, container_id: str):
+    services = request.app.state.services
+    return {"name": await services.action(start_container, container_id), "status": "running"}
+
+
+@app.post("/containers/{container_id}/stop")
+async def stop(request: Request, container_id: str):
+    services = request.app.state.services
+    return {"name": await services.action(stop_container, container_id), "status": "exited"}
+
+
+@app.delete("/containers/{container_id}")
+async def remove(request: Request, container_id: str):
+    services = request.app.state.services
+    name = await services.action(remove_container, container_id)
+    services.container_cache.invalidate(container_id)
+    return {"name": name, "removed": True}
+
+
+@app.post("/containers/{container_id}/snapshot", status_code=201)
+async def snapshot(request: Request, container_id: str, body: SnapshotRequest):
+    services = request.app.state.services
+    name, image_name, record = await services.action(commit_container, container_id, body.image_name)
+    return {
+        "container": name,
+        "image_name": image_name,
+        "image_id": record.image_id,
+        "size": record.size,
+        "layer_size": record.layer_size
+    }
+
+
+@app.post("/containers/{container_id}/exec")
+async def exec_command(request: Request, container_id: str, body: ExecRequest):
+    services = request.app.state.services
+
+    def run_exec():
+        container = services.docker_service.client.containers.get(container_id)
+        if container.status != "running":
+            raise HTTPException(status_code=409, detail=f"Container {container.name} is not running")
+        return container.exec_run(body.cmd, workdir=body.workdir, user=body.user)
+
+    result = await services.run(run_exec)
+    return {"exit_code": result.exit_code, "output": result.output.decode(errors="replace")}
+
+
+@app.get("/snapshots")
+async def list_snapshots(request: Request, container: Optional[str] = None):
+    services = request.app.state.services
+    snapshots = await services.run(services.snapshot_catalog.list, container)
+    return [
+        {
+            "image_id": s.image_id,
+            "image_name": s.image_name,
+            "container": s.container_name,
+            "parent_id": s.parent_id,
+            "size": s.size,
+            "layer_size": s.layer_size,
+            "created_at": s.created_at
+        }
+        for s in snapshots
+    ]
+
+
+@app.get("/events")
+async def events(request: Request):
+    # Server-sent events: one "data:" line of Docker event JSON per event
+    hub = request.app.state.services.events
+    queue = hub.subscribe()
+
+    async def stream():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {event.get('Type', 'message')}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            hub.unsubscribe(queue)
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+
+@app.get("/stats")
+async def stats(request: Request):
+    services = request.app.state.services
+    return {
+        "docker": services.docker_service.stats(),
+        "cache": services.container_cache.stats(),
+        "image_index": services.image_index.stats(),
+        "warm_pool": services.warm_pool.stats(),
+        "events": {"subscribers": len(services.events.queues), "dropped": services.events.dropped}
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="DisposableBox headless API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port)
@@ -0,0 +1,392 @@
+import asyncio
+import json
+import os
+import struct
+from contextlib import asynccontextmanager
+from urllib.parse import quote, urlencode, urlsplit
+
+# Same default as docker-py; the named pipe is not supported here
+DEFAULT_HOST = "npipe:////./pipe/docker_engine" if os.name == "nt" else "unix:///var/run/docker.sock"
+DEFAULT_MAX_CONNECTIONS = 32
+DEFAULT_TIMEOUT = 60
+DEFAULT_PIPELINE_DEPTH = 16  # Requests written back-to-back on one connection
+STREAM_LIMIT = 2 ** 20  # Longest header or JSON line a reader will buffer
+
+_FRAME_HEADER = struct.Struct(">BxxxL")  # stream type, payload size
+STDOUT = 1
+STDERR = 2
+
+
+class DockerAPIError(Exception):
+    def __init__(self, status_code, method, path, explanation):
+        super().__init__(f"{status_code} {method} {path}: {explanation}")
+        self.status_code = status_code
+        self.explanation = explanation
+
+
+class NotFound(DockerAPIError):
+    pass
+
+
+def parse_host(base_url=None):
+    # unix:///path, tcp://host:port or http://host:port; TLS and named pipe
+    # hosts stay on docker-py
+    url = base_url or os.environ.get("DOCKER_HOST") or DEFAULT_HOST
+    parts = urlsplit(url)
+    if parts.scheme in ("unix", "http+unix"):
+        return "unix", parts.path, None
+    if parts.scheme in ("tcp", "http") and not (base_url is None and os.environ.get("DOCKER_TLS_VERIFY")):
+        return "tcp", parts.hostname or "localhost", parts.port or 2375
+    raise ValueError(f"Unsupported Docker host for the async client: {url}")
+
+
+def is_supported(base_url=None):
+    # False means callers keep using docker-py for this host
+    try:
+        parse_host(base_url)
+    except ValueError:
+        return False
+    return True
+
+
+class Response:
+    __slots__ = ("status", "headers", "body")
+
+    def __init__(self, status, headers, body=b""):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body) if self.body else None
+
+
+class _Connection:
+    # One HTTP/1.1 connection. Responses are read strictly in request order,
+    # which is all pipelining needs.
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.reusable = True
+
+    def alive(self):
+        return self.reusable and not self.reader.at_eof() and not self.writer.is_closing()
+
+    def close(self):
+        self.reusable = False
+        self.writer.close()
+
+    async def read_head(self):
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError("Docker closed the connection")
+        status = int(line.split(None, 2)[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+        if headers.get("connection", "").lower() == "close":
+            self.reusable = False
+        return status, headers
+
+    async def iter_body(self, method, status, headers):
+        if method == "HEAD" or status in (204, 304) or status < 200:
+            return
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                size = int((await self.reader.readline()).split(b";", 1)[0].strip() or b"0", 16)
+                if size == 0:
+                    while (await self.reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass  # Trailers
+                    return
+                data = await self.reader.readexactly(size)
+                await self.reader.readexactly(2)
+                yield data
+        elif "content-length" in headers:
+            length = int(headers["content-length"])
+            if length:
+                yield await self.reader.readexactly(length)
+        else:
+            # Delimited by EOF, so the connection cannot be reused
+            self.reusable = False
+            while True:
+                data = await self.reader.read(65536)
+                if not data:
+                    return
+                yield data
+
+    async def read_response(self, method):
+        status, headers = await self.read_head()
+        body = b"".join([chunk async for chunk in self.iter_body(method, status, headers)])
+        return Response(status, headers, body)
+
+
+# asyncio-native client for the Docker Engine API calls that are made in
+# bulk: list, inspect, start, stop, remove, events, stats and logs. Plain
+# requests share a bounded pool of keep-alive connections, so hundreds of
+# them can be in flight from one thread; inspect_many() additionally
+# pipelines batches of GETs on each connection. Streams (events, stats,
+# logs) get a dedicated connection each, outside the pool, for the same
+# reason StatsMonitor uses its own docker-py client. Everything else (and
+# TLS daemons) stays on DockerService.
+class AsyncDockerClient:
+    def __init__(self, base_url=None, version=None, max_connections=DEFAULT_MAX_CONNECTIONS,
+                 timeout=DEFAULT_TIMEOUT):
+        self.kind, self.address, self.port = parse_host(base_url)
+        self.version = version  # None: ask the daemon on first use, like docker-py
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._idle = []  # Keep-alive connections, most recently used last
+        self._slots = None
+        self._version_task = None
+        self._closed = False
+        self.request_count = 0
+        self.pipelined_count = 0
+        self.connections_opened = 0
+        self.reused_count = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        self._closed = True
+        idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+    async def _open(self):
+        if self.kind == "unix":
+            reader, writer = await asyncio.open_unix_connection(self.address, limit=STREAM_LIMIT)
+        else:
+            reader, writer = await asyncio.open_connection(self.address, self.port, limit=STREAM_LIMIT)
+        self.connections_opened += 1
+        return _Connection(reader, writer)
+
+    async def _acquire(self):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_connections)
+        await self._slots.acquire()
+        while self._idle:
+            connection = self._idle.pop()
+            if connection.alive():
+                self.reused_count += 1
+                return connection, True
+            connection.close()
+        try:
+            return await self._open(), False
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _release(self, connection, reuse):
+        if reuse and connection.alive() and not self._closed:
+            self._idle.append(connection)
+        else:
+            connection.close()
+        self._slots.release()
+
+    async def _negotiate(self):
+        connection = await self._open()
+        try:
+            connection.writer.write(self._encode("GET", "/version"))
+            response = await asyncio.wait_for(connection.read_response("GET"), self.timeout)
+        finally:
+            connection.close()
+        self._check("GET", "/version", response)
+        return response.json()["ApiVersion"]
+
+    async def _versioned(self, path):
+        if self.version is None:
+            if self._version_task is None:
+                self._version_task = asyncio.ensure_future(self._negotiate())
+            try:
+                self.version = await self._version_task
+            except Exception:
+                self._version_task = None
+                raise
+        return f"/v{self.version}{path}"
+
+    def _encode(self, method, path, params=None, body=None):
+        if params:
+            query = {}
+            for key, value in params.items():
+                if value is None:
+                    continue
+                if isinstance(value, bool):
+                    value = int(value)
+                elif isinstance(value, dict):
+                    value = json.dumps(value)
+                query[key] = value
+            if query:
+                path = f"{path}?{urlencode(query)}"
+        host = "docker" if self.kind == "unix" else f"{self.address}:{self.port}"
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {host}", "User-Agent: disposablebox"]
+        data = b""
+        if body is not None:
+            data = json.dumps(body).encode("utf-8")
+            lines.append("Content-Type: application/json")
+        if body is not None or method in ("POST", "PUT"):
+            lines.append(f"Content-Length: {len(data)}")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + data
+
+    @staticmethod
+    def _check(method, path, response):
+        if response.status < 400:
+            return response
+        try:
+            explanation = json.loads(response.body).get("message")
+        except (ValueError, AttributeError):
+            explanation = response.body.decode("utf-8", "replace").strip()
+        error = NotFound if response.status == 404 else DockerAPIError
+        raise error(response.status, method, path, explanation or "")
+
+    async def request(self, method, path, params=None, body=None):
+        data = self._encode(method, await self._versioned(path), params, body)
+        for attempt in range(2):
+            connection, reused = await self._acquire()
+            try:
+                connection.writer.write(data)
+                response = await asyncio.wait_for(connection.read_response(method), self.timeout)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                self._release(connection, False)
+                if reused and attempt == 0:
+                    continue  # The daemon closed an idle keep-alive connection; retry on a fresh one
+                raise
+            except BaseException:
+                self._release(connection, False)
+                raise
+            self._release(connection, True)
+            self.request_count += 1
+            return self._check(method, path, response)
+
+    async def pipeline(self, requests):
+        # Writes every (method, path, params) request at once on one
+        # connection and reads the responses back in order. Only for
+        # idempotent requests: nothing is retried. Errors are not raised,
+        # callers look at each Response's status.
+        data = b"".join([self._encode(method, await self._versioned(path), params) for method, path, params in requests])
+        connection, _ = await self._acquire()
+        responses = []
+        try:
+            connection.writer.write(data)
+            for method, _, _ in requests:
+                responses.append(await asyncio.wait_for(connection.read_response(method), self.timeout))
+        finally:
+            self._release(connection, len(responses) == len(requests))
+        self.request_count += len(requests)
+        self.pipelined_count += len(requests)
+        return responses
+
+    @asynccontextmanager
+    async def _stream(self, method, path, params=None):
+        # Dedicated connection; gives (headers, body chunk iterator)
+        data = self._encode(method, await self._versioned(path), params)
+        connection = await self._open()
+        try:
+            connection.writer.write(data)
+            status, headers = await asyncio.wait_for(connection.read_head(), self.timeout)
+            if status >= 400:
+                body = b"".join([chunk async for chunk in connection.iter_body(method, status, headers)])
+                self._check(method, path, Response(status, headers, body))
+            self.request_count += 1
+            yield headers, connection.iter_body(method, status, headers)
+        finally:
+            connection.close()
+
+    async def _json_stream(self, path, params=None):
+        # Docker writes one JSON document per line
+        async with self._stream("GET", path, params) as (_, chunks):
+            buffer = b""
+            async for chunk in chunks:
+                buffer += chunk
+                *lines, buffer = buffer.split(b"\n")
+                for line in lines:
+                    if line.strip():
+                        yield json.loads(line)
+            if buffer.strip():
+                yield json.loads(buffer)
+
+    # -- Hot operations ------------------------------------------------------
+
+    async def containers(self, all=False, filters=None, limit=None):
+        response = await self.request("GET", "/containers/json", {"all": all, "filters": filters, "limit": limit})
+        return response.json()
+
+    async def inspect_container(self, container):
+        return (await self.request("GET", f"/containers/{quote(container, safe='')}/json")).json()
+
+    async def inspect_many(self, containers, depth=DEFAULT_PIPELINE_DEPTH):
+        # Inspect results in the order given; None for containers that are gone
+        containers = list(containers)
+        batches = [containers[i:i + depth] for i in range(0, len(containers), depth)]
+
+        async def run(batch):
+            responses = await self.pipeline([
+                ("GET", f"/containers/{quote(container, safe='')}/json", None) for container in batch
+            ])
+            results = []
+            for container, response in zip(batch, responses):
+                if response.status == 404:
+                    results.append(None)
+                else:
+                    results.append(self._check("GET", f"/containers/{container}/json", response).json())
+            return results
+
+        results = []
+        for batch_results in await asyncio.gather(*(run(batch) for batch in batches)):
+            results.extend(batch_results)
+        return results
+
+    async def images(self, filters=None):
+        return (await self.request("GET", "/images/json", {"filters": filters})).json()
+
+    async def start(self, container):
+        await self.request("POST", f"/containers/{quote(container, safe='')}/start")
+
+    async def stop(self, container, timeout=None):
+        await self.request("POST", f"/containers/{quote(container, safe='')}/stop", {"t": timeout})
+
+    async def remove(self, container, force=False, v=False):
+        await self.request("DELETE", f"/containers/{quote(container, safe='')}", {"force": force, "v": v})
+
+    def events(self, filters=None, since=None, until=None):
+        return self._json_stream("/events", {"filters": filters, "since": since, "until": until})
+
+    def container_stats(self, container, stream=True):
+        return self._json_stream(f"/containers/{quote(container, safe='')}/stats", {"stream": stream})
+
+    async def logs(self, container, follow=False, tail="all", stdout=True, stderr=True, timestamps=False):
+        # Yields (STDOUT or STDERR, bytes). TTY containers send a raw stream,
+        # which is reported as stdout.
+        params = {"follow": follow, "tail": tail, "stdout": stdout, "stderr": stderr, "timestamps": timestamps}
+        async with self._stream("GET", f"/containers/{quote(container, safe='')}/logs", params) as (headers, chunks):
+            if headers.get("content-type") == "application/vnd.docker.raw-stream":
+                async for chunk in chunks:
+                    yield STDOUT, chunk
+                return
+            buffer = b""
+            async for chunk in chunks:
+                buffer += chunk
+                while len(buffer) >= _FRAME_HEADER.size:
+                    stream_type, size = _FRAME_HEADER.unpack_from(buffer)
+                    end = _FRAME_HEADER.size + size
+                    if len(buffer) < end:
+                        break
+                    yield stream_type, buffer[_FRAME_HEADER.size:end]
+                    buffer = buffer[end:]
+
+    def stats(self):
+        return {
+            "requests": self.request_count,
+            "pipelined": self.pipelined_count,
+            "connections_opened": self.connections_opened,
+            "connections_reused": self.reused_count,
+            "idle_connections": len(self._idle),
+            "max_connections": self.max_connections
+        }
@@ -0,0 +1,89 @@
+import time
+from collections import deque
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+DEFAULT_CONCURRENCY = 16
+
+
+# Fans one action out over many containers. Items are submitted to the
+# shared OperationQueue (so they still serialise with per-card actions on
+# the same container) with at most `concurrency` of them in flight; results
+# are aggregated into progress counts and a list of per-item failures.
+class BulkOperation(QObject):
+    progress = pyqtSignal(int, int, int)  # done, total, failed
+    item_succeeded = pyqtSignal(str, object)  # item label, result
+    item_failed = pyqtSignal(str, str)  # item label, error
+    finished = pyqtSignal(int, int, float)  # succeeded, failed, elapsed seconds
+
+    def __init__(self, queue, title, func, items, concurrency=DEFAULT_CONCURRENCY, parent=None):
+        super().__init__(parent)
+        self.queue = queue
+        self.title = title
+        self.func = func
+        self.concurrency = max(1, concurrency)
+        # items are (key, label, args) tuples; key is the container id
+        self._waiting = deque(items)
+        self.total = len(self._waiting)
+        self.succeeded = 0
+        self.failures = []  # (label, error)
+        self._in_flight = {}
+        self._cancelled = False
+        self._started_at = None
+
+    @property
+    def done(self):
+        return self.succeeded + len(self.failures)
+
+    def start(self):
+        self._started_at = time.monotonic()
+        if not self._waiting:
+            self.finished.emit(0, 0, 0.0)
+            return
+        for _ in range(min(self.concurrency, len(self._waiting))):
+            self._submit_next()
+
+    def cancel(self):
+        self._cancelled = True
+        while self._waiting:
+            key, label, _ = self._waiting.popleft()
+            self.failures.append((label, "cancelled"))
+        for operation in self._in_flight.values():
+            operation.cancel()
+        self._check_finished()
+
+    def _submit_next(self):
+        if self._cancelled or not self._waiting:
+            return
+        key, label, args = self._waiting.popleft()
+        operation = self.queue.create(self.func, *args, key=key)
+        self._in_flight[id(operation)] = operation
+        operation.signals.finished.connect(
+            lambda result, op=operation: self._item_done(op, label, None, result)
+        )
+        operation.signals.error.connect(
+            lambda error, op=operation: self._item_done(op, label, error)
+        )
+        operation.signals.cancelled.connect(
+            lambda op=operation: self._item_done(op, label, "cancelled")
+        )
+        self.queue.start(operation)
+
+    def _item_done(self, operation, label, error, result=None):
+        if self._in_flight.pop(id(operation), None) is None:
+            return
+        if error is None:
+            self.succeeded += 1
+            self.item_succeeded.emit(label, result)
+        else:
+            self.failures.append((label, error))
+            self.item_failed.emit(label, error)
+        self.progress.emit(self.done, self.total, len(self.failures))
+        self._submit_next()
+        self._check_finished()
+
+    def _check_finished(self):
+        if self._in_flight or self._waiting:
+            return
+        elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+        self.finished.emit(self.succeeded, len(self.failures), elapsed)
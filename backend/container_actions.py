@@ -0,0 +1,246 @@
+import os
+import time
+
+from backend.docker_service import DockerService
+from backend.container_cache import image_id_of
+from backend.shell_cache import ShellCache
+from backend.reaper import expiry_labels
+
+SHELL_CANDIDATES = ['/bin/bash', '/bin/sh', '/bin/ash']
+SHELL_PROBE = "for s in " + " ".join(SHELL_CANDIDATES) + "; do [ -x \"$s\" ] && echo \"$s\"; done; true"
+
+
+# Blocking container actions. They run on an OperationQueue (or any other
+# worker) and receive the running operation first so they can report
+# progress and honour cancellation.
+
+def toggle_state(operation, container_id):
+    container = DockerService.instance().client.containers.get(container_id)
+    if container.status == "running":
+        operation.report_progress(0, f"Stopping container: {container.name} is in progress.")
+        container.stop()
+        operation.report_progress(100, f"Stopped container: {container.name}")
+        return "exited"
+    operation.report_progress(0, f"Starting container: {container.name} is in progress.")
+    container.start()
+    operation.report_progress(100, f"Started container: {container.name}")
+    return "running"
+
+
+def pull_image(operation, puller, ref):
+    return puller.pull(ref, progress=operation.report_progress, cancelled=operation.is_cancelled)
+
+
+def ensure_image(operation, puller, ref, refresh=False):
+    return puller.ensure(ref, progress=operation.report_progress, cancelled=operation.is_cancelled, refresh=refresh)
+
+
+def unique_container_name(client, base_name):
+    existing_names = {
+        name.lstrip('/')
+        for row in client.api.containers(all=True)
+        for name in row.get("Names") or []
+    }
+    index = 1
+    while f"{base_name}{index}" in existing_names:
+        index += 1
+    return f"{base_name}{index}"
+
+
+def build_image(operation, builder, dockerfile_path, dockerfile_content):
+    return builder.build(
+        dockerfile_content=dockerfile_content,
+        dockerfile_path=dockerfile_path or None,
+        progress=operation.report_progress,
+        cancelled=operation.is_cancelled
+    )
+
+
+def provision_container(operation, puller, builder, name, image_or_dockerfile, dockerfile_content,
+                        is_dockerfile, workspace_dir, snapshot_ids=(), refresh=False, pool=None,
+                        ttl=None, idle_timeout=None):
+    client = DockerService.instance().client
+    if is_dockerfile:
+        # Content-addressed build; skipped when the same Dockerfile and
+        # context were built before
+        image = build_image(operation, builder, image_or_dockerfile, dockerfile_content)
+        base_name = "box"
+    else:
+        image = image_or_dockerfile
+        base_name = image.split(':')[0].split('/')[-1]
+        labels = expiry_labels(ttl, idle_timeout)
+        if pool is not None and not refresh and not labels and image not in snapshot_ids:
+            # A warm container for this image only needs a rename. Labels are
+            # fixed at create time, so boxes that expire skip the pool.
+            name = name or unique_container_name(client, base_name)
+            if pool.acquire(image, name):
+                operation.report_progress(100, f"Took {name} from the warm pool for {image}")
+                return name
+
+        # Snapshots are always local; anything else is pulled only if the
+        # image index has never seen it (or a refresh was requested)
+        if image not in snapshot_ids:
+            ensure_image(operation, puller, image, refresh)
+
+    operation.check_cancelled()
+
+    # Generate container name if not provided
+    if not name:
+        name = unique_container_name(client, base_name)
+
+    print(f"Creating container with name: {name}")
+    container = client.containers.create(
+        image=image,
+        name=name,
+        tty=True,
+        stdin_open=True,
+        detach=True,
+        labels=expiry_labels(ttl, idle_timeout),
+        volumes={os.path.join(workspace_dir, name): {'bind': '/workspace', 'mode': 'rw'}}
+    )
+    print(f"Container created successfully: {container.id}")
+
+    # Create workspace directory for the container
+    os.makedirs(os.path.join(workspace_dir, name), exist_ok=True)
+    return name
+
+
+def start_container(operation, container_id):
+    container = DockerService.instance().client.containers.get(container_id)
+    operation.check_cancelled()
+    if container.status != "running":
+        container.start()
+    return container.name
+
+
+def stop_container(operation, container_id):
+    container = DockerService.instance().client.containers.get(container_id)
+    operation.check_cancelled()
+    if container.status == "running":
+        container.stop()
+    return container.name
+
+
+def remove_container(operation, container_id):
+    container = DockerService.instance().client.containers.get(container_id)
+    operation.check_cancelled()
+    container.remove(force=True)
+    return container.name
+
+
+def commit_container(operation, container_id, image_name):
+    from backend.snapshot_catalog import SnapshotCatalog  # SQLAlchemy is only needed from here on
+    client = DockerService.instance().client
+    catalog = SnapshotCatalog.instance()
+    container = client.containers.get(container_id)
+    operation.check_cancelled()
+
+    # A container created from a snapshot that has not changed since is
+    # that snapshot; don't commit an identical image on top of it
+    base_image_id = image_id_of(container)
+    parent = catalog.get(base_image_id)
+    if parent is not None and not container.diff():
+        operation.report_progress(100, f"{container.name} is unchanged since snapshot {parent.image_name}")
+        return container.name, parent.image_name, parent
+
+    snapshot = container.commit(repository=image_name)
+    operation.report_progress(-1, f"Committed {container.name} as {image_name}")
+    size = snapshot.attrs.get("Size", 0)
+    try:
+        base_size = client.api.inspect_image(base_image_id).get("Size", 0)
+    except Exception:
+        base_size = 0
+    record = catalog.record(
+        snapshot.id, image_name, container.id, container.name,
+        parent=parent, size=size, layer_size=max(0, size - base_size)
+    )
+    return container.name, image_name, record
+
+
+def reap_expired(operation, reaper):
+    return reaper.run(progress=operation.report_progress, cancelled=operation.is_cancelled)
+
+
+def prune_snapshots(operation, keep_last, max_age_days):
+    from backend.snapshot_catalog import SnapshotCatalog
+    removed, gone = SnapshotCatalog.instance().prune(
+        DockerService.instance(),
+        keep_last=keep_last,
+        max_age_days=max_age_days,
+        progress=operation.report_progress
+    )
+    return removed, gone
+
+
+def import_iso(operation, iso_manager, source_path, name=None):
+    return iso_manager.import_iso(
+        source_path,
+        name=name,
+        progress=operation.report_progress,
+        cancelled=operation.is_cancelled
+    )
+
+
+def build_iso_image(operation, builder, iso_path):
+    return builder.build(
+        iso_path,
+        progress=operation.report_progress,
+        cancelled=operation.is_cancelled
+    )
+
+
+def start_for_terminal(operation, container_id, timeout=5.0):
+    container = DockerService.instance().client.containers.get(container_id)
+    started = False
+    if container.status != "running":
+        print(f"Starting container {container.name} ({container.id})")
+        operation.report_progress(0, f"Starting container: {container.name}")
+        container.start()
+
+        # Wait up to timeout seconds for the container to be running
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            operation.check_cancelled()
+            container.reload()
+            if container.status == "running":
+                break
+            time.sleep(0.5)
+
+        if container.status != "running":
+            raise Exception("Container failed to start")
+        started = True
+    shell = detect_shell(container)
+    return container.id, container.name, shell, started
+
+
+def prepare_terminal(operation, container_id):
+    container = DockerService.instance().client.containers.get(container_id)
+    if container.status != "running":
+        raise Exception("Container must be running to open terminal")
+    return container.id, container.name, detect_shell(container), False
+
+
+def detect_shell(container):
+    # Known image: no exec at all
+    image_id = image_id_of(container)
+    shell_cache = ShellCache.instance()
+    shell = shell_cache.get(image_id)
+    if shell:
+        return shell
+
+    try:
+        # One exec that lists every available candidate, in preference order
+        result = container.exec_run(["/bin/sh", "-c", SHELL_PROBE])
+        if result.exit_code == 0:
+            found = result.output.decode(errors="replace").split()
+            shell = found[0] if found else '/bin/sh'
+            print(f"Found shell: {shell}")
+            shell_cache.set(image_id, shell)
+            return shell
+
+        print("Shell probe failed, defaulting to /bin/sh")
+        return '/bin/sh'
+
+    except Exception as e:
+        print(f"Error detecting shell: {str(e)}, defaulting to /bin/sh")
+        return '/bin/sh'
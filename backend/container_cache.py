@@ -0,0 +1,151 @@
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_TTL = 30.0
+DEFAULT_MAX_ENTRIES = 5000
+
+# Image events after which the tag index no longer matches the daemon
+IMAGE_ACTIONS = {"pull", "tag", "untag", "delete", "import", "load", "build"}
+
+
+def image_id_of(container):
+    # Listing returns the image ref in "Image" and the id in "ImageID";
+    # inspect returns the id in "Image"
+    return container.attrs.get("ImageID") or container.attrs.get("Image")
+
+
+# Metadata cache for containers and images, keyed by id. Containers are
+# filled from one raw /containers/json call (instead of docker-py's
+# list-then-inspect-each) and image tags from one raw /images/json call, so
+# rendering N cards costs O(1) API calls. Entries expire after `ttl`, are
+# invalidated by Docker events and the container table is LRU-bounded.
+class ContainerCache:
+    def __init__(self, docker_service, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.docker_service = docker_service
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.RLock()
+        self._containers = OrderedDict()  # id -> (Container, fetched_at)
+        self._listed_at = 0.0
+        self._image_tags = {}  # image id -> [tags]
+        self._images_loaded_at = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def _fresh(self, fetched_at, max_age=None):
+        return time.monotonic() - fetched_at < (self.ttl if max_age is None else max_age)
+
+    def _store(self, container):
+        self._containers[container.id] = (container, time.monotonic())
+        self._containers.move_to_end(container.id)
+        while len(self._containers) > self.max_entries:
+            self._containers.popitem(last=False)
+
+    def list_containers(self, max_age=None):
+        with self._lock:
+            if self._fresh(self._listed_at, max_age):
+                self.hits += 1
+                return [container for container, _ in self._containers.values()]
+            self.misses += 1
+
+        return self.load_rows(self.docker_service.client.api.containers(all=True))
+
+    def load_rows(self, rows):
+        # Replaces the table with a full /containers/json listing, however it
+        # was fetched (docker-py here, AsyncDockerClient from the event stream)
+        client = self.docker_service.client
+        containers = []
+        for row in rows:
+            # Give list rows the "Name" and "Config" that inspect results have
+            # so Container.name and .labels work without another round-trip
+            names = row.get("Names") or []
+            row.setdefault("Name", names[0] if names else "")
+            row.setdefault("Config", {"Labels": row.get("Labels") or {}})
+            containers.append(client.containers.prepare_model(row))
+
+        with self._lock:
+            self._containers.clear()
+            for container in containers:
+                self._store(container)
+            self._listed_at = time.monotonic()
+        return containers
+
+    def get_container(self, container_id, max_age=None):
+        with self._lock:
+            entry = self._containers.get(container_id)
+            if entry is not None and self._fresh(entry[1], max_age):
+                self._containers.move_to_end(container_id)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        container = self.docker_service.client.containers.get(container_id)
+        with self._lock:
+            self._store(container)
+        return container
+
+    def load_attrs(self, attrs):
+        # Stores one inspect result fetched outside docker-py
+        container = self.docker_service.client.containers.prepare_model(attrs)
+        with self._lock:
+            self._store(container)
+        return container
+
+    def container_names(self):
+        return [container.name for container in self.list_containers()]
+
+    def image_tags(self, image_id, refresh=True):
+        # refresh=False never touches Docker; GUI code uses it and relies on
+        # the event stream thread keeping the index warm
+        if not image_id:
+            return []
+        with self._lock:
+            if not refresh or self._fresh(self._images_loaded_at):
+                self.hits += 1
+                return self._image_tags.get(image_id, [])
+            self.misses += 1
+        self.refresh_images()
+        with self._lock:
+            return self._image_tags.get(image_id, [])
+
+    def refresh_images(self):
+        return self.load_images(self.docker_service.client.api.images())
+
+    def load_images(self, rows):
+        tags = {
+            row["Id"]: [tag for tag in (row.get("RepoTags") or []) if tag != "<none>:<none>"]
+            for row in rows
+        }
+        with self._lock:
+            self._image_tags = tags
+            self._images_loaded_at = time.monotonic()
+        return rows
+
+    def invalidate(self, container_id=None):
+        with self._lock:
+            if container_id is None:
+                self._containers.clear()
+            else:
+                self._containers.pop(container_id, None)
+            self._listed_at = 0.0
+
+    def invalidate_images(self):
+        with self._lock:
+            self._images_loaded_at = 0.0
+
+    def handle_event(self, event):
+        event_type = event.get("Type")
+        if event_type == "container":
+            self.invalidate(event.get("id") or event.get("Actor", {}).get("ID"))
+        elif event_type == "image" and event.get("Action") in IMAGE_ACTIONS:
+            self.invalidate_images()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "containers": len(self._containers),
+                "images": len(self._image_tags),
+                "hits": self.hits,
+                "misses": self.misses
+            }
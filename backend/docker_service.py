@@ -0,0 +1,174 @@
+import os
+import re
+import threading
+import time
+
+DEFAULT_POOL_SIZE = 32
+DEFAULT_TIMEOUT = 60
+
+# Path segments that follow a collection name but are not object ids
+_COLLECTION_VERBS = {"json", "create", "prune", "load", "search", "get"}
+_COLLECTIONS = {"containers", "images", "exec", "networks", "volumes", "plugins"}
+
+
+# One docker-py client (and therefore one connection pool) shared by every
+# card, dialog and worker. Each request is timed and pool occupancy sampled,
+# see stats().
+class DockerService:
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, base_url=None, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT):
+        self.base_url = base_url
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.in_flight = 0
+        self.reset_stats()
+
+    @classmethod
+    def instance(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                pool_size = int(os.environ.get("DISPOSABLEBOX_POOL_SIZE", DEFAULT_POOL_SIZE))
+                cls._instance = cls(pool_size=pool_size)
+            return cls._instance
+
+    @property
+    def client(self):
+        # Connect lazily so that constructing the service never touches Docker
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = self._connect()
+        return self._client
+
+    def _connect(self):
+        return self.create_client(self.pool_size)
+
+    def create_client(self, pool_size):
+        # Separate, instrumented client for long-lived streams that would
+        # otherwise pin connections of the shared pool
+        import docker  # Deferred: importing docker-py costs more than the GUI needs to appear
+        if self.base_url:
+            client = docker.DockerClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                max_pool_size=pool_size
+            )
+        else:
+            client = docker.from_env(timeout=self.timeout, max_pool_size=pool_size)
+        self._instrument(client.api)
+        return client
+
+    def _instrument(self, api):
+        send = api.send
+
+        def timed_send(request, **kwargs):
+            key = self._call_key(request.method, request.path_url)
+            with self._stats_lock:
+                self.in_flight += 1
+                self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            start = time.perf_counter()
+            failed = False
+            try:
+                response = send(request, **kwargs)
+                failed = response.status_code >= 400
+                return response
+            except Exception:
+                failed = True
+                raise
+            finally:
+                self._record(key, time.perf_counter() - start, failed)
+
+        api.send = timed_send
+
+    @staticmethod
+    def _call_key(method, path_url):
+        path = re.sub(r"^/v[\d.]+", "", path_url.split("?", 1)[0])
+        segments = path.strip("/").split("/")
+        for i in range(1, len(segments)):
+            if segments[i - 1] in _COLLECTIONS and segments[i] not in _COLLECTION_VERBS:
+                segments[i] = "{id}"
+        return f"{method} /{'/'.join(segments)}"
+
+    def _record(self, key, elapsed, failed):
+        with self._stats_lock:
+            self.in_flight -= 1
+            self.call_count += 1
+            self.total_latency += elapsed
+            self.max_latency = max(self.max_latency, elapsed)
+            if failed:
+                self.error_count += 1
+            entry = self.calls.setdefault(key, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2] = max(entry[2], elapsed)
+
+    def reset_stats(self):
+        # Cumulative counters only: requests already in flight still finish
+        # and decrement in_flight
+        with self._stats_lock:
+            self.call_count = 0
+            self.error_count = 0
+            self.total_latency = 0.0
+            self.max_latency = 0.0
+            self.peak_in_flight = self.in_flight
+            self.calls = {}  # "GET /containers/{id}/json" -> [count, total, max]
+
+    def _pool_usage(self):
+        # Checked-out connections across every urllib3 pool of the client, and
+        # in the busiest one. The unix and npipe adapters keep one pool per
+        # URL, so hundreds of mostly idle pools are normal and only the
+        # busiest says how close a request is to waiting for a connection.
+        if self._client is None:
+            return 0, 0
+        in_use = 0
+        busiest = 0
+        for adapter in self._client.api.adapters.values():
+            container = getattr(adapter, "pools", None)
+            if container is None and hasattr(adapter, "poolmanager"):
+                container = adapter.poolmanager.pools
+            if container is None:
+                continue
+            for key in list(container.keys()):
+                pool = container.get(key)
+                if pool is None or pool.pool is None:
+                    continue
+                checked_out = pool.pool.maxsize - pool.pool.qsize()
+                in_use += checked_out
+                busiest = max(busiest, checked_out)
+        return in_use, busiest
+
+    def stats(self):
+        in_use, busiest = self._pool_usage()
+        with self._stats_lock:
+            calls = {
+                key: {
+                    "count": count,
+                    "avg_ms": total / count * 1000,
+                    "max_ms": peak * 1000
+                }
+                for key, (count, total, peak) in self.calls.items()
+            }
+            return {
+                "calls": self.call_count,
+                "errors": self.error_count,
+                "avg_latency_ms": self.total_latency / self.call_count * 1000 if self.call_count else 0.0,
+                "max_latency_ms": self.max_latency * 1000,
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "pool_size": self.pool_size,
+                "pool_connections_in_use": in_use,
+                "pool_busiest_in_use": busiest,
+                "pool_utilization": busiest / self.pool_size if self.pool_size else 0.0,
+                "per_call": calls
+            }
+
+    def close(self):
+        with self._client_lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
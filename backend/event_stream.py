@@ -0,0 +1,236 @@
+import asyncio
+import threading
+import time
+
+from backend.container_cache import IMAGE_ACTIONS, image_id_of
+
+# Container event actions that can change what a card shows
+STATE_ACTIONS = {
+    "create", "start", "restart", "die", "stop", "kill",
+    "pause", "unpause", "rename", "update", "destroy"
+}
+
+
+# Background subscriber on the Docker /events stream. It does one full
+# listing on startup and after every reconnect, then keeps a per-id
+# snapshot of what the grid shows and only reports containers whose state
+# actually changed. Lookups go through the ContainerCache, which it also
+# keeps invalidated.
+#
+# With a runner (an AsyncBridge: .client and .submit(coro)) the listing,
+# the events stream and the inspect after each event go through the
+# AsyncDockerClient on the runner's loop instead of a docker-py thread.
+# Callers pass one only when async_docker.is_supported() the host.
+class ContainerEventStream:
+    def __init__(self, docker_service, container_cache, image_index=None,
+                 reconnect_delay=2.0, max_reconnect_delay=30.0, runner=None):
+        self.docker_service = docker_service
+        self.container_cache = container_cache
+        self.image_index = image_index
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.runner = runner
+        self.states = {}  # container id -> (name, status, image id)
+        self.sync_listeners = []
+        self.update_listeners = []
+        self.remove_listeners = []
+        self.event_listeners = []
+        self._events = None
+        self._thread = None
+        self._future = None  # Runner future of _run_async()
+        self._loop = None
+        self._session = None  # Task following the events of one connection
+        self._stop = threading.Event()
+        self._resync = threading.Event()
+
+    def subscribe(self, on_sync=None, on_update=None, on_remove=None, on_event=None):
+        if on_sync:
+            self.sync_listeners.append(on_sync)
+        if on_update:
+            self.update_listeners.append(on_update)
+        if on_remove:
+            self.remove_listeners.append(on_remove)
+        if on_event:
+            self.event_listeners.append(on_event)
+
+    def start(self):
+        if self.runner is not None:
+            if self._future is None or self._future.done():
+                self._stop.clear()
+                self._future = self.runner.submit(self._run_async())
+            return
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="docker-events", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._close_events()
+        if self._future is not None:
+            self._future.cancel()
+
+    def resync(self):
+        # Force a full list on the next loop iteration
+        self._resync.set()
+        self._close_events()
+
+    def _close_events(self):
+        session, loop = self._session, self._loop
+        if session is not None and loop is not None:
+            loop.call_soon_threadsafe(session.cancel)
+        events = self._events
+        if events is not None:
+            try:
+                events.close()
+            except Exception:
+                pass
+
+    def _run(self):
+        delay = self.reconnect_delay
+        while not self._stop.is_set():
+            try:
+                client = self.docker_service.client
+                # Subscribe before listing so nothing between the two is lost
+                self._events = client.events(
+                    decode=True,
+                    filters={"type": ["container", "image"]}
+                )
+                self._resync.clear()
+                self._sync(self.container_cache.list_containers(max_age=0))
+                delay = self.reconnect_delay
+                for event in self._events:
+                    if self._stop.is_set() or self._resync.is_set():
+                        break
+                    self._handle_event(event)
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                if not self._resync.is_set():
+                    print(f"Docker event stream error: {str(e)}, reconnecting in {delay:.0f}s")
+                    self._stop.wait(delay)
+                    delay = min(delay * 2, self.max_reconnect_delay)
+            finally:
+                self._close_events()
+                self._events = None
+
+    async def _run_async(self):
+        self._loop = asyncio.get_running_loop()
+        delay = self.reconnect_delay
+        while not self._stop.is_set():
+            self._resync.clear()
+            self._session = asyncio.ensure_future(self._follow_async())
+            try:
+                await self._session
+                delay = self.reconnect_delay
+            except asyncio.CancelledError:
+                if self._stop.is_set() or not self._resync.is_set():
+                    raise
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                print(f"Docker event stream error: {str(e)}, reconnecting in {delay:.0f}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+            finally:
+                self._session = None
+
+    async def _follow_async(self):
+        client = self.runner.client
+        # The docker-py client wraps rows into Container models; creating it
+        # may ask the daemon for its version, so not on the loop
+        await asyncio.get_running_loop().run_in_executor(None, lambda: self.docker_service.client)
+        # Events since just before the listing are replayed, so nothing
+        # between the two is lost; replays of known states are no-ops
+        since = int(time.time()) - 1
+        rows, image_rows = await asyncio.gather(client.containers(all=True), client.images())
+        self._sync(self.container_cache.load_rows(rows), image_rows)
+        async for event in client.events(filters={"type": ["container", "image"]}, since=since):
+            if self._stop.is_set():
+                break
+            self.container_cache.handle_event(event)
+            if event.get("Type") == "image" and event.get("Action") in IMAGE_ACTIONS:
+                self._load_images(await client.images())
+            container_id = self._dispatch(event)
+            if container_id is None:
+                continue
+            try:
+                attrs = await client.inspect_container(container_id)
+            except Exception:
+                self._remove(container_id)
+                continue
+            self._update(self.container_cache.load_attrs(attrs))
+
+    def _sync(self, containers, image_rows=None):
+        # Warm the image tag index here so the GUI never has to fetch it
+        if image_rows is None:
+            self._refresh_images()
+        else:
+            self._load_images(image_rows)
+        self.states = {c.id: self._signature(c) for c in containers}
+        for listener in self.sync_listeners:
+            listener(containers)
+
+    def _handle_event(self, event):
+        self.container_cache.handle_event(event)
+        if event.get("Type") == "image" and event.get("Action") in IMAGE_ACTIONS:
+            self._refresh_images()
+        container_id = self._dispatch(event)
+        if container_id is None:
+            return
+        try:
+            container = self.container_cache.get_container(container_id)
+        except Exception:
+            # Gone before we could inspect it
+            self._remove(container_id)
+            return
+        self._update(container)
+
+    def _dispatch(self, event):
+        # Notifies event listeners and handles removals; returns the id of a
+        # container that needs inspecting, if any
+        for listener in self.event_listeners:
+            listener(event)
+
+        if event.get("Type") != "container" or event.get("Action") not in STATE_ACTIONS:
+            return None
+
+        container_id = event.get("id") or event.get("Actor", {}).get("ID")
+        if not container_id:
+            return None
+
+        if event["Action"] == "destroy":
+            self._remove(container_id)
+            return None
+        return container_id
+
+    def _update(self, container):
+        signature = self._signature(container)
+        if self.states.get(container.id) == signature:
+            return
+        self.states[container.id] = signature
+        for listener in self.update_listeners:
+            listener(container)
+
+    def _refresh_images(self):
+        # One /images/json call feeds both the tag labels and the ref index
+        rows = self.container_cache.refresh_images()
+        if self.image_index is not None:
+            self.image_index.load(rows)
+
+    def _load_images(self, rows):
+        # Same, for rows the async client already fetched
+        self.container_cache.load_images(rows)
+        if self.image_index is not None:
+            self.image_index.load(rows)
+
+    def _remove(self, container_id):
+        if self.states.pop(container_id, None) is None:
+            return
+        for listener in self.remove_listeners:
+            listener(container_id)
+
+    @staticmethod
+    def _signature(container):
+        return (container.name, container.status, image_id_of(container))
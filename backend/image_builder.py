@@ -0,0 +1,143 @@
+import hashlib
+import os
+import re
+import tempfile
+import threading
+
+from backend.paths import data_path
+
+BUILD_LABEL = "disposablebox.build-hash"
+BUILD_REPOSITORY = "disposablebox-build"
+EMBEDDED_DOCKERFILE = ".disposablebox.Dockerfile"
+
+STEP_PATTERN = re.compile(r"^Step (\d+)/(\d+)")
+
+
+def read_dockerignore(context_dir):
+    try:
+        with open(os.path.join(context_dir, ".dockerignore"), 'r') as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return []
+    return [line.strip() for line in lines if line.strip() and not line.strip().startswith('#')]
+
+
+def context_files(context_dir):
+    # Paths the daemon would see after .dockerignore, relative to the context
+    from docker.utils.build import exclude_paths
+    return sorted(exclude_paths(os.path.abspath(context_dir), read_dockerignore(context_dir), EMBEDDED_DOCKERFILE))
+
+
+def build_key(dockerfile_content, context_dir, files):
+    # Dockerfile text plus the name, size and mtime of every context file:
+    # an edit to either gives a new key, an unchanged tree reuses the image
+    digest = hashlib.sha256(dockerfile_content.encode("utf-8"))
+    for path in files:
+        try:
+            st = os.lstat(os.path.join(context_dir, path))
+        except OSError:
+            continue
+        digest.update(f"\0{path}\0{st.st_size}\0{st.st_mtime_ns}".encode("utf-8", "surrogateescape"))
+    return digest.hexdigest()
+
+
+# Builds images from Dockerfiles through the low-level API. Inline
+# Dockerfiles get their own content-addressed directory under the data dir,
+# so concurrent builds never share a file and the context is just that
+# directory. Dockerfiles picked from disk use their own directory as the
+# context, trimmed by its .dockerignore. Every image is labelled with its
+# build key, and a build whose key already has an image is skipped.
+class ImageBuilder:
+    def __init__(self, docker_service, builds_dir=None):
+        self.docker_service = docker_service
+        self.builds_dir = builds_dir or data_path("builds")
+        self._lock = threading.Lock()
+        self._key_locks = {}  # build key -> lock, so identical builds run once
+
+    def build_dir(self, dockerfile_content):
+        dockerfile_hash = hashlib.sha256(dockerfile_content.encode("utf-8")).hexdigest()
+        path = os.path.join(self.builds_dir, dockerfile_hash)
+        dockerfile_path = os.path.join(path, "Dockerfile")
+        if not os.path.exists(dockerfile_path):
+            os.makedirs(path, exist_ok=True)
+            tmp_path = f"{dockerfile_path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w') as f:
+                f.write(dockerfile_content)
+            os.replace(tmp_path, dockerfile_path)
+        return path
+
+    def find_image(self, key):
+        rows = self.docker_service.client.api.images(filters={"label": f"{BUILD_LABEL}={key}"})
+        return rows[0]["Id"] if rows else None
+
+    def build(self, dockerfile_content=None, dockerfile_path=None, progress=None, cancelled=None):
+        if not dockerfile_content:
+            with open(dockerfile_path, 'r') as f:
+                dockerfile_content = f.read()
+        if dockerfile_path:
+            context_dir = os.path.dirname(os.path.abspath(dockerfile_path))
+        else:
+            context_dir = self.build_dir(dockerfile_content)
+
+        files = context_files(context_dir)
+        key = build_key(dockerfile_content, context_dir, files)
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            image_id = self.find_image(key)
+            if image_id:
+                if progress:
+                    progress(100, f"Reusing image {image_id[7:19]} built from the same Dockerfile and context")
+                return image_id
+            return self._build(key, dockerfile_content, context_dir, files, progress, cancelled)
+
+    def _build(self, key, dockerfile_content, context_dir, files, progress, cancelled):
+        from docker.utils.build import create_archive
+        if progress:
+            progress(-1, f"Sending build context: {len(files)} entries from {context_dir}")
+        image_id = None
+        with tempfile.TemporaryFile() as context:
+            create_archive(
+                os.path.abspath(context_dir),
+                files=files,
+                fileobj=context,
+                gzip=True,
+                extra_files=[(EMBEDDED_DOCKERFILE, dockerfile_content)]
+            )
+            stream = self.docker_service.client.api.build(
+                fileobj=context,
+                custom_context=True,
+                encoding="gzip",
+                dockerfile=EMBEDDED_DOCKERFILE,
+                tag=f"{BUILD_REPOSITORY}:{key[:12]}",
+                labels={BUILD_LABEL: key},
+                rm=True,
+                forcerm=True,
+                decode=True
+            )
+            percent = -1
+            for message in stream:
+                if "error" in message:
+                    raise Exception(message["error"].strip())
+                if cancelled is not None and cancelled():
+                    raise Exception("Build cancelled")
+                aux = message.get("aux")
+                if isinstance(aux, dict) and aux.get("ID"):
+                    image_id = aux["ID"]
+                line = (message.get("stream") or "").strip()
+                if not line:
+                    continue
+                step = STEP_PATTERN.match(line)
+                if step:
+                    percent = int((int(step.group(1)) - 1) * 100 / int(step.group(2)))
+                if progress:
+                    progress(percent, line)
+
+        if image_id is None:
+            image_id = self.find_image(key)
+        if image_id is None:
+            raise Exception("Build finished without producing an image")
+        if progress:
+            progress(100, f"Built image {image_id[7:19]}")
+        return image_id
@@ -0,0 +1,96 @@
+import threading
+import time
+
+from backend.image_puller import split_image_ref
+
+DEFAULT_REGISTRY_PREFIXES = ("docker.io/", "index.docker.io/", "registry-1.docker.io/")
+
+
+def normalize_ref(ref):
+    # "ubuntu", "library/ubuntu:latest" and "docker.io/library/ubuntu" are
+    # all the same image; tags and digests keep their own suffix
+    if not ref:
+        return ref
+    for prefix in DEFAULT_REGISTRY_PREFIXES:
+        if ref.startswith(prefix):
+            ref = ref[len(prefix):]
+            break
+    if ref.startswith("library/"):
+        ref = ref[len("library/"):]
+    if ref.startswith("sha256:"):
+        return ref
+    repository, tag = split_image_ref(ref)
+    return repository if tag is None else f"{repository}:{tag}"
+
+
+# Local index of the images the daemon already has: every tag, repo digest
+# and id maps to an image id. It is filled from one raw /images/json call
+# and reloaded by the event stream on image events, so "is this ref already
+# here?" never needs a round-trip to Docker, let alone the registry.
+class ImageIndex:
+    def __init__(self, docker_service):
+        self.docker_service = docker_service
+        self._lock = threading.Lock()
+        self._refs = {}  # normalized ref, digest ref or id -> image id
+        self._digests = {}  # image id -> [repo digests]
+        self.loaded_at = None
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    @property
+    def loaded(self):
+        return self.loaded_at is not None
+
+    def refresh(self):
+        rows = self.docker_service.client.api.images()
+        self.load(rows)
+        return rows
+
+    def load(self, rows):
+        refs = {}
+        digests = {}
+        for row in rows:
+            image_id = row["Id"]
+            refs[image_id] = image_id
+            for tag in row.get("RepoTags") or []:
+                if tag != "<none>:<none>":
+                    refs[normalize_ref(tag)] = image_id
+            repo_digests = [d for d in row.get("RepoDigests") or [] if d != "<none>@<none>"]
+            for digest in repo_digests:
+                refs[normalize_ref(digest)] = image_id
+            digests[image_id] = repo_digests
+        with self._lock:
+            self._refs = refs
+            self._digests = digests
+            self.loaded_at = time.time()
+            self.refreshes += 1
+
+    def resolve(self, ref):
+        # Image id for ref, or None; never calls Docker
+        with self._lock:
+            image_id = self._refs.get(normalize_ref(ref))
+            if image_id is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return image_id
+
+    def has(self, ref):
+        # Like resolve() but not counted in the hit/miss stats
+        with self._lock:
+            return normalize_ref(ref) in self._refs
+
+    def digests(self, image_id):
+        with self._lock:
+            return list(self._digests.get(image_id, []))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "images": len(self._digests),
+                "refs": len(self._refs),
+                "hits": self.hits,
+                "misses": self.misses,
+                "refreshes": self.refreshes
+            }
@@ -0,0 +1,127 @@
+import threading
+import time
+
+PROGRESS_INTERVAL = 0.5  # Seconds between progress callbacks per pull
+DEFAULT_PREFETCH_CONCURRENCY = 3
+
+LAYER_STATUSES = {
+    "Pulling fs layer", "Waiting", "Downloading", "Verifying Checksum",
+    "Download complete", "Extracting", "Pull complete", "Already exists"
+}
+
+
+def split_image_ref(ref):
+    # "registry:5000/repo:tag" -> ("registry:5000/repo", "tag"); digests are kept whole
+    if "@" in ref:
+        return ref, None
+    repository, sep, tag = ref.rpartition(":")
+    if not sep or "/" in tag:
+        return ref, "latest"
+    return repository, tag
+
+
+class PullProgress:
+    # Per-layer byte counts aggregated from the pull's JSON message stream
+    def __init__(self, ref):
+        self.ref = ref
+        self.layers = {}  # layer id -> [current bytes, total bytes, done]
+        self.status = ""
+
+    def update(self, message):
+        layer_id = message.get("id")
+        status = message.get("status", "")
+        if not layer_id or status not in LAYER_STATUSES:
+            self.status = status
+            return
+        layer = self.layers.setdefault(layer_id, [0, 0, False])
+        detail = message.get("progressDetail") or {}
+        if status == "Downloading" and detail.get("total"):
+            layer[0] = detail.get("current", 0)
+            layer[1] = detail["total"]
+        elif status in ("Download complete", "Verifying Checksum"):
+            layer[0] = layer[1]
+        elif status in ("Pull complete", "Already exists"):
+            layer[0] = layer[1]
+            layer[2] = True
+
+    def summary(self):
+        done = sum(1 for layer in self.layers.values() if layer[2])
+        current = sum(layer[0] for layer in self.layers.values())
+        total = sum(layer[1] for layer in self.layers.values())
+        percent = int(current * 100 / total) if total else -1
+        message = (f"{self.ref}: {done}/{len(self.layers)} layers, "
+                   f"{current / 1e6:.1f}/{total / 1e6:.1f} MB")
+        return percent, message
+
+
+# Streams image pulls through the low-level API (stream=True, decode=True)
+# and reports aggregated per-layer progress. Concurrent pulls of the same
+# ref share one registry download, so a create that races a background
+# prefetch waits for it instead of pulling twice.
+class ImagePuller:
+    def __init__(self, docker_service, image_index=None):
+        self.docker_service = docker_service
+        self.image_index = image_index
+        self._lock = threading.Lock()
+        self._in_flight = {}  # ref -> (done event, [error])
+
+    def pull(self, ref, progress=None, cancelled=None):
+        with self._lock:
+            shared = self._in_flight.get(ref)
+            if shared is None:
+                shared = self._in_flight[ref] = (threading.Event(), [None])
+                owner = True
+            else:
+                owner = False
+
+        done, error = shared
+        if not owner:
+            if progress:
+                progress(-1, f"{ref}: waiting for pull already in progress")
+            done.wait()
+            if error[0] is not None:
+                raise Exception(error[0])
+            return ref
+
+        try:
+            self._pull(ref, progress, cancelled)
+            return ref
+        except Exception as e:
+            error[0] = str(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(ref, None)
+            done.set()
+
+    def ensure(self, ref, progress=None, cancelled=None, refresh=False):
+        # Pull only when the local image index does not know ref, or when
+        # the caller explicitly asks for a fresh copy from the registry
+        index = self.image_index
+        if index is not None and not refresh:
+            if not index.loaded:
+                index.refresh()
+            image_id = index.resolve(ref)
+            if image_id is not None:
+                if progress:
+                    progress(100, f"{ref}: using local image {image_id[7:19]}")
+                return ref
+        return self.pull(ref, progress, cancelled)
+
+    def _pull(self, ref, progress, cancelled):
+        repository, tag = split_image_ref(ref)
+        state = PullProgress(ref)
+        last_report = 0.0
+        stream = self.docker_service.client.api.pull(repository, tag=tag, stream=True, decode=True)
+        for message in stream:
+            if "error" in message:
+                raise Exception(message.get("error"))
+            state.update(message)
+            if cancelled is not None and cancelled():
+                raise Exception(f"Pull of {ref} cancelled")
+            now = time.monotonic()
+            if progress and now - last_report >= PROGRESS_INTERVAL:
+                last_report = now
+                progress(*state.summary())
+        if progress:
+            progress(100, f"{ref}: {state.status or 'pull complete'}")
@@ -0,0 +1,275 @@
+import calendar
+import mmap
+import os
+import stat
+import struct
+
+SECTOR_SIZE = 2048
+DESCRIPTORS_START = 16 * SECTOR_SIZE
+MAX_DESCRIPTORS = 16  # Volume descriptors read before giving up on a terminator
+
+FLAG_DIRECTORY = 0x02
+FLAG_MULTI_EXTENT = 0x80
+
+_RECORD_TIME = struct.Struct("<6Bb")
+
+
+class ISOFormatError(Exception):
+    pass
+
+
+class ISOEntry:
+    __slots__ = ("path", "mode", "uid", "gid", "nlink", "mtime", "size", "extents", "link_target")
+
+    def __init__(self, path, mode, mtime, size, extents):
+        self.path = path
+        self.mode = mode
+        self.uid = 0
+        self.gid = 0
+        self.nlink = 1
+        self.mtime = mtime
+        self.size = size
+        self.extents = extents  # [(byte offset, length)]
+        self.link_target = None
+
+    def is_dir(self):
+        return stat.S_ISDIR(self.mode)
+
+    def is_file(self):
+        return stat.S_ISREG(self.mode)
+
+
+def record_time(data):
+    year, month, day, hour, minute, second, offset = _RECORD_TIME.unpack(data)
+    if not month:
+        return 0
+    try:
+        return calendar.timegm((1900 + year, month, day, hour, minute, second)) - offset * 15 * 60
+    except (ValueError, OverflowError):
+        return 0
+
+
+def _iso_name(raw):
+    # "VMLINUZ.;1" -> "vmlinuz", as Linux shows plain ISO9660 names
+    name = raw.decode("ascii", "replace").split(";", 1)[0]
+    if name.endswith(".") and len(name) > 1:
+        name = name[:-1]
+    return name.lower()
+
+
+# Read-only ISO9660 filesystem over an mmap of the image. Nothing is read
+# up front: directory records are parsed as the tree is walked, and file
+# contents are handed out as memoryview slices of the map, so the kernel
+# pages in only what is actually consumed. Rock Ridge names, modes, owners
+# and symlinks are used when present; otherwise names are shown lower-cased
+# without the ";1" version, like a Linux mount.
+class ISO9660:
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self.size = os.fstat(self._file.fileno()).st_size
+            if self.size < DESCRIPTORS_START + SECTOR_SIZE:
+                raise ISOFormatError(f"{path} is too small to be an ISO image")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self._file.close()
+            raise
+        self.data = memoryview(self._map)
+        self.block_size, self.root = self._primary_volume()
+        self.susp_skip = self._susp_skip()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._file.close()
+        try:
+            self.data.release()
+            self._map.close()
+        except BufferError:
+            pass  # Slices handed out are still alive; the map goes when they do
+
+    def _primary_volume(self):
+        for offset in range(DESCRIPTORS_START, DESCRIPTORS_START + MAX_DESCRIPTORS * SECTOR_SIZE, SECTOR_SIZE):
+            if offset + SECTOR_SIZE > self.size or self.data[offset + 1:offset + 6] != b"CD001":
+                break
+            kind = self.data[offset]
+            if kind == 1:
+                block_size = int.from_bytes(self.data[offset + 128:offset + 130], "little") or SECTOR_SIZE
+                return block_size, bytes(self.data[offset + 156:offset + 190])
+            if kind == 255:
+                break
+        raise ISOFormatError(f"{self.path} has no ISO9660 primary volume descriptor")
+
+    def _susp_skip(self):
+        # The root's "." record carries the SUSP "SP" marker when Rock Ridge
+        # is in use; None means plain ISO9660
+        extent = int.from_bytes(self.root[2:6], "little")
+        first = self.data[extent * self.block_size:extent * self.block_size + 255]
+        area = first[34:first[0]]
+        if len(area) >= 7 and area[0:2] == b"SP" and area[4:6] == b"\xbe\xef":
+            return area[6]
+        return None
+
+    def _extent(self, record):
+        return int.from_bytes(record[2:6], "little") * self.block_size, int.from_bytes(record[10:14], "little")
+
+    def _records(self, offset, length):
+        end = min(offset + length, self.size)
+        while offset < end:
+            record_length = self.data[offset]
+            if record_length == 0:
+                # Records never span a sector; the rest of this one is padding
+                offset = (offset // self.block_size + 1) * self.block_size
+                continue
+            yield self.data[offset:offset + record_length]
+            offset += record_length
+
+    def _rock_ridge(self, record):
+        name_length = record[32]
+        start = 33 + name_length + (0 if name_length % 2 else 1) + self.susp_skip
+        area = bytes(record[start:])
+        fields = {}
+        name = b""
+        components = []
+        continued = False
+        seen_areas = 0
+        while area and seen_areas < 16:
+            seen_areas += 1
+            continuation = None
+            pos = 0
+            while pos + 4 <= len(area):
+                signature = area[pos:pos + 2]
+                length = area[pos + 2]
+                if length < 4:
+                    break
+                entry = area[pos:pos + length]
+                if signature == b"NM" and not entry[4] & 0x06:
+                    name += entry[5:]
+                    fields["name"] = name
+                elif signature == b"PX" and length >= 36:
+                    fields["mode"] = int.from_bytes(entry[4:8], "little")
+                    fields["nlink"] = int.from_bytes(entry[12:16], "little")
+                    fields["uid"] = int.from_bytes(entry[20:24], "little")
+                    fields["gid"] = int.from_bytes(entry[28:32], "little")
+                elif signature == b"SL":
+                    cpos = 5
+                    while cpos + 2 <= len(entry):
+                        flags = entry[cpos]
+                        content = entry[cpos + 2:cpos + 2 + entry[cpos + 1]]
+                        cpos += 2 + entry[cpos + 1]
+                        if flags & 0x08:
+                            part = b""
+                        elif flags & 0x02:
+                            part = b"."
+                        elif flags & 0x04:
+                            part = b".."
+                        else:
+                            part = content
+                        if continued and components:
+                            components[-1] += part
+                        else:
+                            components.append(part)
+                        continued = bool(flags & 0x01)
+                    fields["link"] = components
+                elif signature == b"CE":
+                    continuation = (
+                        int.from_bytes(entry[4:8], "little") * self.block_size + int.from_bytes(entry[12:16], "little"),
+                        int.from_bytes(entry[20:24], "little")
+                    )
+                elif signature == b"ST":
+                    break
+                pos += length
+            area = bytes(self.data[continuation[0]:continuation[0] + continuation[1]]) if continuation else b""
+        if "link" in fields:
+            fields["link"] = b"/".join(fields["link"]) or b"/"
+        return fields
+
+    def listdir(self, directory):
+        # ISOEntry for every child of a directory entry (or of the root for None)
+        if directory is None:
+            offset, length = self._extent(self.root)
+            parent = ""
+        else:
+            (offset, length), = directory.extents
+            parent = directory.path
+        pending = None
+        for record in self._records(offset, length):
+            name_length = record[32]
+            raw_name = bytes(record[33:33 + name_length])
+            if raw_name in (b"\x00", b"\x01"):
+                continue
+            flags = record[25]
+            extent = self._extent(record)
+            if pending is not None:
+                # Continuation of a multi-extent file (over 4 GiB)
+                pending.extents.append(extent)
+                pending.size += extent[1]
+                if not flags & FLAG_MULTI_EXTENT:
+                    yield pending
+                    pending = None
+                continue
+
+            rock_ridge = self._rock_ridge(record) if self.susp_skip is not None else {}
+            name = rock_ridge.get("name")
+            name = name.decode("utf-8", "surrogateescape") if name else _iso_name(raw_name)
+            mode = rock_ridge.get("mode")
+            if mode is None:
+                mode = stat.S_IFDIR | 0o755 if flags & FLAG_DIRECTORY else stat.S_IFREG | 0o644
+            entry = ISOEntry(f"{parent}/{name}" if parent else name, mode, record_time(record[18:25]), extent[1], [extent])
+            entry.uid = rock_ridge.get("uid", 0)
+            entry.gid = rock_ridge.get("gid", 0)
+            entry.nlink = rock_ridge.get("nlink", 1)
+            if "link" in rock_ridge:
+                entry.link_target = rock_ridge["link"].decode("utf-8", "surrogateescape")
+                entry.size = 0
+            if flags & FLAG_MULTI_EXTENT:
+                pending = entry
+                continue
+            yield entry
+
+    def walk(self):
+        # Parents before children, in directory order
+        stack = [iter(self.listdir(None))]
+        visited = set()
+        while stack:
+            entry = next(stack[-1], None)
+            if entry is None:
+                stack.pop()
+                continue
+            yield entry
+            if entry.is_dir() and entry.extents[0] not in visited:
+                visited.add(entry.extents[0])
+                stack.append(iter(self.listdir(entry)))
+
+    def find(self, path):
+        # Case-insensitive lookup, since plain ISO9660 names are upper case
+        directory = None
+        parts = [part for part in path.strip("/").split("/") if part]
+        for index, part in enumerate(parts):
+            for entry in self.listdir(directory):
+                if entry.path.rsplit("/", 1)[-1].lower() == part.lower():
+                    break
+            else:
+                return None
+            if index < len(parts) - 1 and not entry.is_dir():
+                return None
+            directory = entry
+        return directory
+
+    def contents(self, entry):
+        # The file's bytes as memoryview slices of the map; no copies
+        return [self.data[offset:offset + length] for offset, length in entry.extents if length]
+
+    def contiguous(self, entry):
+        # One memoryview over the whole file, if its extents are adjacent
+        extents = entry.extents
+        for (offset, length), (next_offset, _) in zip(extents, extents[1:]):
+            if offset + length != next_offset:
+                return None
+        start = extents[0][0]
+        return self.data[start:start + entry.size]
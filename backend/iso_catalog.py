@@ -0,0 +1,250 @@
+import hashlib
+import mmap
+import os
+import re
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import Boolean, Float, Integer, String, create_engine, delete, or_, select
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, sessionmaker
+
+from backend.iso9660 import DESCRIPTORS_START, MAX_DESCRIPTORS, SECTOR_SIZE
+from backend.iso_manager import CHUNK_SIZE, OBJECTS_DIR
+from backend.paths import data_path
+
+# First match wins; checked against the volume label, then the publisher and
+# application fields
+OS_PATTERNS = [
+    ("Ubuntu", re.compile(r"ubuntu|kubuntu|xubuntu|lubuntu", re.I)),
+    ("Linux Mint", re.compile(r"linux ?mint", re.I)),
+    ("Debian", re.compile(r"debian", re.I)),
+    ("Fedora", re.compile(r"fedora", re.I)),
+    ("CentOS", re.compile(r"centos", re.I)),
+    ("Rocky Linux", re.compile(r"rocky", re.I)),
+    ("AlmaLinux", re.compile(r"alma", re.I)),
+    ("RHEL", re.compile(r"^rhel|red ?hat", re.I)),
+    ("openSUSE", re.compile(r"opensuse|suse", re.I)),
+    ("Arch Linux", re.compile(r"^arch_|arch ?linux", re.I)),
+    ("Alpine", re.compile(r"alpine", re.I)),
+    ("Kali", re.compile(r"kali", re.I)),
+    ("FreeBSD", re.compile(r"freebsd", re.I)),
+    ("Windows", re.compile(r"^(ccsa|ccco|cpba|cena|j?ccoma|win|ssscoma)|windows", re.I)),
+]
+
+
+def _text(data):
+    return data.decode("ascii", "replace").strip(" \x00") or None
+
+
+def read_volume_info(path):
+    # Reads the ISO9660 volume descriptors at sector 16 onwards through mmap,
+    # so only those few pages come off the disk. Empty dict if the file has
+    # no ISO9660 primary volume descriptor (e.g. UDF-only images).
+    info = {}
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < DESCRIPTORS_START + SECTOR_SIZE:
+            return info
+        length = min(size, DESCRIPTORS_START + MAX_DESCRIPTORS * SECTOR_SIZE)
+        with mmap.mmap(f.fileno(), length, access=mmap.ACCESS_READ) as view:
+            for offset in range(DESCRIPTORS_START, length - SECTOR_SIZE + 1, SECTOR_SIZE):
+                kind = view[offset]
+                if view[offset + 1:offset + 6] != b"CD001":
+                    if view[offset + 1:offset + 6] in (b"BEA01", b"NSR02", b"NSR03"):
+                        info.setdefault("filesystem", "udf")
+                        continue
+                    break
+                if kind == 255:  # Set terminator
+                    break
+                if kind == 0:  # El Torito boot record
+                    info["bootable"] = True
+                elif kind == 1 and "volume_label" not in info:
+                    info["filesystem"] = "iso9660"
+                    info["system_id"] = _text(view[offset + 8:offset + 40])
+                    info["volume_label"] = _text(view[offset + 40:offset + 72])
+                    info["volume_size"] = int.from_bytes(view[offset + 80:offset + 84], "little") * SECTOR_SIZE
+                    info["publisher"] = _text(view[offset + 318:offset + 446])
+                    info["application"] = _text(view[offset + 574:offset + 702])
+    info["os"] = detect_os(info)
+    return info
+
+
+def detect_os(info):
+    for field in ("volume_label", "publisher", "application"):
+        value = info.get(field)
+        if not value:
+            continue
+        for name, pattern in OS_PATTERNS:
+            if pattern.search(value):
+                return name
+    return None
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class ISOImage(Base):
+    __tablename__ = "isos"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    path: Mapped[str] = mapped_column(String, unique=True, index=True)
+    name: Mapped[str] = mapped_column(String, index=True)
+    size: Mapped[int] = mapped_column(Integer, default=0)
+    mtime_ns: Mapped[int] = mapped_column(Integer, default=0)
+    inode: Mapped[int] = mapped_column(Integer, default=0)
+    digest: Mapped[Optional[str]] = mapped_column(String, nullable=True, index=True)
+    volume_label: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    system_id: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    publisher: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    application: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    filesystem: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    bootable: Mapped[bool] = mapped_column(Boolean, default=False)
+    os: Mapped[Optional[str]] = mapped_column(String, nullable=True, index=True)
+    scanned_at: Mapped[float] = mapped_column(Float, default=time.time)
+
+    @property
+    def short_digest(self):
+        return self.digest[:12] if self.digest else None
+
+
+# Persistent index of the ISO directory, in SQLite. scan() is incremental:
+# the directory is only re-listed when its mtime moves, every listed file is
+# re-stat'ed (so ISOs overwritten in place are noticed), and only files whose
+# size, mtime or inode changed get their volume descriptors re-read. Digests
+# of files in the content-addressed store come from the object they link to;
+# stray files dropped into the directory by hand get one from hash_missing(),
+# which reads them in full and belongs on a worker.
+class ISOCatalog:
+    def __init__(self, iso_dir, path=None):
+        self.iso_dir = iso_dir
+        self.path = path or data_path("isos.db")
+        self._lock = threading.Lock()
+        self._sessions = None
+        self._dir_mtime_ns = None
+        self._dir_paths = []
+
+    def _session(self):
+        with self._lock:
+            if self._sessions is None:
+                engine = create_engine(
+                    f"sqlite:///{self.path}",
+                    connect_args={"check_same_thread": False}
+                )
+                Base.metadata.create_all(engine)
+                self._sessions = sessionmaker(engine, expire_on_commit=False)
+            return self._sessions()
+
+    def _object_digests(self):
+        digests = {}
+        objects_dir = os.path.join(self.iso_dir, OBJECTS_DIR)
+        try:
+            entries = list(os.scandir(objects_dir))
+        except OSError:
+            return digests
+        for entry in entries:
+            if entry.name.endswith('.iso'):
+                try:
+                    digests[os.stat(entry.path).st_ino] = entry.name[:-len('.iso')]
+                except OSError:
+                    continue
+        return digests
+
+    def scan(self, force=False):
+        # Returns (added or changed, removed) counts
+        try:
+            dir_mtime_ns = os.stat(self.iso_dir).st_mtime_ns
+        except OSError:
+            return 0, 0
+        if force or dir_mtime_ns != self._dir_mtime_ns:
+            self._dir_paths = [
+                entry.path for entry in os.scandir(self.iso_dir)
+                if entry.name.endswith('.iso') and not entry.name.startswith('.') and entry.is_file()
+            ]
+
+        # os.stat rather than DirEntry.stat(): on Windows the latter always
+        # reports st_ino == 0, which would never match an object in the store
+        on_disk = {}
+        for path in self._dir_paths:
+            try:
+                on_disk[path] = os.stat(path)
+            except OSError:
+                continue
+
+        changed = 0
+        object_digests = None
+        with self._session() as session, session.begin():
+            rows = {row.path: row for row in session.scalars(select(ISOImage))}
+            for path, st in on_disk.items():
+                row = rows.get(path)
+                if row is not None and (row.size, row.mtime_ns, row.inode) == (st.st_size, st.st_mtime_ns, st.st_ino):
+                    continue
+                if object_digests is None:
+                    object_digests = self._object_digests()
+                try:
+                    info = read_volume_info(path)
+                except (OSError, ValueError):
+                    info = {}
+                if row is None:
+                    row = ISOImage(path=path)
+                    session.add(row)
+                row.name = os.path.basename(path)
+                row.size = st.st_size
+                row.mtime_ns = st.st_mtime_ns
+                row.inode = st.st_ino
+                row.digest = object_digests.get(st.st_ino)
+                row.volume_label = info.get("volume_label")
+                row.system_id = info.get("system_id")
+                row.publisher = info.get("publisher")
+                row.application = info.get("application")
+                row.filesystem = info.get("filesystem")
+                row.bootable = bool(info.get("bootable"))
+                row.os = info.get("os")
+                row.scanned_at = time.time()
+                changed += 1
+            gone = [path for path in rows if path not in on_disk]
+            if gone:
+                session.execute(delete(ISOImage).where(ISOImage.path.in_(gone)))
+        self._dir_mtime_ns = dir_mtime_ns
+        return changed, len(gone)
+
+    def list(self, search=None, os_name=None, bootable=None):
+        # Sorted by name; search matches the file name or the volume label
+        query = select(ISOImage).order_by(ISOImage.name)
+        if search:
+            pattern = f"%{search}%"
+            query = query.where(or_(ISOImage.name.ilike(pattern), ISOImage.volume_label.ilike(pattern)))
+        if os_name is not None:
+            query = query.where(ISOImage.os == os_name)
+        if bootable is not None:
+            query = query.where(ISOImage.bootable == bootable)
+        with self._session() as session:
+            return list(session.scalars(query))
+
+    def get(self, path):
+        with self._session() as session:
+            return session.scalar(select(ISOImage).where(ISOImage.path == path))
+
+    def hash_missing(self, progress=None, cancelled=None):
+        # Full reads; only for ISOs that did not come through import_iso()
+        pending = [row for row in self.list() if row.digest is None]
+        for index, row in enumerate(pending):
+            if cancelled is not None and cancelled():
+                break
+            if progress:
+                progress(int(index * 100 / len(pending)), f"Hashing {row.name}")
+            digest = hashlib.sha256()
+            try:
+                with open(row.path, 'rb', buffering=0) as f:
+                    while chunk := f.read(CHUNK_SIZE):
+                        digest.update(chunk)
+            except OSError:
+                continue
+            with self._session() as session, session.begin():
+                stored = session.get(ISOImage, row.id)
+                if stored is not None and stored.mtime_ns == row.mtime_ns:
+                    stored.digest = digest.hexdigest()
+        if progress:
+            progress(100, f"Hashed {len(pending)} ISOs")
+        return len(pending)
@@ -0,0 +1,250 @@
+import hashlib
+import json
+import os
+import stat
+import tarfile
+import threading
+
+from backend.iso9660 import ISO9660
+from backend.iso_manager import CHUNK_SIZE
+from backend.squashfs import SquashFS, is_squashfs
+
+ISO_LABEL = "disposablebox.iso-sha256"
+ISO_REPOSITORY = "disposablebox-iso"
+DEFAULT_CMD = '["/bin/sh"]'  # Imported filesystems have no CMD; boxes need one to start
+FLUSH_SIZE = 2 ** 20  # Headers and small files are sent in pieces of about this size
+PROGRESS_EVERY = 64 * 2 ** 20
+
+# Where live ISOs keep their root filesystem, most specific first
+ROOTFS_CANDIDATES = (
+    "casper/filesystem.squashfs",  # Ubuntu, Mint
+    "casper/minimal.squashfs",  # Ubuntu 23.04+ layered images: the complete base layer
+    "live/filesystem.squashfs",  # Debian live, Kali
+    "LiveOS/squashfs.img",  # Fedora, RHEL family
+    "arch/x86_64/airootfs.sfs",  # Arch
+    "boot/x86_64/loader/squashfs.img",
+)
+ROOTFS_SUFFIXES = (".squashfs", ".sfs", ".sqfs", ".img")
+NESTED_IMAGES = (b"LiveOS/rootfs.img", b"LiveOS/ext3fs.img")
+
+
+class ISOImageError(Exception):
+    pass
+
+
+def _tar_info(path, mode, uid, gid, mtime):
+    info = tarfile.TarInfo(path)
+    info.mode = stat.S_IMODE(mode)
+    info.uid = uid
+    info.gid = gid
+    info.mtime = mtime
+    return info
+
+
+def find_rootfs(iso):
+    # ISOEntry of the squashfs holding the live root filesystem, or None
+    for path in ROOTFS_CANDIDATES:
+        entry = iso.find(path)
+        if entry is not None and entry.is_file():
+            data = iso.contiguous(entry)
+            if data is not None and is_squashfs(data):
+                return entry
+    best = None
+    for entry in iso.walk():
+        if not entry.is_file() or not entry.path.lower().endswith(ROOTFS_SUFFIXES):
+            continue
+        if best is not None and entry.size <= best.size:
+            continue
+        data = iso.contiguous(entry)
+        if data is not None and is_squashfs(data):
+            best = entry
+    return best
+
+
+def nested_root_image(fs):
+    # Older Fedora-style media put an ext4 image inside the squashfs
+    root = fs.inode(fs.root_inode)
+    for name, ref in fs.listdir(root):
+        if name == b"LiveOS":
+            for child, _ in fs.listdir(fs.inode(ref)):
+                if b"LiveOS/" + child in NESTED_IMAGES:
+                    return (b"LiveOS/" + child).decode()
+    return None
+
+
+def squashfs_members(fs):
+    # (TarInfo, content buffers or None) for everything below the root
+    first_paths = {}  # inode number -> first path, for hard links
+    for raw_path, inode in fs.walk():
+        if not raw_path:
+            continue
+        path = raw_path.decode("utf-8", "surrogateescape")
+        info = _tar_info(path, inode.mode, inode.uid, inode.gid, inode.mtime)
+        content = None
+        if inode.is_dir():
+            info.type = tarfile.DIRTYPE
+        elif inode.is_file():
+            if inode.nlink > 1:
+                first = first_paths.setdefault(inode.number, path)
+                if first != path:
+                    info.type = tarfile.LNKTYPE
+                    info.linkname = first
+                    yield info, None
+                    continue
+            info.size = inode.size
+            content = fs.read(inode)
+        elif stat.S_ISLNK(inode.mode):
+            info.type = tarfile.SYMTYPE
+            info.linkname = inode.link_target.decode("utf-8", "surrogateescape")
+        elif stat.S_ISCHR(inode.mode) or stat.S_ISBLK(inode.mode):
+            info.type = tarfile.CHRTYPE if stat.S_ISCHR(inode.mode) else tarfile.BLKTYPE
+            info.devmajor = inode.major
+            info.devminor = inode.minor
+        elif stat.S_ISFIFO(inode.mode):
+            info.type = tarfile.FIFOTYPE
+        else:
+            continue  # Sockets cannot be archived
+        yield info, content
+
+
+def iso_members(iso):
+    # The ISO9660 tree itself, for ISOs without a squashfs root
+    for entry in iso.walk():
+        info = _tar_info(entry.path, entry.mode, entry.uid, entry.gid, entry.mtime)
+        content = None
+        if entry.is_dir():
+            info.type = tarfile.DIRTYPE
+        elif entry.link_target is not None:
+            info.type = tarfile.SYMTYPE
+            info.linkname = entry.link_target
+        elif entry.is_file():
+            info.size = entry.size
+            content = iso.contents(entry)
+        else:
+            continue
+        yield info, content
+
+
+def tar_stream(members, progress=None, cancelled=None):
+    # A tar archive as a generator of buffers, built while it is consumed.
+    # Large buffers (whole squashfs blocks, ISO extents) are passed through
+    # as they are; headers and small files are gathered up to FLUSH_SIZE.
+    pending = bytearray()
+    sent = 0
+    reported = 0
+    for info, content in members:
+        if cancelled is not None and cancelled():
+            raise ISOImageError("Image import cancelled")
+        pending += info.tobuf(tarfile.PAX_FORMAT, "utf-8", "surrogateescape")
+        if content is not None:
+            written = 0
+            for chunk in content:
+                written += len(chunk)
+                if len(chunk) >= FLUSH_SIZE:
+                    if pending:
+                        yield pending
+                        pending = bytearray()
+                    yield chunk
+                else:
+                    pending += chunk
+                    if len(pending) >= FLUSH_SIZE:
+                        yield pending
+                        pending = bytearray()
+            if written != info.size:
+                raise ISOImageError(f"{info.name}: expected {info.size} bytes, read {written}")
+            pending += bytes(-info.size % tarfile.BLOCKSIZE)
+            sent += written
+        if progress and sent - reported >= PROGRESS_EVERY:
+            reported = sent
+            progress(-1, f"Streamed {sent / 2 ** 20:.0f} MiB of the root filesystem")
+    pending += bytes(2 * tarfile.BLOCKSIZE)
+    yield pending
+
+
+def iso_digest(path, cancelled=None):
+    digest = hashlib.sha256()
+    with open(path, 'rb', buffering=0) as f:
+        while chunk := f.read(CHUNK_SIZE):
+            if cancelled is not None and cancelled():
+                raise ISOImageError("Image import cancelled")
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Turns an ISO into a Docker image without unpacking it anywhere: the ISO
+# is mmapped, the live root filesystem (a squashfs inside it, or the ISO's
+# own tree if there is none) is walked in place, and its tar is generated
+# while import_image uploads it. Images are labelled with the ISO's
+# SHA-256, so importing the same ISO again only costs a label lookup.
+class ISOImageBuilder:
+    def __init__(self, docker_service, iso_manager=None):
+        self.docker_service = docker_service
+        self.iso_manager = iso_manager
+        self._lock = threading.Lock()
+        self._digest_locks = {}  # ISO digest -> lock, so one ISO is imported once
+
+    def find_image(self, digest):
+        rows = self.docker_service.client.api.images(filters={"label": f"{ISO_LABEL}={digest}"})
+        return rows[0]["Id"] if rows else None
+
+    def digest(self, iso_path, cancelled=None):
+        # Free for ISOs in the content-addressed store, a full read otherwise
+        if self.iso_manager is not None:
+            digest = self.iso_manager.digest_of(iso_path)
+            if digest:
+                return digest
+        return iso_digest(iso_path, cancelled)
+
+    def build(self, iso_path, progress=None, cancelled=None):
+        name = os.path.basename(iso_path)
+        if progress:
+            progress(-1, f"Identifying {name}")
+        digest = self.digest(iso_path, cancelled)
+        with self._lock:
+            digest_lock = self._digest_locks.setdefault(digest, threading.Lock())
+        with digest_lock:
+            image_id = self.find_image(digest)
+            if image_id:
+                if progress:
+                    progress(100, f"Reusing image {image_id[7:19]} imported from {name}")
+                return image_id
+            return self._import(iso_path, digest, progress, cancelled)
+
+    def _import(self, iso_path, digest, progress, cancelled):
+        name = os.path.basename(iso_path)
+        with ISO9660(iso_path) as iso:
+            rootfs = find_rootfs(iso)
+            if rootfs is not None:
+                fs = SquashFS(iso.contiguous(rootfs))
+                nested = nested_root_image(fs)
+                if nested:
+                    raise ISOImageError(f"{rootfs.path} in {name} wraps a disk image ({nested}), not a root filesystem")
+                members = squashfs_members(fs)
+                source = f"{rootfs.path} ({fs.compression})"
+            else:
+                members = iso_members(iso)
+                source = "the ISO9660 filesystem"
+            if progress:
+                progress(-1, f"Importing {source} from {name}")
+            result = self.docker_service.client.api.import_image(
+                src=tar_stream(members, progress, cancelled),
+                repository=ISO_REPOSITORY,
+                tag=digest[:12],
+                changes=[f"LABEL {ISO_LABEL}={digest}", f"CMD {DEFAULT_CMD}"],
+                stream_src=True
+            )
+
+        image_id = None
+        for line in (result or "").splitlines():
+            try:
+                status = json.loads(line).get("status", "")
+            except ValueError:
+                continue
+            if status.startswith("sha256:"):
+                image_id = status
+        image_id = image_id or self.find_image(digest)
+        if image_id is None:
+            raise ISOImageError(f"Import of {name} finished without producing an image")
+        if progress:
+            progress(100, f"Imported {name} as {ISO_REPOSITORY}:{digest[:12]}")
+        return image_id
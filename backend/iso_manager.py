@@ -1,21 +1,220 @@
+import hashlib
+import json
 import os
+import shutil
+import stat
+import threading
+import time
 
+CHUNK_SIZE = 8 * 2 ** 20  # Large enough that per-chunk overhead vanishes on multi-GB ISOs
+OBJECTS_DIR = ".objects"
+SOURCES_FILE = "sources.json"  # Source identity -> digest, to skip re-reading known files
+PART_MAX_AGE = 24 * 3600  # Seconds an abandoned .part file is kept for resuming
+
+
+def source_key(path):
+    # Identifies one version of a source file without reading it
+    st = os.stat(path)
+    return f"{st.st_dev}:{st.st_ino}:{st.st_size}:{st.st_mtime_ns}"
+
+
+# ISOs live in a content-addressed store: .objects/<sha256>.iso holds the
+# bytes and every visible <name>.iso in the ISO directory is a hardlink to
+# one object. Importing streams the source through one buffer, hashing and
+# writing in the same pass, into a .part file keyed by the source's
+# identity; an interrupted import picks up from the end of that file.
+# Identical content under another name costs a link, not a copy, and a
+# changed file under a known name replaces the old content.
 class ISOManager:
-    def __init__(self, settings):
+    def __init__(self, settings=None, iso_dir=None):
         self.settings = settings
-        self.iso_dir = os.path.join(os.path.expanduser("~"), "container_isos")
-        os.makedirs(self.iso_dir, exist_ok=True)
-    
+        self.iso_dir = iso_dir or os.path.join(os.path.expanduser("~"), "container_isos")
+        self.objects_dir = os.path.join(self.iso_dir, OBJECTS_DIR)
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._key_locks = {}  # source key -> lock, so one source is copied once
+        self._sources = self._load_sources()
+        self._catalog = None
+
+    @property
+    def catalog(self):
+        if self._catalog is None:
+            from backend.iso_catalog import ISOCatalog  # SQLAlchemy is only needed from here on
+            self._catalog = ISOCatalog(self.iso_dir)
+        return self._catalog
+
+    def list_isos(self, search=None, os_name=None, bootable=None):
+        # Catalog rows (size, digest, volume label, OS, ...), rescanned only
+        # if the directory changed since the last call
+        self.catalog.scan()
+        return self.catalog.list(search=search, os_name=os_name, bootable=bootable)
+
     def get_iso_list(self):
-        isos = []
-        for file in os.listdir(self.iso_dir):
-            if file.endswith('.iso'):
-                isos.append(os.path.join(self.iso_dir, file))
-        return isos
-    
-    def import_iso(self, source_path):
-        dest_path = os.path.join(self.iso_dir, os.path.basename(source_path))
-        if not os.path.exists(dest_path):
-            import shutil
-            shutil.copy2(source_path, dest_path)
+        return [iso.path for iso in self.list_isos()]
+
+    def object_path(self, digest):
+        return os.path.join(self.objects_dir, f"{digest}.iso")
+
+    def digest_of(self, iso_path):
+        # Digest of an imported ISO, from the object it links to
+        st = os.stat(iso_path)
+        for name in os.listdir(self.objects_dir):
+            if name.endswith('.iso'):
+                object_st = os.stat(os.path.join(self.objects_dir, name))
+                if (object_st.st_dev, object_st.st_ino) == (st.st_dev, st.st_ino):
+                    return name[:-len('.iso')]
+        return None
+
+    def _load_sources(self):
+        try:
+            with open(os.path.join(self.objects_dir, SOURCES_FILE), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_sources(self):
+        path = os.path.join(self.objects_dir, SOURCES_FILE)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._sources, f)
+        os.replace(tmp_path, path)
+
+    def import_iso(self, source_path, name=None, progress=None, cancelled=None):
+        # Blocking; run it on a worker. Returns the path of the imported ISO.
+        name = os.path.basename(name or source_path)
+        if name.startswith('.') or not name:
+            raise ValueError(f"Invalid ISO name: {name!r}")
+        key = source_key(source_path)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                digest = self._sources.get(key)
+            part_path = None
+            if digest and os.path.exists(self.object_path(digest)):
+                if progress:
+                    progress(100, f"{name} is already in the store ({digest[:12]})")
+            else:
+                digest, part_path = self._copy(source_path, key, name, progress, cancelled)
+            # Publishing and linking share the lock with collect_garbage(),
+            # which would otherwise see the new object with no names yet
+            with self._lock:
+                if part_path is not None:
+                    self._publish(source_path, part_path, digest, name, progress)
+                    self._sources[key] = digest
+                    self._save_sources()
+                dest_path = self._link(digest, name)
+        self.collect_garbage()
+        if self.settings is not None:
+            self.settings.set_last_iso_path(source_path)
         return dest_path
+
+    def _part_path(self, key):
+        return os.path.join(self.objects_dir, hashlib.sha256(key.encode()).hexdigest()[:32] + ".part")
+
+    def _copy(self, source_path, key, name, progress, cancelled):
+        part_path = self._part_path(key)
+        total = os.path.getsize(source_path)
+        digest = hashlib.sha256()
+        buffer = bytearray(CHUNK_SIZE)
+        view = memoryview(buffer)
+
+        def report(done, message):
+            if progress:
+                progress(int(done * 100 / total) if total else 100, message)
+
+        with open(source_path, 'rb', buffering=0) as src, open(part_path, 'ab+', buffering=0) as dst:
+            # Resume: the bytes already in the .part file came from this
+            # exact source version; they are re-hashed, not re-copied
+            done = os.fstat(dst.fileno()).st_size
+            if done > total:
+                dst.truncate(0)
+                done = 0
+            dst.seek(0)
+            while dst.tell() < done:
+                count = dst.readinto(view[:min(CHUNK_SIZE, done - dst.tell())])
+                digest.update(view[:count])
+            if done:
+                report(done, f"Resuming {name} at {done / 2 ** 20:.0f} MiB")
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(src.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            src.seek(done)
+            last_percent = -1
+            while True:
+                if cancelled is not None and cancelled():
+                    raise Exception(f"Import of {name} cancelled; it resumes from {done / 2 ** 20:.0f} MiB")
+                count = src.readinto(view)
+                if not count:
+                    break
+                digest.update(view[:count])
+                dst.write(view[:count])
+                done += count
+                percent = int(done * 100 / total) if total else 100
+                if percent != last_percent:
+                    last_percent = percent
+                    report(done, f"Importing {name}: {done / 2 ** 20:.0f} of {total / 2 ** 20:.0f} MiB")
+            os.fsync(dst.fileno())
+
+        return digest.hexdigest(), part_path
+
+    def _publish(self, source_path, part_path, digest, name, progress):
+        object_path = self.object_path(digest)
+        if os.path.exists(object_path):
+            os.unlink(part_path)
+            message = f"{name} has the same content as an ISO already in the store ({digest[:12]})"
+        else:
+            shutil.copystat(source_path, part_path)
+            if os.name != "nt":
+                # Shared by every name that links it. Not on Windows, where
+                # this is the read-only attribute and unlink/replace of any
+                # of those names would fail.
+                os.chmod(part_path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+            os.replace(part_path, object_path)
+            message = f"Imported {name} ({digest[:12]})"
+        if progress:
+            progress(100, message)
+
+    def _link(self, digest, name):
+        object_path = self.object_path(digest)
+        dest_path = os.path.join(self.iso_dir, name)
+        if os.path.exists(dest_path) and os.path.samefile(dest_path, object_path):
+            return dest_path
+        tmp_path = os.path.join(self.iso_dir, f".{name}.{threading.get_ident()}.tmp")
+        try:
+            os.link(object_path, tmp_path)
+        except OSError:
+            shutil.copy2(object_path, tmp_path)  # Filesystems without hardlinks
+        os.replace(tmp_path, dest_path)
+        return dest_path
+
+    def remove_iso(self, iso_path):
+        os.unlink(iso_path)
+        self.collect_garbage()
+
+    def collect_garbage(self):
+        # Objects that no visible name links to any more, and their source
+        # entries. Also .part files of imports that are not running and were
+        # not touched for PART_MAX_AGE, e.g. left behind when the source
+        # changed after an interrupted import and so got a new key.
+        removed = []
+        with self._lock:
+            live_parts = {
+                os.path.basename(self._part_path(key))
+                for key, key_lock in self._key_locks.items() if key_lock.locked()
+            }
+            cutoff = time.time() - PART_MAX_AGE
+            for file in os.listdir(self.objects_dir):
+                path = os.path.join(self.objects_dir, file)
+                if file.endswith('.iso') and os.stat(path).st_nlink == 1:
+                    os.unlink(path)
+                    removed.append(file[:-len('.iso')])
+                elif file.endswith('.part') and file not in live_parts:
+                    try:
+                        if os.stat(path).st_mtime < cutoff:
+                            os.unlink(path)
+                    except OSError:
+                        pass
+            if removed:
+                self._sources = {key: digest for key, digest in self._sources.items() if digest not in removed}
+                self._save_sources()
+        return removed
@@ -0,0 +1,94 @@
+import threading
+from collections import deque
+
+DEFAULT_CAPACITY = 20000
+DEFAULT_TAIL = 1000
+
+
+# Follows `docker logs -f` for one container on a background thread. Lines
+# land in a fixed-capacity ring buffer (the history) and in a bounded
+# pending queue that the viewer drains once per frame, so a chatty container
+# can never grow memory or force one repaint per line.
+class LogStream:
+    def __init__(self, docker_service, container_id, capacity=DEFAULT_CAPACITY, tail=DEFAULT_TAIL):
+        self.docker_service = docker_service
+        self.container_id = container_id
+        self.capacity = capacity
+        self.tail = tail
+        self.history = deque(maxlen=capacity)
+        self.total_lines = 0
+        self.dropped_lines = 0
+        self.error = None
+        self._pending = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._stream = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"logs-{self.container_id[:12]}",
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        stream = self._stream
+        if stream is not None:
+            try:
+                stream.close()
+            except Exception:
+                pass
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        partial = b""
+        try:
+            self._stream = self.docker_service.client.api.logs(
+                self.container_id,
+                stream=True,
+                follow=True,
+                tail=self.tail
+            )
+            for chunk in self._stream:
+                if self._stop.is_set():
+                    break
+                chunk = partial + chunk
+                lines = chunk.split(b"\n")
+                partial = lines.pop()
+                if lines:
+                    self._append([line.decode("utf-8", errors="replace") for line in lines])
+            if partial:
+                self._append([partial.decode("utf-8", errors="replace")])
+        except Exception as e:
+            if not self._stop.is_set():
+                self.error = str(e)
+        finally:
+            self._stream = None
+
+    def _append(self, lines):
+        with self._lock:
+            overflow = len(self._pending) + len(lines) - self.capacity
+            if overflow > 0:
+                self.dropped_lines += overflow
+            self._pending.extend(lines)
+            self.history.extend(lines)
+            self.total_lines += len(lines)
+
+    def drain(self):
+        # Lines received since the previous drain (at most `capacity`)
+        with self._lock:
+            lines = list(self._pending)
+            self._pending.clear()
+        return lines
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.history)
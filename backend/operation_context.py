@@ -0,0 +1,27 @@
+import threading
+
+
+class OperationCancelled(Exception):
+    pass
+
+
+# Qt-free stand-in for Operation, for running container actions outside
+# the GUI (API server, CLI). Progress goes to an optional callback.
+class OperationContext:
+    def __init__(self, progress=None):
+        self.progress = progress
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def is_cancelled(self):
+        return self._cancelled.is_set()
+
+    def check_cancelled(self):
+        if self._cancelled.is_set():
+            raise OperationCancelled()
+
+    def report_progress(self, percent, message=""):
+        if self.progress is not None:
+            self.progress(percent, message)
@@ -0,0 +1,125 @@
+import threading
+from collections import deque
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from backend.operation_context import OperationCancelled
+
+DEFAULT_MAX_WORKERS = 8
+
+
+class OperationSignals(QObject):
+    started = pyqtSignal()
+    progress = pyqtSignal(int, str)  # percent (-1 if unknown), message
+    finished = pyqtSignal(object)
+    error = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+
+class Operation(QRunnable):
+    # Same contract as AsyncWorker, except that func receives the operation
+    # as its first argument so it can report progress and check for
+    # cancellation between blocking calls
+    def __init__(self, queue, key, func, args, kwargs):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.queue = queue
+        self.key = key
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = OperationSignals()
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def is_cancelled(self):
+        return self._cancelled.is_set()
+
+    def check_cancelled(self):
+        if self._cancelled.is_set():
+            raise OperationCancelled()
+
+    def report_progress(self, percent, message=""):
+        self.signals.progress.emit(percent, message)
+
+    def run(self):
+        try:
+            self.check_cancelled()
+            self.signals.started.emit()
+            result = self.func(self, *self.args, **self.kwargs)
+            self.check_cancelled()
+            self.signals.finished.emit(result)
+        except OperationCancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            self.signals.error.emit(str(e))
+        finally:
+            self.queue._operation_done(self)
+
+
+# Bounded executor for every blocking Docker call made from the GUI.
+# Operations submitted with the same key (a container id) run strictly one
+# after another, so two actions never race on the same container, while
+# operations on different keys run in parallel up to max_workers.
+class OperationQueue(QObject):
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_workers)
+        self._lock = threading.Lock()
+        self._pending = {}  # key -> deque of operations waiting for that key
+        self._running = set()
+
+    def create(self, func, *args, key=None, **kwargs):
+        # Build an operation without scheduling it, so callers can connect
+        # its signals before it has any chance to emit them
+        return Operation(self, key, func, args, kwargs)
+
+    def submit(self, func, *args, key=None, **kwargs):
+        return self.start(self.create(func, *args, key=key, **kwargs))
+
+    def start(self, operation):
+        key = operation.key
+        with self._lock:
+            if key is not None and self._is_busy(key):
+                self._pending.setdefault(key, deque()).append(operation)
+                return operation
+            self._running.add(operation)
+        self.pool.start(operation)
+        return operation
+
+    def _is_busy(self, key):
+        return key in self._pending or any(op.key == key for op in self._running)
+
+    def _operation_done(self, operation):
+        next_operation = None
+        with self._lock:
+            self._running.discard(operation)
+            waiting = self._pending.get(operation.key)
+            if waiting:
+                next_operation = waiting.popleft()
+                if not waiting:
+                    del self._pending[operation.key]
+                self._running.add(next_operation)
+        if next_operation is not None:
+            self.pool.start(next_operation)
+
+    def is_busy(self, key):
+        with self._lock:
+            return self._is_busy(key)
+
+    def cancel(self, key=None):
+        # Cancel running and queued operations for one key, or all of them
+        with self._lock:
+            operations = list(self._running)
+            for waiting in self._pending.values():
+                operations.extend(waiting)
+        for operation in operations:
+            if key is None or operation.key == key:
+                operation.cancel()
+
+    def shutdown(self, timeout_ms=5000):
+        self.cancel()
+        return self.pool.waitForDone(timeout_ms)
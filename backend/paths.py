@@ -0,0 +1,29 @@
+import os
+
+# Per-user directory for caches and catalogs kept between runs
+DATA_DIR = os.path.join(os.path.expanduser("~"), ".disposablebox")
+
+# Per-user directory for preferences: %APPDATA% on Windows, the XDG config
+# directory elsewhere. DISPOSABLEBOX_CONFIG_DIR overrides both.
+if os.environ.get("DISPOSABLEBOX_CONFIG_DIR"):
+    CONFIG_DIR = os.environ["DISPOSABLEBOX_CONFIG_DIR"]
+elif os.name == "nt" and os.environ.get("APPDATA"):
+    CONFIG_DIR = os.path.join(os.environ["APPDATA"], "DisposableBox")
+else:
+    CONFIG_DIR = os.path.join(
+        os.environ.get("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config"),
+        "disposablebox"
+    )
+
+
+def data_path(*parts):
+    os.makedirs(DATA_DIR, exist_ok=True)
+    return os.path.join(DATA_DIR, *parts)
+
+
+def config_path(*parts):
+    os.makedirs(CONFIG_DIR, exist_ok=True)
+    return os.path.join(CONFIG_DIR, *parts)
+
+# Host directories bind-mounted into boxes as /workspace, one per container
+WORKSPACE_DIR = os.path.join(os.path.expanduser("~"), "docker_workspace")
@@ -0,0 +1,31 @@
+# Preset images offered by the dialog (and prefetched in the background)
+IMAGE_VERSIONS = {
+    "Ubuntu": ["22.04", "20.04", "18.04", "latest"],
+    "Debian": ["12", "11", "10", "latest"],
+    "Alpine": ["3.19", "3.18", "3.17", "latest"],
+    "CentOS": ["7", "latest"],
+    "Fedora": ["39", "38", "latest"],
+    "Python": ["3.12", "3.11", "3.10", "latest"],
+    "Node.js": ["20", "18", "16", "latest"],
+    "Nginx": ["1.24", "1.22", "latest"],
+    "Redis": ["7.2", "7.0", "latest"],
+    "PostgreSQL": ["16", "15", "14", "latest"],
+    "MySQL": ["8.2", "8.0", "latest"],
+    "MongoDB": ["7.0", "6.0", "latest"]
+}
+
+
+def preset_image_name(image_type):
+    image_type = image_type.lower()
+    # Special case for Node.js
+    if image_type == "node.js":
+        image_type = "node"
+    return image_type
+
+
+def preset_images():
+    return [
+        f"{preset_image_name(image_type)}:{version}"
+        for image_type, versions in IMAGE_VERSIONS.items()
+        for version in versions
+    ]
@@ -0,0 +1,143 @@
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+TTL_LABEL = "disposablebox.ttl"  # Seconds after creation
+IDLE_LABEL = "disposablebox.idle-timeout"  # Seconds after the container last stopped
+DEFAULT_CONCURRENCY = 4
+DEFAULT_INTERVAL = 60  # Seconds between passes
+
+
+def expiry_labels(ttl=None, idle_timeout=None):
+    labels = {}
+    if ttl:
+        labels[TTL_LABEL] = str(int(ttl))
+    if idle_timeout:
+        labels[IDLE_LABEL] = str(int(idle_timeout))
+    return labels
+
+
+def parse_docker_time(value):
+    # "2024-05-01T10:20:30.123456789Z" -> epoch seconds; None for the zero time
+    if not value or value.startswith("0001-"):
+        return None
+    value = value.rstrip("Z")
+    if "." in value:
+        whole, fraction = value.split(".", 1)
+        value = f"{whole}.{fraction[:6]}"
+        fmt = "%Y-%m-%dT%H:%M:%S.%f"
+    else:
+        fmt = "%Y-%m-%dT%H:%M:%S"
+    return datetime.strptime(value, fmt).replace(tzinfo=timezone.utc).timestamp()
+
+
+def _label_seconds(labels, key):
+    try:
+        return int(labels.get(key) or 0)
+    except ValueError:
+        return 0
+
+
+# Removes boxes whose TTL or idle timeout (container labels set at create
+# time) has passed, together with their workspace directories, and drops
+# snapshot images that a newer commit under the same name left dangling.
+# One pass costs one container listing, one inspect per stopped container
+# with an idle timeout, and one dangling-image listing; removals run with
+# bounded concurrency.
+class Reaper:
+    def __init__(self, docker_service, workspace_dir, snapshot_catalog=None, concurrency=DEFAULT_CONCURRENCY):
+        self.docker_service = docker_service
+        self.workspace_dir = workspace_dir
+        self.snapshot_catalog = snapshot_catalog
+        self.concurrency = concurrency
+
+    def find_expired(self, now=None):
+        now = time.time() if now is None else now
+        api = self.docker_service.client.api
+        expired = []
+        for row in api.containers(all=True):
+            labels = row.get("Labels") or {}
+            ttl = _label_seconds(labels, TTL_LABEL)
+            idle = _label_seconds(labels, IDLE_LABEL)
+            if not ttl and not idle:
+                continue
+            names = row.get("Names") or []
+            name = names[0].lstrip('/') if names else row["Id"][:12]
+            if ttl and now - row.get("Created", now) > ttl:
+                expired.append((row["Id"], name, f"TTL of {ttl}s passed"))
+            elif idle and row.get("State") != "running":
+                state = api.inspect_container(row["Id"]).get("State") or {}
+                stopped_at = parse_docker_time(state.get("FinishedAt")) or row.get("Created", now)
+                if now - stopped_at > idle:
+                    expired.append((row["Id"], name, f"stopped for more than {idle}s"))
+        return expired
+
+    def remove_workspace(self, name):
+        if not name or name.startswith('.') or os.sep in name or (os.altsep and os.altsep in name):
+            return False
+        path = os.path.join(self.workspace_dir, name)
+        if os.path.islink(path):
+            # Warm-pool boxes link their workspace to a pool slot
+            target = os.path.realpath(path)
+            os.unlink(path)
+            if os.path.dirname(target) == os.path.realpath(os.path.join(self.workspace_dir, ".pool")):
+                shutil.rmtree(target, ignore_errors=True)
+            return True
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+            return True
+        return False
+
+    def _remove(self, container_id, name):
+        self.docker_service.client.api.remove_container(container_id, force=True, v=True)
+        return self.remove_workspace(name)
+
+    def dangling_snapshots(self):
+        if self.snapshot_catalog is None:
+            return []
+        snapshot_ids = self.snapshot_catalog.image_ids()
+        rows = self.docker_service.client.api.images(filters={"dangling": True})
+        return [row["Id"] for row in rows if row["Id"] in snapshot_ids]
+
+    def run(self, progress=None, cancelled=None):
+        def report(message):
+            if progress:
+                progress(-1, message)
+
+        summary = {"containers": 0, "workspaces": 0, "images": 0, "errors": 0}
+        expired = self.find_expired()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="reaper") as pool:
+            futures = [
+                (pool.submit(self._remove, container_id, name), name, reason)
+                for container_id, name, reason in expired
+            ]
+            for future, name, reason in futures:
+                try:
+                    workspace_removed = future.result()
+                except Exception as e:
+                    summary["errors"] += 1
+                    report(f"Failed to remove expired container {name}: {str(e)}")
+                    continue
+                summary["containers"] += 1
+                summary["workspaces"] += int(workspace_removed)
+                report(f"Removed container {name} ({reason})" + (" and its workspace" if workspace_removed else ""))
+
+        if cancelled is not None and cancelled():
+            return summary
+
+        api = self.docker_service.client.api
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="reaper") as pool:
+            futures = [(pool.submit(api.remove_image, image_id), image_id) for image_id in self.dangling_snapshots()]
+            for future, image_id in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    summary["errors"] += 1
+                    report(f"Failed to remove dangling snapshot {image_id[7:19]}: {str(e)}")
+                    continue
+                self.snapshot_catalog.forget([image_id])
+                summary["images"] += 1
+                report(f"Removed dangling snapshot image {image_id[7:19]}")
+        return summary
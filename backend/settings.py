@@ -1,27 +1,205 @@
-import os
+import atexit
 import json
+import os
+import threading
+import time
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+
+from backend.paths import config_path
+
+SETTINGS_FILE = "settings.json"
+LEGACY_SETTINGS_FILE = "container_manager_settings.json"  # Used to live in the working directory
+SAVE_DELAY = 0.5  # Seconds changes are held back so that bursts become one write
+RELOAD_CHECK_INTERVAL = 1.0  # Seconds between checks for edits made outside the app
+
+# Environment variables that override a setting for this process only; the
+# overridden value is never written back
+ENV_OVERRIDES = {
+    "docker_pool_size": "DISPOSABLEBOX_POOL_SIZE",
+    "warm_pool_size": "DISPOSABLEBOX_WARM_POOL_SIZE",
+}
+
 
+class AppSettings(BaseModel):
+    model_config = ConfigDict(extra="ignore", validate_assignment=True)
+
+    last_iso_path: str = ""
+    # Connection pools and worker counts
+    docker_pool_size: int = Field(32, ge=1, le=512)
+    bulk_concurrency: int = Field(16, ge=1, le=256)
+    warm_pool_size: int = Field(1, ge=0, le=16)
+    # Refresh intervals
+    stats_refresh_ms: int = Field(1000, ge=100, le=60000)
+    reaper_interval: int = Field(60, ge=5, le=86400)  # Seconds
+    # Cache limits
+    container_cache_ttl: float = Field(30.0, ge=0)
+    container_cache_max_entries: int = Field(5000, ge=1)
+
+
+def _validate(raw):
+    # Invalid or unknown values fall back to their defaults one by one
+    # instead of discarding the whole file
+    if not isinstance(raw, dict):
+        return AppSettings()
+    values = dict(raw)
+    while True:
+        try:
+            return AppSettings.model_validate(values)
+        except ValidationError as e:
+            bad = {error["loc"][0] for error in e.errors() if error["loc"]}
+            if not bad & values.keys():
+                return AppSettings()
+            for key in bad:
+                values.pop(key, None)
+
+
+# Typed preferences, stored as JSON in the per-user config directory. Reads
+# are served from memory: get() only stats the file, at most once every
+# RELOAD_CHECK_INTERVAL, to pick up edits made by hand or by another
+# instance; `generation` counts those reloads so that callers holding on to
+# derived state can poll() and re-apply. Changes are validated immediately
+# but written after SAVE_DELAY on a timer thread, so a burst of updates
+# costs one write. The write re-reads the file first and only puts this
+# process's changes on top, so edits made elsewhere are kept, and goes to a
+# temporary file that replaces the old one, so a crash never leaves half a
+# file behind. Call flush() before exiting.
 class Settings:
-    def __init__(self):
-        self.settings_file = "container_manager_settings.json"
-        self.settings = self.load_settings()
+    _instance = None
+    _instance_lock = threading.Lock()
 
-    def load_settings(self):
-        if os.path.exists(self.settings_file):
-            try:
-                with open(self.settings_file, 'r') as f:
-                    return json.load(f)
-            except:
-                return {"last_iso_path": ""}
-        return {"last_iso_path": ""}
+    def __init__(self, path=None):
+        self.path = path or config_path(SETTINGS_FILE)
+        self._lock = threading.RLock()
+        self._pending = {}  # Changed fields not yet on disk
+        self._timer = None
+        self._file_state = None  # (mtime_ns, size, inode) as last read or written
+        self._checked_at = time.monotonic()
+        self._values = self._load()
+        self.generation = 0  # Bumped whenever the file is reloaded
 
-    def save_settings(self):
-        with open(self.settings_file, 'w') as f:
-            json.dump(self.settings, f)
+    @classmethod
+    def instance(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+                atexit.register(cls._instance.flush)  # The save timer is a daemon thread
+            return cls._instance
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def _load(self):
+        self._file_state = self._stat()
+        source = self.path if self._file_state is not None else LEGACY_SETTINGS_FILE
+        try:
+            with open(source, 'r') as f:
+                values = _validate(json.load(f))
+        except (OSError, ValueError):
+            values = AppSettings()
+        else:
+            if source == LEGACY_SETTINGS_FILE:
+                self._pending.update(values.model_dump())  # Migrate on the next save
+                self._schedule_save()
+        for name, value in self._pending.items():
+            setattr(values, name, value)
+        return values
+
+    def _with_overrides(self, values):
+        for name, variable in ENV_OVERRIDES.items():
+            if os.environ.get(variable):
+                try:
+                    setattr(values, name, os.environ[variable])
+                except ValidationError:
+                    print(f"Ignoring invalid {variable}={os.environ[variable]!r}")
+        return values
+
+    def _check_reload(self):
+        now = time.monotonic()
+        if now - self._checked_at < RELOAD_CHECK_INTERVAL:
+            return
+        self._checked_at = now
+        if self._stat() != self._file_state:
+            self._reload()
+
+    def _reload(self):
+        # Unsaved changes made here win over the file's
+        self._values = self._load()
+        self.generation += 1
+
+    def poll(self):
+        # Generation after checking the file; cheap enough for a GUI timer
+        with self._lock:
+            self._check_reload()
+            return self.generation
+
+    @property
+    def values(self):
+        # A copy with environment overrides applied
+        with self._lock:
+            self._check_reload()
+            return self._with_overrides(self._values.model_copy())
+
+    def get(self, name):
+        with self._lock:
+            self._check_reload()
+            if name in ENV_OVERRIDES and os.environ.get(ENV_OVERRIDES[name]):
+                return getattr(self._with_overrides(self._values.model_copy()), name)
+            return getattr(self._values, name)
+
+    def update(self, **changes):
+        # Raises ValidationError (and changes nothing) if any value is invalid
+        with self._lock:
+            self._check_reload()
+            values = self._values.model_copy()
+            for name, value in changes.items():
+                if name not in AppSettings.model_fields:
+                    raise KeyError(name)
+                setattr(values, name, value)
+            changed = {name: getattr(values, name) for name in changes
+                       if getattr(values, name) != getattr(self._values, name)}
+            if not changed:
+                return
+            self._values = values
+            self._pending.update(changed)
+            self._schedule_save()
+
+    def _schedule_save(self):
+        if self._timer is None:
+            self._timer = threading.Timer(SAVE_DELAY, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return
+            if self._stat() != self._file_state:
+                # Changed elsewhere since the last read: write our pending
+                # fields over the file's current contents, not over ours
+                self._reload()
+            tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, 'w') as f:
+                    json.dump(self._values.model_dump(), f, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"Failed to save settings to {self.path}: {e}")
+                return
+            self._pending.clear()
+            self._file_state = self._stat()
 
     def get_last_iso_path(self):
-        return self.settings.get("last_iso_path", "")
+        return self.get("last_iso_path")
 
     def set_last_iso_path(self, path):
-        self.settings["last_iso_path"] = path
-        self.save_settings()
+        self.update(last_iso_path=path)
@@ -0,0 +1,53 @@
+import json
+import os
+import threading
+
+from backend.paths import data_path
+
+MAX_ENTRIES = 1000
+
+
+# Shell detected per image id, persisted as JSON. Keys are image ids, so
+# rebuilding or re-pulling an image (new id) naturally misses the cache.
+class ShellCache:
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, path=None):
+        self.path = path or data_path("shell_cache.json")
+        self._lock = threading.Lock()
+        self._shells = None
+
+    @classmethod
+    def instance(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def _load(self):
+        if self._shells is None:
+            try:
+                with open(self.path, 'r') as f:
+                    self._shells = json.load(f)
+            except (OSError, ValueError):
+                self._shells = {}
+        return self._shells
+
+    def get(self, image_id):
+        with self._lock:
+            return self._load().get(image_id)
+
+    def set(self, image_id, shell):
+        with self._lock:
+            shells = self._load()
+            if shells.get(image_id) == shell:
+                return
+            shells.pop(image_id, None)
+            shells[image_id] = shell
+            while len(shells) > MAX_ENTRIES:
+                shells.pop(next(iter(shells)))
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(shells, f)
+            os.replace(tmp_path, self.path)
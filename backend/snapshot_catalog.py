@@ -0,0 +1,165 @@
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import Float, ForeignKey, Integer, String, create_engine, select
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, sessionmaker
+
+from backend.paths import data_path
+
+DEFAULT_KEEP_LAST = 5  # Snapshots kept per container by prune()
+DEFAULT_MAX_AGE_DAYS = None  # None keeps snapshots regardless of age
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Snapshot(Base):
+    __tablename__ = "snapshots"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    image_id: Mapped[str] = mapped_column(String, unique=True, index=True)
+    image_name: Mapped[str] = mapped_column(String)
+    container_id: Mapped[str] = mapped_column(String, index=True)
+    container_name: Mapped[str] = mapped_column(String)
+    parent_id: Mapped[Optional[int]] = mapped_column(ForeignKey("snapshots.id", ondelete="SET NULL"), nullable=True)
+    size: Mapped[int] = mapped_column(Integer, default=0)
+    layer_size: Mapped[int] = mapped_column(Integer, default=0)  # Bytes added on top of the base image
+    created_at: Mapped[float] = mapped_column(Float, default=time.time)
+
+    @property
+    def short_id(self):
+        return self.image_id.split(":")[-1][:12]
+
+
+# On-disk record of every snapshot committed through the app, in SQLite.
+# The database is opened on first use and all queries are local, so the
+# create dialog can list snapshots without asking Docker. Rows are returned
+# detached; they are plain value objects after the session closes.
+class SnapshotCatalog:
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, path=None):
+        self.path = path or data_path("snapshots.db")
+        self._lock = threading.Lock()
+        self._sessions = None
+
+    @classmethod
+    def instance(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def _session(self):
+        with self._lock:
+            if self._sessions is None:
+                engine = create_engine(
+                    f"sqlite:///{self.path}",
+                    connect_args={"check_same_thread": False}
+                )
+                Base.metadata.create_all(engine)
+                self._sessions = sessionmaker(engine, expire_on_commit=False)
+            return self._sessions()
+
+    def record(self, image_id, image_name, container_id, container_name, parent=None, size=0, layer_size=0):
+        with self._session() as session, session.begin():
+            snapshot = session.scalar(select(Snapshot).where(Snapshot.image_id == image_id))
+            if snapshot is None:
+                snapshot = Snapshot(image_id=image_id)
+                session.add(snapshot)
+            snapshot.image_name = image_name
+            snapshot.container_id = container_id
+            snapshot.container_name = container_name
+            snapshot.parent_id = parent.id if parent is not None else None
+            snapshot.size = size or 0
+            snapshot.layer_size = layer_size or 0
+            snapshot.created_at = time.time()
+        return snapshot
+
+    def get(self, image_id):
+        if not image_id:
+            return None
+        with self._session() as session:
+            return session.scalar(select(Snapshot).where(Snapshot.image_id == image_id))
+
+    def list(self, container_name=None):
+        # Newest first
+        query = select(Snapshot).order_by(Snapshot.created_at.desc())
+        if container_name is not None:
+            query = query.where(Snapshot.container_name == container_name)
+        with self._session() as session:
+            return list(session.scalars(query))
+
+    def image_ids(self):
+        with self._session() as session:
+            return set(session.scalars(select(Snapshot.image_id)))
+
+    def forget(self, image_ids):
+        image_ids = list(image_ids)
+        if not image_ids:
+            return 0
+        with self._session() as session, session.begin():
+            snapshots = list(session.scalars(select(Snapshot).where(Snapshot.image_id.in_(image_ids))))
+            for snapshot in snapshots:
+                session.delete(snapshot)
+        return len(snapshots)
+
+    def candidates(self, keep_last=DEFAULT_KEEP_LAST, max_age_days=DEFAULT_MAX_AGE_DAYS, now=None):
+        # Snapshots the retention policy no longer wants: everything past the
+        # newest keep_last per container, plus anything older than
+        # max_age_days. Snapshots other snapshots were built from are kept
+        # while their children exist.
+        now = time.time() if now is None else now
+        snapshots = self.list()
+        parents = {s.parent_id for s in snapshots if s.parent_id is not None}
+        per_container = {}
+        expired = []
+        for snapshot in snapshots:
+            rank = per_container[snapshot.container_name] = per_container.get(snapshot.container_name, 0) + 1
+            too_many = keep_last is not None and rank > keep_last
+            too_old = max_age_days is not None and now - snapshot.created_at > max_age_days * 86400
+            if (too_many or too_old) and snapshot.id not in parents:
+                expired.append(snapshot)
+        return expired
+
+    def prune(self, docker_service, keep_last=DEFAULT_KEEP_LAST, max_age_days=DEFAULT_MAX_AGE_DAYS,
+              dry_run=False, progress=None):
+        # Removes expired snapshot images without force, so Docker keeps any
+        # layer still shared with another image or used by a container and
+        # drops the rest. Rows for images already gone are forgotten too.
+        api = docker_service.client.api
+        existing = {row["Id"] for row in api.images(all=True)}
+        gone = [image_id for image_id in self.image_ids() if image_id not in existing]
+        if not dry_run:
+            self.forget(gone)
+        in_use = {row.get("ImageID") for row in api.containers(all=True)}
+
+        removed = []
+        # Removing a leaf can expose its parent, so repeat until stable
+        while True:
+            expired = [s for s in self.candidates(keep_last, max_age_days)
+                       if s.image_id not in in_use and s.image_id not in removed]
+            if not expired:
+                break
+            for snapshot in expired:
+                if dry_run:
+                    removed.append(snapshot.image_id)
+                    continue
+                try:
+                    api.remove_image(snapshot.image_id)
+                except Exception as e:
+                    if getattr(e, "status_code", None) != 404:
+                        in_use.add(snapshot.image_id)  # Still referenced; keep it for now
+                        if progress:
+                            progress(-1, f"Kept {snapshot.image_name} ({snapshot.short_id}): {str(e)}")
+                        continue
+                removed.append(snapshot.image_id)
+                self.forget([snapshot.image_id])
+                if progress:
+                    progress(-1, f"Removed {snapshot.image_name} ({snapshot.short_id})")
+            if dry_run:
+                break
+        return removed, gone
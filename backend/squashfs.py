@@ -0,0 +1,267 @@
+import lzma
+import stat
+import struct
+import zlib
+from collections import OrderedDict
+
+MAGIC = 0x73717368  # "hsqs"
+METADATA_SIZE = 8192
+UNCOMPRESSED_METADATA = 0x8000
+UNCOMPRESSED_BLOCK = 1 << 24
+NO_FRAGMENT = 0xFFFFFFFF
+METADATA_CACHE_SIZE = 4096  # Decompressed 8 KiB metadata blocks kept (32 MiB)
+FRAGMENT_CACHE_SIZE = 8
+
+_SUPERBLOCK = struct.Struct("<IIIIIHHHHHHQQQQQQQQ")
+_INODE_HEADER = struct.Struct("<HHHHII")
+_DIRECTORY_HEADER = struct.Struct("<III")
+_DIRECTORY_ENTRY = struct.Struct("<HhHH")
+_FRAGMENT_ENTRY = struct.Struct("<QII")
+
+# Basic and extended inode types map to the same file type
+_FILE_TYPES = [stat.S_IFDIR, stat.S_IFREG, stat.S_IFLNK, stat.S_IFBLK, stat.S_IFCHR, stat.S_IFIFO, stat.S_IFSOCK]
+_COMPRESSORS = {1: "gzip", 2: "lzma", 3: "lzo", 4: "xz", 5: "lz4", 6: "zstd"}
+
+
+class SquashFSError(Exception):
+    pass
+
+
+def _decompressor(compression):
+    # (data, uncompressed size limit) -> bytes. gzip, lzma and xz come with
+    # Python; zstd and lz4 work if their packages happen to be installed.
+    if compression == 1:
+        return lambda data, size: zlib.decompress(data)
+    if compression in (2, 4):
+        return lambda data, size: lzma.decompress(data)
+    if compression == 6:
+        try:
+            import zstandard
+        except ImportError:
+            zstandard = None
+        if zstandard is not None:
+            decompressor = zstandard.ZstdDecompressor()
+            return lambda data, size: decompressor.decompress(data, max_output_size=size)
+    if compression == 5:
+        try:
+            import lz4.block
+        except ImportError:
+            lz4 = None
+        if lz4 is not None:
+            return lambda data, size: lz4.block.decompress(data, uncompressed_size=size)
+    raise SquashFSError(f"squashfs images compressed with {_COMPRESSORS.get(compression, compression)} are not supported")
+
+
+def is_squashfs(data):
+    return len(data) >= _SUPERBLOCK.size and int.from_bytes(data[0:4], "little") == MAGIC
+
+
+class Inode:
+    __slots__ = (
+        "kind", "mode", "uid", "gid", "mtime", "number", "nlink", "size",
+        "directory", "blocks_start", "block_sizes", "fragment", "fragment_offset", "link_target", "device"
+    )
+
+    def __init__(self, kind, mode, uid, gid, mtime, number):
+        self.kind = kind
+        self.mode = mode
+        self.uid = uid
+        self.gid = gid
+        self.mtime = mtime
+        self.number = number
+        self.nlink = 1
+        self.size = 0
+        self.directory = None  # (block, offset, listing size)
+        self.blocks_start = 0
+        self.block_sizes = ()
+        self.fragment = NO_FRAGMENT
+        self.fragment_offset = 0
+        self.link_target = None
+        self.device = 0
+
+    def is_dir(self):
+        return stat.S_ISDIR(self.mode)
+
+    def is_file(self):
+        return stat.S_ISREG(self.mode)
+
+    @property
+    def major(self):
+        return (self.device & 0xfff00) >> 8
+
+    @property
+    def minor(self):
+        return (self.device & 0xff) | ((self.device >> 12) & 0xfff00)
+
+
+class _Cursor:
+    # Sequential reads through the chain of metadata blocks of one table
+    def __init__(self, fs, position, offset):
+        self.fs = fs
+        self.block, self.next = fs._metadata_block(position)
+        self.offset = offset
+
+    def read(self, size):
+        parts = []
+        while size:
+            available = len(self.block) - self.offset
+            if available <= 0:
+                self.block, self.next = self.fs._metadata_block(self.next)
+                self.offset = 0
+                continue
+            take = min(size, available)
+            parts.append(self.block[self.offset:self.offset + take])
+            self.offset += take
+            size -= take
+        return b"".join(parts)
+
+    def unpack(self, layout):
+        return layout.unpack(self.read(layout.size))
+
+
+# Read-only squashfs 4.0 filesystem over any buffer, typically a memoryview
+# of an ISO's mmap. Metadata blocks are decompressed on demand and cached;
+# file contents come out block by block, and blocks stored uncompressed are
+# handed out as slices of the buffer without copying.
+class SquashFS:
+    def __init__(self, data):
+        if not is_squashfs(data):
+            raise SquashFSError("not a squashfs image")
+        (
+            _, self.inode_count, self.mtime, self.block_size, fragment_count, compression, _,
+            self.flags, id_count, major, _, self.root_inode, self.bytes_used, id_table, _,
+            self.inode_table, self.directory_table, fragment_table, _
+        ) = _SUPERBLOCK.unpack_from(data, 0)
+        if major != 4:
+            raise SquashFSError(f"squashfs version {major} is not supported")
+        self.data = data
+        self.compression = _COMPRESSORS.get(compression, str(compression))
+        self._decompress = _decompressor(compression)
+        self._metadata = OrderedDict()
+        self._fragments = OrderedDict()
+        self.ids = [entry[0] for entry in self._table(id_table, id_count, struct.Struct("<I"))]
+        self.fragment_table = self._table(fragment_table, fragment_count, _FRAGMENT_ENTRY)
+
+    def _metadata_block(self, position):
+        # (decompressed bytes, position of the following block)
+        cached = self._metadata.get(position)
+        if cached is not None:
+            self._metadata.move_to_end(position)
+            return cached
+        header = int.from_bytes(self.data[position:position + 2], "little")
+        size = header & (UNCOMPRESSED_METADATA - 1)
+        raw = self.data[position + 2:position + 2 + size]
+        block = bytes(raw) if header & UNCOMPRESSED_METADATA else self._decompress(raw, METADATA_SIZE)
+        result = self._metadata[position] = (block, position + 2 + size)
+        if len(self._metadata) > METADATA_CACHE_SIZE:
+            self._metadata.popitem(last=False)
+        return result
+
+    def _table(self, start, count, layout):
+        # Lookup tables: an array of pointers to metadata blocks of entries
+        if not count or start == 0xFFFFFFFFFFFFFFFF:
+            return []
+        per_block = METADATA_SIZE // layout.size
+        blocks = (count + per_block - 1) // per_block
+        pointers = struct.unpack_from(f"<{blocks}Q", self.data, start)
+        raw = b"".join(self._metadata_block(pointer)[0] for pointer in pointers)
+        return [layout.unpack_from(raw, i * layout.size) for i in range(count)]
+
+    def inode(self, ref):
+        cursor = _Cursor(self, self.inode_table + (ref >> 16), ref & 0xFFFF)
+        kind, permissions, uid, gid, mtime, number = cursor.unpack(_INODE_HEADER)
+        if not 1 <= kind <= 14:
+            raise SquashFSError(f"corrupt inode type {kind}")
+        inode = Inode(kind, _FILE_TYPES[(kind - 1) % 7] | permissions, self.ids[uid], self.ids[gid], mtime, number)
+        if kind == 1:
+            block, inode.nlink, size, offset, _ = cursor.unpack(struct.Struct("<IIHHI"))
+            inode.directory = (block, offset, size)
+        elif kind == 8:
+            inode.nlink, size, block, _, _, offset, _ = cursor.unpack(struct.Struct("<IIIIHHI"))
+            inode.directory = (block, offset, size)
+        elif kind in (2, 9):
+            if kind == 2:
+                inode.blocks_start, inode.fragment, inode.fragment_offset, inode.size = cursor.unpack(struct.Struct("<IIII"))
+            else:
+                (inode.blocks_start, inode.size, _, inode.nlink,
+                 inode.fragment, inode.fragment_offset, _) = cursor.unpack(struct.Struct("<QQQIIII"))
+            if inode.fragment == NO_FRAGMENT:
+                count = (inode.size + self.block_size - 1) // self.block_size
+            else:
+                count = inode.size // self.block_size
+            inode.block_sizes = struct.unpack(f"<{count}I", cursor.read(4 * count))
+        elif kind in (3, 10):
+            inode.nlink, target_size = cursor.unpack(struct.Struct("<II"))
+            inode.link_target = cursor.read(target_size)
+        elif kind in (4, 5, 11, 12):
+            inode.nlink, inode.device = cursor.unpack(struct.Struct("<II"))
+        else:
+            inode.nlink, = cursor.unpack(struct.Struct("<I"))
+        return inode
+
+    def listdir(self, inode):
+        # (name, inode ref) pairs in on-disk (sorted) order
+        block, offset, size = inode.directory
+        remaining = size - 3  # The size counts the implicit "." and ".."
+        if remaining <= 0:
+            return
+        cursor = _Cursor(self, self.directory_table + block, offset)
+        while remaining > 0:
+            count, start, _ = cursor.unpack(_DIRECTORY_HEADER)
+            remaining -= _DIRECTORY_HEADER.size
+            for _ in range(count + 1):
+                entry_offset, _, _, name_size = cursor.unpack(_DIRECTORY_ENTRY)
+                name = cursor.read(name_size + 1)
+                remaining -= _DIRECTORY_ENTRY.size + name_size + 1
+                yield name, (start << 16) | entry_offset
+
+    def walk(self):
+        # (path bytes, Inode) with parents before children; the root is b""
+        root = self.inode(self.root_inode)
+        yield b"", root
+        stack = [(b"", iter(list(self.listdir(root))))]
+        while stack:
+            parent, entries = stack[-1]
+            item = next(entries, None)
+            if item is None:
+                stack.pop()
+                continue
+            name, ref = item
+            path = parent + b"/" + name if parent else name
+            inode = self.inode(ref)
+            yield path, inode
+            if inode.is_dir():
+                stack.append((path, iter(list(self.listdir(inode)))))
+
+    def _fragment(self, index):
+        cached = self._fragments.get(index)
+        if cached is not None:
+            self._fragments.move_to_end(index)
+            return cached
+        start, size, _ = self.fragment_table[index]
+        on_disk = size & (UNCOMPRESSED_BLOCK - 1)
+        raw = self.data[start:start + on_disk]
+        block = raw if size & UNCOMPRESSED_BLOCK else self._decompress(raw, self.block_size)
+        self._fragments[index] = block
+        if len(self._fragments) > FRAGMENT_CACHE_SIZE:
+            self._fragments.popitem(last=False)
+        return block
+
+    def read(self, inode):
+        # The file's contents as a sequence of buffers, one per block
+        position = inode.blocks_start
+        remaining = inode.size
+        for entry in inode.block_sizes:
+            on_disk = entry & (UNCOMPRESSED_BLOCK - 1)
+            expected = min(self.block_size, remaining)
+            if on_disk == 0:
+                yield bytes(expected)  # Sparse block
+            elif entry & UNCOMPRESSED_BLOCK:
+                yield self.data[position:position + on_disk]
+            else:
+                yield self._decompress(self.data[position:position + on_disk], self.block_size)
+            position += on_disk
+            remaining -= expected
+        if remaining > 0 and inode.fragment != NO_FRAGMENT:
+            block = self._fragment(inode.fragment)
+            yield block[inode.fragment_offset:inode.fragment_offset + remaining]
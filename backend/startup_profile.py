@@ -0,0 +1,38 @@
+import os
+import sys
+import time
+
+# Set as soon as this module is imported, i.e. before the heavy imports of
+# the entry point that imports it first
+START = time.perf_counter()
+
+
+# Phase-by-phase startup timing, enabled with --profile-startup or
+# DISPOSABLEBOX_PROFILE_STARTUP=1. mark() is cheap enough to leave in place
+# when profiling is off.
+class StartupProfile:
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.phases = []  # (phase, seconds since START)
+        self.reported = False
+
+    def mark(self, phase):
+        if self.enabled:
+            self.phases.append((phase, time.perf_counter() - START))
+
+    def report(self, out=None):
+        if not self.enabled or self.reported:
+            return
+        self.reported = True
+        out = out or sys.stderr
+        out.write("Startup profile (ms):\n")
+        previous = 0.0
+        for phase, at in self.phases:
+            out.write(f"  {phase:<28} {at * 1000:8.1f}  (+{(at - previous) * 1000:.1f})\n")
+            previous = at
+        out.flush()
+
+
+PROFILE = StartupProfile(
+    "--profile-startup" in sys.argv or os.environ.get("DISPOSABLEBOX_PROFILE_STARTUP") == "1"
+)
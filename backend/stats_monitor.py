@@ -0,0 +1,255 @@
+import asyncio
+import queue
+import threading
+import time
+from array import array
+
+DEFAULT_HISTORY = 60  # Points kept per metric for sparklines
+DEFAULT_BUCKET_SECONDS = 2.0  # One point per bucket (decimation)
+DEFAULT_MAX_STREAMS = 256
+
+
+class StatsSeries:
+    # Fixed-size ring buffers of decimated samples for one container
+    __slots__ = (
+        "cpu", "memory", "network", "index", "count",
+        "cpu_percent", "memory_usage", "memory_limit", "rx_rate", "tx_rate",
+        "_bucket_start", "_bucket_cpu", "_bucket_samples", "_last_net", "_last_time"
+    )
+
+    def __init__(self, history=DEFAULT_HISTORY):
+        self.cpu = array("f", [0.0] * history)
+        self.memory = array("f", [0.0] * history)
+        self.network = array("f", [0.0] * history)
+        self.index = 0
+        self.count = 0
+        self.cpu_percent = 0.0
+        self.memory_usage = 0
+        self.memory_limit = 0
+        self.rx_rate = 0.0
+        self.tx_rate = 0.0
+        self._bucket_start = None
+        self._bucket_cpu = 0.0
+        self._bucket_samples = 0
+        self._last_net = None
+        self._last_time = None
+
+    def add_sample(self, now, cpu_percent, memory_usage, memory_limit, rx_bytes, tx_bytes, bucket_seconds):
+        self.cpu_percent = cpu_percent
+        self.memory_usage = memory_usage
+        self.memory_limit = memory_limit
+        if self._last_net is not None and now > self._last_time:
+            elapsed = now - self._last_time
+            self.rx_rate = max(0.0, (rx_bytes - self._last_net[0]) / elapsed)
+            self.tx_rate = max(0.0, (tx_bytes - self._last_net[1]) / elapsed)
+        self._last_net = (rx_bytes, tx_bytes)
+        self._last_time = now
+
+        if self._bucket_start is None:
+            self._bucket_start = now
+        self._bucket_cpu += cpu_percent
+        self._bucket_samples += 1
+        if now - self._bucket_start < bucket_seconds:
+            return False
+
+        # Close the bucket: average CPU, latest memory and network rate
+        size = len(self.cpu)
+        self.cpu[self.index] = self._bucket_cpu / self._bucket_samples
+        self.memory[self.index] = memory_usage / memory_limit * 100 if memory_limit else 0.0
+        self.network[self.index] = self.rx_rate + self.tx_rate
+        self.index = (self.index + 1) % size
+        self.count = min(self.count + 1, size)
+        self._bucket_start = now
+        self._bucket_cpu = 0.0
+        self._bucket_samples = 0
+        return True
+
+    def values(self, metric):
+        # Oldest-to-newest points of one of "cpu", "memory" or "network"
+        data = getattr(self, metric)
+        size = len(data)
+        start = (self.index - self.count) % size
+        return [data[(start + i) % size] for i in range(self.count)]
+
+
+def parse_stats(sample):
+    cpu_stats = sample.get("cpu_stats") or {}
+    precpu_stats = sample.get("precpu_stats") or {}
+    cpu_delta = (cpu_stats.get("cpu_usage", {}).get("total_usage", 0)
+                 - precpu_stats.get("cpu_usage", {}).get("total_usage", 0))
+    system_delta = cpu_stats.get("system_cpu_usage", 0) - precpu_stats.get("system_cpu_usage", 0)
+    online_cpus = cpu_stats.get("online_cpus") or len(cpu_stats.get("cpu_usage", {}).get("percpu_usage") or []) or 1
+    cpu_percent = cpu_delta / system_delta * online_cpus * 100 if system_delta > 0 and cpu_delta > 0 else 0.0
+
+    memory_stats = sample.get("memory_stats") or {}
+    details = memory_stats.get("stats") or {}
+    cache = details.get("inactive_file", details.get("cache", 0))
+    memory_usage = max(0, memory_stats.get("usage", 0) - cache)
+    memory_limit = memory_stats.get("limit", 0)
+
+    rx_bytes = tx_bytes = 0
+    for network in (sample.get("networks") or {}).values():
+        rx_bytes += network.get("rx_bytes", 0)
+        tx_bytes += network.get("tx_bytes", 0)
+    return cpu_percent, memory_usage, memory_limit, rx_bytes, tx_bytes
+
+
+# Live resource usage for running containers. Each watched container has one
+# long-lived `stats(stream=True)` subscription. With a runner (an AsyncBridge,
+# see ContainerEventStream) every subscription is a task on the runner's
+# single asyncio loop reading through AsyncDockerClient, and samples are
+# parsed and decimated into StatsSeries right there. Without one (hosts the
+# async client does not support) each stream falls back to a docker-py
+# reader thread that only pushes raw samples onto a shared queue, drained by
+# a single multiplexer thread. Either way consumers pull the changed series
+# with take_updates() at their own rate, so the GUI decides how often it
+# repaints regardless of container count.
+class StatsMonitor:
+    def __init__(self, docker_service, history=DEFAULT_HISTORY,
+                 bucket_seconds=DEFAULT_BUCKET_SECONDS, max_streams=DEFAULT_MAX_STREAMS, runner=None):
+        self.docker_service = docker_service
+        self.runner = runner
+        self.history = history
+        self.bucket_seconds = bucket_seconds
+        self.max_streams = max_streams
+        self.series = {}  # container id -> StatsSeries
+        self._client = None
+        self._readers = {}  # container id -> stop event
+        self._tasks = {}  # container id -> runner future, with a runner
+        self._samples = queue.Queue(maxsize=max_streams * 4)
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        if self.runner is not None:
+            return  # Streams start as tasks in watch()
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._multiplex, name="stats-mux", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        with self._lock:
+            for stop in self._readers.values():
+                stop.set()
+            self._readers.clear()
+            tasks, self._tasks = self._tasks, {}
+        for task in tasks.values():
+            task.cancel()
+        try:
+            self._samples.put_nowait(None)  # Wakes the multiplexer
+        except queue.Full:
+            pass  # It is busy and sees _stop before its next get()
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    def _stats_client(self):
+        # Streams hold their connection for as long as they run, so they get
+        # their own pool instead of starving the shared one
+        if self._client is None:
+            self._client = self.docker_service.create_client(pool_size=self.max_streams)
+        return self._client
+
+    def sync(self, running_ids):
+        running_ids = set(running_ids)
+        with self._lock:
+            watched = set(self._readers)
+        for container_id in watched - running_ids:
+            self.unwatch(container_id)
+        for container_id in running_ids - watched:
+            self.watch(container_id)
+
+    def watch(self, container_id):
+        with self._lock:
+            if container_id in self._readers or len(self._readers) >= self.max_streams:
+                return
+            stop = threading.Event()
+            self._readers[container_id] = stop
+            if self.runner is not None:
+                self._tasks[container_id] = self.runner.submit(self._read_async(container_id, stop))
+                return
+        threading.Thread(
+            target=self._read,
+            args=(container_id, stop),
+            name=f"stats-{container_id[:12]}",
+            daemon=True
+        ).start()
+
+    def unwatch(self, container_id):
+        with self._lock:
+            stop = self._readers.pop(container_id, None)
+            task = self._tasks.pop(container_id, None)
+            self.series.pop(container_id, None)
+            self._dirty.discard(container_id)
+        if stop is not None:
+            stop.set()
+        if task is not None:
+            task.cancel()
+
+    async def _read_async(self, container_id, stop):
+        try:
+            async for sample in self.runner.client.container_stats(container_id):
+                if stop.is_set() or self._stop.is_set():
+                    break
+                self._record(container_id, time.monotonic(), sample)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if not stop.is_set():
+                print(f"Stats stream for {container_id[:12]} ended: {str(e)}")
+        finally:
+            with self._lock:
+                if self._readers.get(container_id) is stop:
+                    del self._readers[container_id]
+                    self._tasks.pop(container_id, None)
+
+    def _read(self, container_id, stop):
+        try:
+            for sample in self._stats_client().api.stats(container_id, decode=True, stream=True):
+                if stop.is_set() or self._stop.is_set():
+                    break
+                try:
+                    self._samples.put_nowait((container_id, time.monotonic(), sample))
+                except queue.Full:
+                    pass  # The multiplexer is behind; dropping a sample is harmless
+        except Exception as e:
+            if not stop.is_set():
+                print(f"Stats stream for {container_id[:12]} ended: {str(e)}")
+        finally:
+            with self._lock:
+                if self._readers.get(container_id) is stop:
+                    del self._readers[container_id]
+
+    def _multiplex(self):
+        while not self._stop.is_set():
+            item = self._samples.get()
+            if item is None:
+                continue
+            self._record(*item)
+
+    def _record(self, container_id, now, sample):
+        try:
+            values = parse_stats(sample)
+        except Exception:
+            return
+        with self._lock:
+            if container_id not in self._readers:
+                return
+            series = self.series.get(container_id)
+            if series is None:
+                series = self.series[container_id] = StatsSeries(self.history)
+            series.add_sample(now, *values, self.bucket_seconds)
+            self._dirty.add(container_id)
+
+    def take_updates(self):
+        # Series that received samples since the previous call
+        with self._lock:
+            dirty = self._dirty
+            self._dirty = set()
+            return {container_id: self.series[container_id] for container_id in dirty if container_id in self.series}
@@ -0,0 +1,232 @@
+import os
+import threading
+import time
+import uuid
+from collections import deque
+
+POOL_LABEL = "disposablebox.pool"  # Value: the image ref the container was created for
+POOL_NAME_PREFIX = "dbx-pool-"
+DEFAULT_POOL_SIZE = int(os.environ.get("DISPOSABLEBOX_WARM_POOL_SIZE", "1"))
+DEFAULT_PRESTART = os.environ.get("DISPOSABLEBOX_WARM_POOL_START", "0") == "1"
+
+
+def is_pool_container(container):
+    # Handed-out containers keep the label but lose the pool name
+    return container.name.startswith(POOL_NAME_PREFIX) and POOL_LABEL in (container.labels or {})
+
+
+# Keeps a few containers per preset image created (and optionally started)
+# ahead of time, so "New Container" for a preset is a rename instead of a
+# pull + create. The bind mount has to exist at create time, so every pool
+# container mounts its own slot directory under <workspace>/.pool/ and
+# acquire() links <workspace>/<name> to it. A single background thread
+# refills the pools, and only for images that are already present locally:
+# the pool never pulls on its own.
+class WarmPool:
+    def __init__(self, docker_service, workspace_dir, image_index, refs=(), size=DEFAULT_POOL_SIZE,
+                 prestart=DEFAULT_PRESTART):
+        self.docker_service = docker_service
+        self.workspace_dir = workspace_dir
+        self.slots_dir = os.path.join(workspace_dir, ".pool")
+        self.image_index = image_index
+        self.size = size
+        self.prestart = prestart
+        self.targets = {ref: size for ref in refs}
+        self._pools = {}  # ref -> deque of pool container names
+        self._deficit_since = {}  # ref -> deque of times a slot was taken
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.hits = 0
+        self.misses = 0
+        self.refills = 0
+        self.refill_errors = 0
+        self.lagged_refills = 0  # Refills that replaced a handed-out container
+        self.total_refill_lag = 0.0
+        self.max_refill_lag = 0.0
+
+    def start(self):
+        if self.size <= 0 or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="warm-pool", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        # Pool containers are left in place and adopted on the next start
+        self._stop.set()
+        self._wake.set()
+
+    def resize(self, size):
+        # New target for every tracked image; a pool of 0 stops refilling
+        with self._lock:
+            self.size = size
+            for ref in self.targets:
+                self.targets[ref] = size
+        self._wake.set()
+
+    def track(self, ref):
+        with self._lock:
+            if ref in self.targets or self.size <= 0:
+                return
+            self.targets[ref] = self.size
+        self._wake.set()
+
+    def adopt(self):
+        # Pick up pool containers left over from a previous run (or created
+        # by another process); also how one-shot callers use the pool
+        rows = self.docker_service.client.api.containers(all=True, filters={"label": POOL_LABEL})
+        with self._lock:
+            for row in rows:
+                names = [name.lstrip('/') for name in row.get("Names") or []]
+                ref = (row.get("Labels") or {}).get(POOL_LABEL)
+                if ref in self.targets and names and names[0].startswith(POOL_NAME_PREFIX):
+                    pool = self._pools.setdefault(ref, deque())
+                    if names[0] not in pool:
+                        pool.append(names[0])
+
+    def acquire(self, ref, name):
+        # Link the workspace of a warm container and rename it to name; None
+        # on a miss, including when the workspace cannot be linked
+        client = self.docker_service.client
+        while True:
+            with self._lock:
+                pool = self._pools.get(ref)
+                if not pool:
+                    self.misses += 1
+                    break
+                pool_name = pool.popleft()
+            link = self._link_workspace(pool_name, name)
+            if link is None:
+                with self._lock:
+                    self._pools.setdefault(ref, deque()).appendleft(pool_name)
+                    self.misses += 1
+                break
+            try:
+                client.api.rename(pool_name, name)
+            except Exception as e:
+                from docker.errors import NotFound
+                self._unlink_workspace(link)
+                if isinstance(e, NotFound):
+                    # Removed behind our back; the refill replaces it. Try the next one.
+                    print(f"Warm pool container {pool_name} is gone: {str(e)}")
+                    self._wake.set()
+                    continue
+                # Usually a 409 because name is taken: the warm container is
+                # fine, so it goes back and the caller handles the error
+                with self._lock:
+                    self._pools.setdefault(ref, deque()).appendleft(pool_name)
+                    self.misses += 1
+                break
+            with self._lock:
+                # Only handed-out containers count towards the refill lag
+                self._deficit_since.setdefault(ref, deque()).append(time.monotonic())
+                self.hits += 1
+            self._wake.set()
+            return name
+        return None
+
+    def _link_workspace(self, pool_name, name):
+        # Returns the link path, or None if neither a symlink nor (on
+        # Windows, where symlinks need admin rights or developer mode) a
+        # directory junction could be made. The slot itself cannot move:
+        # the container's bind mount points at it.
+        slot = os.path.join(self.slots_dir, pool_name)
+        link = os.path.join(self.workspace_dir, name)
+        if os.path.lexists(link):
+            print(f"Workspace {link} already exists; not using the warm pool")
+            return None
+        try:
+            os.symlink(slot, link, target_is_directory=True)
+            return link
+        except OSError as e:
+            error = e
+        if os.name == "nt":
+            try:
+                import _winapi
+                _winapi.CreateJunction(slot, link)
+                return link
+            except (ImportError, AttributeError, OSError) as e:
+                error = e
+        print(f"Could not link workspace {link} -> {slot}: {str(error)}")
+        return None
+
+    def _unlink_workspace(self, link):
+        try:
+            if os.path.islink(link):
+                os.unlink(link)
+            else:
+                os.rmdir(link)  # Junction; removes the link, not the slot
+        except OSError as e:
+            print(f"Could not remove workspace link {link}: {str(e)}")
+
+    def _run(self):
+        try:
+            self.adopt()
+        except Exception as e:
+            print(f"Warm pool could not list existing containers: {str(e)}")
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                self._refill()
+            except Exception as e:
+                self.refill_errors += 1
+                print(f"Warm pool refill failed: {str(e)}")
+                self._stop.wait(5)
+            self._wake.wait(10)
+
+    def _refill(self):
+        while not self._stop.is_set():
+            with self._lock:
+                wanted = [
+                    ref for ref, target in self.targets.items()
+                    if len(self._pools.get(ref, ())) < target
+                ]
+            wanted = [ref for ref in wanted if self.image_index.has(ref)]
+            if not wanted:
+                return
+            for ref in wanted:
+                if self._stop.is_set():
+                    return
+                pool_name = self._create(ref)
+                now = time.monotonic()
+                with self._lock:
+                    self._pools.setdefault(ref, deque()).append(pool_name)
+                    self.refills += 1
+                    taken = self._deficit_since.get(ref)
+                    if taken:
+                        lag = now - taken.popleft()
+                        self.lagged_refills += 1
+                        self.total_refill_lag += lag
+                        self.max_refill_lag = max(self.max_refill_lag, lag)
+
+    def _create(self, ref):
+        client = self.docker_service.client
+        pool_name = f"{POOL_NAME_PREFIX}{uuid.uuid4().hex[:12]}"
+        slot = os.path.join(self.slots_dir, pool_name)
+        os.makedirs(slot, exist_ok=True)
+        container = client.containers.create(
+            image=ref,
+            name=pool_name,
+            tty=True,
+            stdin_open=True,
+            detach=True,
+            labels={POOL_LABEL: ref},
+            volumes={slot: {'bind': '/workspace', 'mode': 'rw'}}
+        )
+        if self.prestart:
+            container.start()
+        return pool_name
+
+    def stats(self):
+        with self._lock:
+            return {
+                "available": {ref: len(pool) for ref, pool in self._pools.items() if pool},
+                "hits": self.hits,
+                "misses": self.misses,
+                "refills": self.refills,
+                "refill_errors": self.refill_errors,
+                "avg_refill_lag": self.total_refill_lag / self.lagged_refills if self.lagged_refills else 0.0,
+                "max_refill_lag": self.max_refill_lag
+            }
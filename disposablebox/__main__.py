@@ -0,0 +1,5 @@
+import sys
+
+from disposablebox.cli import main
+
+sys.exit(main())
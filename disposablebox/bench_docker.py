@@ -0,0 +1,99 @@
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Throughput of the docker-py path against backend.async_docker:
+#
+#     python -m disposablebox.bench_docker --requests 2000 --concurrency 32
+#     python -m disposablebox.bench_docker --host unix:///var/run/docker.sock
+#
+# Without --host a FakeDocker server is started on a temporary unix socket.
+# Each path inspects the same containers round-robin; the async client is
+# measured with plain concurrent requests and with pipelined inspect_many().
+
+DEFAULT_REQUESTS = 2000
+DEFAULT_CONCURRENCY = 32
+
+
+def start_fake(containers, latency_ms):
+    from disposablebox.fake_docker import FakeDocker
+
+    path = os.path.join(tempfile.mkdtemp(prefix="dbx-fake-"), "docker.sock")
+    loop = asyncio.new_event_loop()
+    fake = FakeDocker(containers, latency_ms / 1000)
+    server = loop.run_until_complete(fake.serve_unix(path))
+    threading.Thread(target=loop.run_forever, name="fake-docker", daemon=True).start()
+    return f"unix://{path}", fake, loop, server
+
+
+def bench_docker_py(host, ids, requests, concurrency):
+    from backend.docker_service import DockerService
+
+    service = DockerService(base_url=host, pool_size=concurrency)
+    api = service.client.api
+    api.inspect_container(ids[0])  # Connect outside the timing
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(api.inspect_container, (ids[i % len(ids)] for i in range(requests))))
+    elapsed = time.perf_counter() - start
+    service.close()
+    return elapsed
+
+
+async def bench_async(host, ids, requests, concurrency, pipelined):
+    from backend.async_docker import AsyncDockerClient
+
+    async with AsyncDockerClient(host, max_connections=concurrency) as client:
+        await client.inspect_container(ids[0])
+        targets = [ids[i % len(ids)] for i in range(requests)]
+        start = time.perf_counter()
+        if pipelined:
+            await client.inspect_many(targets, depth=max(1, requests // concurrency))
+        else:
+            await asyncio.gather(*(client.inspect_container(target) for target in targets))
+        return time.perf_counter() - start, client.stats()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare docker-py and the async Docker client")
+    parser.add_argument("--host", help="Docker host to measure (default: a fake server)")
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--containers", type=int, default=200, help="Containers in the fake server")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Per-request delay in the fake server")
+    args = parser.parse_args(argv)
+
+    host = args.host
+    fake = None
+    if host is None:
+        host, fake, _, _ = start_fake(args.containers, args.latency_ms)
+
+    async def list_ids():
+        from backend.async_docker import AsyncDockerClient
+        async with AsyncDockerClient(host) as client:
+            return [row["Id"] for row in await client.containers(all=True)]
+
+    ids = asyncio.run(list_ids())
+    if not ids:
+        print("No containers to inspect")
+        return 1
+
+    print(f"{args.requests} inspects of {len(ids)} containers, concurrency {args.concurrency}, {host}")
+    baseline = bench_docker_py(host, ids, args.requests, args.concurrency)
+    print(f"  docker-py (threads)    {args.requests / baseline:9.0f} req/s")
+    for label, pipelined in (("async", False), ("async (pipelined)", True)):
+        elapsed, stats = asyncio.run(bench_async(host, ids, args.requests, args.concurrency, pipelined))
+        print(f"  {label:<22} {args.requests / elapsed:9.0f} req/s  "
+              f"x{baseline / elapsed:.1f}, {stats['connections_opened']} connections")
+    if fake is not None:
+        print(f"  fake server saw {fake.connection_count} connections")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
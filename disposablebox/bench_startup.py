@@ -0,0 +1,76 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Cold-start benchmark for the CLI:
+#
+#     python -m disposablebox.bench_startup --runs 10 --budget-ms 500
+#
+# Each run is a fresh interpreter executing `python -m disposablebox ls`.
+# Exits non-zero if the command itself failed (e.g. Docker unreachable,
+# which would time the error path instead), if the median wall time is
+# over budget or if Qt or FastAPI were imported along the way.
+
+DEFAULT_RUNS = 10
+DEFAULT_BUDGET_MS = 500
+FORBIDDEN_MODULES = ("PyQt5", "fastapi", "uvicorn")
+
+
+def run_once(command, cwd):
+    start = time.perf_counter()
+    result = subprocess.run(command, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return (time.perf_counter() - start) * 1000, result.returncode
+
+
+def imported_modules(command, cwd):
+    result = subprocess.run(
+        [command[0], "-X", "importtime"] + command[1:],
+        cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    modules = set()
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            modules.add(line.rsplit("|", 1)[1].strip().split(".")[0])
+    return modules
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure CLI cold-start time")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("args", nargs="*", default=["ls", "--limit", "1"], help="CLI arguments to time")
+    args = parser.parse_args(argv)
+
+    cwd = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    command = [sys.executable, "-m", "disposablebox"] + args.args
+
+    run_once(command, cwd)  # Warm the filesystem cache and .pyc files
+    timings = []
+    exit_codes = set()
+    for _ in range(args.runs):
+        elapsed, code = run_once(command, cwd)
+        timings.append(elapsed)
+        exit_codes.add(code)
+
+    median = statistics.median(timings)
+    forbidden = sorted(imported_modules(command, cwd) & set(FORBIDDEN_MODULES))
+    print(f"{' '.join(args.args)}: {args.runs} runs, min {min(timings):.0f} ms, "
+          f"median {median:.0f} ms, max {max(timings):.0f} ms (budget {args.budget_ms:.0f} ms)")
+    if exit_codes != {0}:
+        print(f"FAIL: command exit codes {sorted(exit_codes)}; timings are of the error path (is Docker reachable?)")
+        return 1
+    if forbidden:
+        print(f"FAIL: imported {', '.join(forbidden)}")
+        return 1
+    if median > args.budget_ms:
+        print("FAIL: median over budget")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
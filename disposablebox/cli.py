@@ -0,0 +1,269 @@
+import argparse
+import json
+import sys
+
+# Command-line front end. Only argparse and json are imported up front:
+# Docker, SQLAlchemy and the container actions are imported inside the
+# command that needs them, and Qt and FastAPI never are. Every result is
+# written as one JSON object per line as soon as it is known.
+
+DEFAULT_RM_CONCURRENCY = 16
+
+
+def emit(obj):
+    sys.stdout.write(json.dumps(obj))
+    sys.stdout.write("\n")
+    sys.stdout.flush()
+
+
+def progress_printer(event):
+    def report(percent, message=""):
+        emit({"event": event, "percent": percent, "message": message})
+    return report
+
+
+def cmd_ls(args):
+    from backend.docker_service import DockerService
+    from backend.warm_pool import POOL_NAME_PREFIX
+
+    filters = {"status": args.status} if args.status else None
+    rows = DockerService.instance().client.api.containers(all=not args.running, filters=filters)
+    count = 0
+    for row in rows:
+        names = row.get("Names") or []
+        name = names[0].lstrip('/') if names else ""
+        if name.startswith(POOL_NAME_PREFIX) and not args.pool:
+            continue
+        emit({
+            "id": row["Id"],
+            "name": name,
+            "image": row.get("Image"),
+            "state": row.get("State"),
+            "status": row.get("Status"),
+            "created": row.get("Created"),
+            "labels": row.get("Labels") or {}
+        })
+        count += 1
+        if args.limit and count >= args.limit:
+            break
+    return 0
+
+
+def cmd_create(args):
+    from backend.container_actions import provision_container
+    from backend.docker_service import DockerService
+    from backend.image_builder import ImageBuilder
+    from backend.image_index import ImageIndex
+    from backend.image_puller import ImagePuller
+    from backend.operation_context import OperationContext
+    from backend.paths import WORKSPACE_DIR
+    from backend.presets import preset_images
+    from backend.snapshot_catalog import SnapshotCatalog
+    from backend.warm_pool import WarmPool
+    import os
+
+    docker_service = DockerService.instance()
+    index = ImageIndex(docker_service)
+    os.makedirs(WORKSPACE_DIR, exist_ok=True)
+
+    dockerfile_content = None
+    if args.dockerfile:
+        with open(args.dockerfile, 'r') as f:
+            dockerfile_content = f.read()
+
+    pool = None
+    if not args.no_pool:
+        # No refill thread here: take whatever the GUI or API server keeps warm
+        pool = WarmPool(docker_service, WORKSPACE_DIR, index, preset_images())
+        pool.adopt()
+
+    for _ in range(args.count):
+        name = provision_container(
+            OperationContext(progress_printer("progress")),
+            ImagePuller(docker_service, index),
+            ImageBuilder(docker_service),
+            args.name if args.count == 1 else None,
+            args.dockerfile if args.dockerfile else args.image,
+            dockerfile_content,
+            bool(args.dockerfile),
+            WORKSPACE_DIR,
+            SnapshotCatalog.instance().image_ids(),
+            refresh=args.refresh,
+            pool=pool,
+            ttl=args.ttl,
+            idle_timeout=args.idle_timeout
+        )
+        emit({"event": "created", "name": name})
+    return 0
+
+
+def cmd_rm(args):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from backend.container_actions import remove_container
+    from backend.operation_context import OperationContext
+
+    failed = 0
+    with ThreadPoolExecutor(max_workers=min(args.concurrency, len(args.names))) as pool:
+        futures = [(name, pool.submit(remove_container, OperationContext(), name)) for name in args.names]
+        for name, future in futures:
+            try:
+                emit({"event": "removed", "name": future.result()})
+            except Exception as e:
+                failed += 1
+                emit({"event": "error", "name": name, "error": str(e)})
+    return 1 if failed else 0
+
+
+def cmd_snapshot(args):
+    from backend.container_actions import commit_container
+    from backend.operation_context import OperationContext
+
+    name, image_name, record = commit_container(
+        OperationContext(progress_printer("progress")), args.container, args.image_name
+    )
+    emit({
+        "event": "snapshot",
+        "container": name,
+        "image_name": image_name,
+        "image_id": record.image_id,
+        "size": record.size,
+        "layer_size": record.layer_size
+    })
+    return 0
+
+
+def cmd_exec(args):
+    from backend.docker_service import DockerService
+
+    api = DockerService.instance().client.api
+    command = args.command[1:] if args.command[:1] == ["--"] else args.command
+    exec_id = api.exec_create(args.container, command, workdir=args.workdir, user=args.user)["Id"]
+    for stdout, stderr in api.exec_start(exec_id, stream=True, demux=True):
+        if stdout:
+            emit({"event": "stdout", "data": stdout.decode(errors="replace")})
+        if stderr:
+            emit({"event": "stderr", "data": stderr.decode(errors="replace")})
+    exit_code = api.exec_inspect(exec_id).get("ExitCode")
+    emit({"event": "exit", "exit_code": exit_code})
+    return exit_code or 0
+
+
+def cmd_prune(args):
+    from backend.docker_service import DockerService
+    from backend.snapshot_catalog import DEFAULT_KEEP_LAST, SnapshotCatalog
+
+    docker_service = DockerService.instance()
+    removed, gone = SnapshotCatalog.instance().prune(
+        docker_service,
+        keep_last=DEFAULT_KEEP_LAST if args.keep_last is None else args.keep_last,
+        max_age_days=args.max_age_days,
+        dry_run=args.dry_run,
+        progress=progress_printer("progress")
+    )
+    for image_id in removed:
+        emit({"event": "would_remove" if args.dry_run else "removed_snapshot", "image_id": image_id})
+    for image_id in gone:
+        emit({"event": "forgot_snapshot", "image_id": image_id})
+
+    if args.expired and not args.dry_run:
+        from backend.paths import WORKSPACE_DIR
+        from backend.reaper import Reaper
+
+        summary = Reaper(docker_service, WORKSPACE_DIR, SnapshotCatalog.instance()).run(
+            progress=progress_printer("reaper")
+        )
+        emit({"event": "reaped", **summary})
+    return 0
+
+
+def cmd_import_iso(args):
+    from backend.container_actions import import_iso
+    from backend.iso_manager import ISOManager
+    from backend.operation_context import OperationContext
+
+    manager = ISOManager()
+    for path in args.paths:
+        emit({"event": "imported", "path": import_iso(OperationContext(progress_printer("progress")), manager, path)})
+    return 0
+
+
+def cmd_iso_image(args):
+    from backend.container_actions import build_iso_image
+    from backend.docker_service import DockerService
+    from backend.iso_image import ISOImageBuilder
+    from backend.iso_manager import ISOManager
+    from backend.operation_context import OperationContext
+
+    builder = ISOImageBuilder(DockerService.instance(), ISOManager())
+    for path in args.paths:
+        image_id = build_iso_image(OperationContext(progress_printer("progress")), builder, path)
+        emit({"event": "image", "path": path, "image_id": image_id})
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m disposablebox", description="Manage DisposableBox containers")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ls = commands.add_parser("ls", help="List containers")
+    ls.add_argument("--running", action="store_true", help="Only running containers")
+    ls.add_argument("--status", help="Filter by Docker status (running, exited, ...)")
+    ls.add_argument("--limit", type=int, default=0)
+    ls.add_argument("--pool", action="store_true", help="Include warm-pool containers")
+    ls.set_defaults(func=cmd_ls)
+
+    create = commands.add_parser("create", help="Create a container")
+    create.add_argument("image", nargs="?", default="ubuntu:22.04")
+    create.add_argument("--name")
+    create.add_argument("--dockerfile", help="Build from this Dockerfile instead of pulling image")
+    create.add_argument("--count", type=int, default=1)
+    create.add_argument("--ttl", type=int, help="Remove after this many seconds")
+    create.add_argument("--idle-timeout", type=int, help="Remove after being stopped this many seconds")
+    create.add_argument("--refresh", action="store_true", help="Pull even if the image is present")
+    create.add_argument("--no-pool", action="store_true", help="Never take a warm-pool container")
+    create.set_defaults(func=cmd_create)
+
+    rm = commands.add_parser("rm", help="Remove containers")
+    rm.add_argument("names", nargs="+")
+    rm.add_argument("--concurrency", type=int, default=DEFAULT_RM_CONCURRENCY)
+    rm.set_defaults(func=cmd_rm)
+
+    snapshot = commands.add_parser("snapshot", help="Commit a container to an image")
+    snapshot.add_argument("container")
+    snapshot.add_argument("image_name")
+    snapshot.set_defaults(func=cmd_snapshot)
+
+    exec_ = commands.add_parser("exec", help="Run a command in a running container")
+    exec_.add_argument("container")
+    exec_.add_argument("command", nargs=argparse.REMAINDER)
+    exec_.add_argument("--workdir")
+    exec_.add_argument("--user", default="")
+    exec_.set_defaults(func=cmd_exec)
+
+    prune = commands.add_parser("prune", help="Apply snapshot retention and remove expired boxes")
+    prune.add_argument("--keep-last", type=int, help="Snapshots kept per container (default: catalog default)")
+    prune.add_argument("--max-age-days", type=float)
+    prune.add_argument("--expired", action="store_true", help="Also run the TTL/idle reaper")
+    prune.add_argument("--dry-run", action="store_true")
+    prune.set_defaults(func=cmd_prune)
+
+    import_iso = commands.add_parser("import-iso", help="Copy ISOs into the content-addressed ISO store")
+    import_iso.add_argument("paths", nargs="+")
+    import_iso.set_defaults(func=cmd_import_iso)
+
+    iso_image = commands.add_parser("iso-image", help="Import the root filesystem of ISOs as Docker images")
+    iso_image.add_argument("paths", nargs="+")
+    iso_image.set_defaults(func=cmd_iso_image)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except KeyboardInterrupt:
+        return 130
+    except Exception as e:
+        emit({"event": "error", "error": str(e)})
+        return 1
@@ -0,0 +1,394 @@
+import argparse
+import asyncio
+import hashlib
+import io
+import json
+import re
+import struct
+import tarfile
+import time
+import uuid
+from urllib.parse import parse_qs, unquote, urlsplit
+
+# In-memory stand-in for the Docker Engine API, for exercising
+# backend.async_docker and docker-py without a daemon:
+#
+#     python -m disposablebox.fake_docker --socket /tmp/fake-docker.sock --containers 200
+#     DOCKER_HOST=unix:///tmp/fake-docker.sock python -m disposablebox ls
+#
+# Connections are HTTP/1.1 keep-alive and requests are answered in the order
+# they arrive, so pipelined requests work. Only the calls the app makes in
+# bulk are implemented: version, ping, list, inspect, start, stop, remove,
+# events, stats and logs, plus image import and listing.
+
+API_VERSION = "1.41"
+STATS_INTERVAL = 1.0
+LOG_INTERVAL = 1.0
+
+_VERSION_PREFIX = re.compile(r"^/v[\d.]+")
+_CONTAINER_PATH = re.compile(r"^/containers/([^/]+)(/json|/start|/stop|/stats|/logs)?$")
+
+
+def _flag(query, key, default=False):
+    values = query.get(key)
+    if not values:
+        return default
+    return values[-1].lower() in ("1", "true", "yes")
+
+
+class FakeDocker:
+    def __init__(self, containers=100, latency=0.0):
+        self.latency = latency  # Seconds added to every request, to stand in for daemon work
+        self.containers = {}
+        self.request_count = 0
+        self.connection_count = 0
+        self.images = {}  # id -> {"RepoTags", "Labels", "Members"}
+        self._subscribers = set()
+        for i in range(containers):
+            self.add_container(f"box{i}", running=i % 2 == 0)
+
+    def add_container(self, name, image="ubuntu:22.04", running=False, labels=None):
+        container_id = uuid.uuid4().hex + uuid.uuid4().hex
+        self.containers[container_id] = {
+            "Id": container_id,
+            "Name": name,
+            "Image": image,
+            "Created": int(time.time()),
+            "Running": running,
+            "Labels": labels or {},
+            "FinishedAt": "0001-01-01T00:00:00Z"
+        }
+        return container_id
+
+    def find(self, ref):
+        ref = unquote(ref)
+        if ref in self.containers:
+            return self.containers[ref]
+        for container in self.containers.values():
+            if container["Name"] == ref.lstrip('/') or container["Id"].startswith(ref):
+                return container
+        return None
+
+    @staticmethod
+    def _state(container):
+        return "running" if container["Running"] else "exited"
+
+    def row(self, container):
+        return {
+            "Id": container["Id"],
+            "Names": ["/" + container["Name"]],
+            "Image": container["Image"],
+            "ImageID": "sha256:" + "0" * 64,
+            "Command": "/bin/bash",
+            "Created": container["Created"],
+            "State": self._state(container),
+            "Status": "Up" if container["Running"] else "Exited (0)",
+            "Labels": container["Labels"]
+        }
+
+    def inspect(self, container):
+        return {
+            "Id": container["Id"],
+            "Name": "/" + container["Name"],
+            "Created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(container["Created"])),
+            "Image": "sha256:" + "0" * 64,
+            "State": {
+                "Status": self._state(container),
+                "Running": container["Running"],
+                "ExitCode": 0,
+                "FinishedAt": container["FinishedAt"]
+            },
+            "Config": {"Image": container["Image"], "Labels": container["Labels"], "Tty": False},
+            "Mounts": []
+        }
+
+    def publish(self, container, action):
+        event = {
+            "Type": "container",
+            "Action": action,
+            "status": action,
+            "id": container["Id"],
+            "Actor": {"ID": container["Id"], "Attributes": {"name": container["Name"], "image": container["Image"]}},
+            "time": int(time.time()),
+            "timeNano": time.time_ns()
+        }
+        for queue in self._subscribers:
+            queue.put_nowait(event)
+
+    # -- HTTP ----------------------------------------------------------------
+
+    async def serve_unix(self, path):
+        return await asyncio.start_unix_server(self.handle, path=path)
+
+    async def serve_tcp(self, host="127.0.0.1", port=0):
+        return await asyncio.start_server(self.handle, host=host, port=port)
+
+    async def handle(self, reader, writer):
+        self.connection_count += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line.strip():
+                    break
+                method, target, protocol = line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    if header in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = header.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                body = await self.read_body(reader, headers)
+                self.request_count += 1
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                keep_alive = protocol == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                if not await self.dispatch(method, target, body, reader, writer) or not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def read_body(reader, headers):
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            body = bytearray()
+            while True:
+                size = int((await reader.readline()).split(b";", 1)[0].strip() or b"0", 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    return bytes(body)
+                body += await reader.readexactly(size)
+                await reader.readexactly(2)
+        length = int(headers.get("content-length") or 0)
+        return await reader.readexactly(length) if length else b""
+
+    @staticmethod
+    def _respond(writer, status, body=None, content_type="application/json"):
+        reason = {200: "OK", 201: "Created", 204: "No Content", 304: "Not Modified",
+                  404: "Not Found", 409: "Conflict"}.get(status, "Error")
+        data = b""
+        if body is not None:
+            data = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+        head = [f"HTTP/1.1 {status} {reason}", "Api-Version: " + API_VERSION]
+        if status != 204 and status != 304:
+            head += [f"Content-Type: {content_type}", f"Content-Length: {len(data)}"]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + data)
+
+    @staticmethod
+    def _start_chunked(writer, content_type):
+        writer.write((
+            "HTTP/1.1 200 OK\r\n"
+            f"Content-Type: {content_type}\r\n"
+            "Transfer-Encoding: chunked\r\n\r\n"
+        ).encode("latin-1"))
+
+    @staticmethod
+    async def _chunk(writer, data):
+        writer.write(f"{len(data):x}\r\n".encode("latin-1") + data + b"\r\n")
+        await writer.drain()
+
+    async def dispatch(self, method, target, body, reader, writer):
+        # Returns False when the connection has to be closed afterwards
+        url = urlsplit(target)
+        path = _VERSION_PREFIX.sub("", url.path)
+        query = parse_qs(url.query)
+
+        if path == "/_ping":
+            self._respond(writer, 200, b"OK", "text/plain")
+        elif path == "/version":
+            self._respond(writer, 200, {"ApiVersion": API_VERSION, "MinAPIVersion": "1.12", "Version": "fake"})
+        elif path == "/containers/json" and method == "GET":
+            self._respond(writer, 200, self.list_rows(query))
+        elif path == "/images/json" and method == "GET":
+            self._respond(writer, 200, self.image_rows(query))
+        elif path == "/images/create" and method == "POST" and query.get("fromSrc") == ["-"]:
+            self._respond(writer, 200, self.import_image(query, body))
+        elif path == "/events" and method == "GET":
+            await self.stream_events(reader, writer)
+            return False
+        else:
+            match = _CONTAINER_PATH.match(path)
+            container = self.find(match.group(1)) if match else None
+            if match is None:
+                self._respond(writer, 404, {"message": f"page not found: {path}"})
+            elif container is None:
+                self._respond(writer, 404, {"message": f"No such container: {unquote(match.group(1))}"})
+            else:
+                return await self.container_call(method, match.group(2), query, container, reader, writer)
+        await writer.drain()
+        return True
+
+    def import_image(self, query, body):
+        # docker import: checks the tar and applies LABEL changes
+        try:
+            with tarfile.open(fileobj=io.BytesIO(body), mode="r|") as archive:
+                members = [member.name for member in archive]
+        except tarfile.TarError as e:
+            return {"errorDetail": {"message": str(e)}, "error": str(e)}
+        labels = {}
+        for change in query.get("changes", []):
+            if change.startswith("LABEL "):
+                key, _, value = change[len("LABEL "):].partition("=")
+                labels[key] = value
+        # Like a real image id, covers the configuration as well as the layer
+        config = json.dumps(sorted(query.get("changes", []))).encode()
+        image_id = "sha256:" + hashlib.sha256(hashlib.sha256(body).digest() + config).hexdigest()
+        tag = f"{query['repo'][-1]}:{query.get('tag', ['latest'])[-1]}" if query.get("repo") else None
+        self.images[image_id] = {"RepoTags": [tag] if tag else [], "Labels": labels, "Members": members}
+        return {"status": image_id}
+
+    def image_rows(self, query):
+        filters = json.loads(query["filters"][-1]) if query.get("filters") else {}
+        wanted = filters.get("label") or []
+        if isinstance(wanted, dict):
+            wanted = [key for key, enabled in wanted.items() if enabled]
+        rows = []
+        for image_id, image in self.images.items():
+            labels = image["Labels"]
+            if all(labels.get(item.partition("=")[0]) == item.partition("=")[2] if "=" in item else item in labels
+                   for item in wanted):
+                rows.append({"Id": image_id, "RepoTags": image["RepoTags"], "Labels": labels, "Size": 0})
+        return rows
+
+    def list_rows(self, query):
+        filters = json.loads(query["filters"][-1]) if query.get("filters") else {}
+        rows = []
+        for container in self.containers.values():
+            if not container["Running"] and not _flag(query, "all"):
+                continue
+            if filters.get("status") and self._state(container) not in filters["status"]:
+                continue
+            rows.append(self.row(container))
+        limit = int(query["limit"][-1]) if query.get("limit") else 0
+        return rows[:limit] if limit > 0 else rows
+
+    async def container_call(self, method, action, query, container, reader, writer):
+        if method == "GET" and action == "/json":
+            self._respond(writer, 200, self.inspect(container))
+        elif method == "POST" and action in ("/start", "/stop"):
+            running = action == "/start"
+            if container["Running"] == running:
+                self._respond(writer, 304)
+            else:
+                container["Running"] = running
+                if not running:
+                    container["FinishedAt"] = time.strftime("%Y-%m-%dT%H:%M:%S.000000000Z", time.gmtime())
+                self._respond(writer, 204)
+                self.publish(container, "start" if running else "die")
+        elif method == "DELETE" and action is None:
+            if container["Running"] and not _flag(query, "force"):
+                self._respond(writer, 409, {"message": "You cannot remove a running container"})
+            else:
+                del self.containers[container["Id"]]
+                self._respond(writer, 204)
+                self.publish(container, "destroy")
+        elif method == "GET" and action == "/stats":
+            await self.stream_stats(container, _flag(query, "stream", True), reader, writer)
+            return False
+        elif method == "GET" and action == "/logs":
+            await self.stream_logs(container, _flag(query, "follow"), reader, writer)
+            return False
+        else:
+            self._respond(writer, 404, {"message": f"page not found: {method} {action}"})
+        await writer.drain()
+        return True
+
+    async def _until_disconnect(self, reader, writer, produce):
+        # Runs produce() until it finishes or the client goes away
+        closed = asyncio.ensure_future(reader.read())
+        producer = asyncio.ensure_future(produce())
+        try:
+            await asyncio.wait({closed, producer}, return_when=asyncio.FIRST_COMPLETED)
+            if producer.done() and not producer.cancelled() and producer.exception() is None:
+                await self._chunk(writer, b"")
+        finally:
+            closed.cancel()
+            producer.cancel()
+
+    async def stream_events(self, reader, writer):
+        queue = asyncio.Queue()
+        self._subscribers.add(queue)
+
+        async def produce():
+            while True:
+                event = await queue.get()
+                await self._chunk(writer, json.dumps(event).encode("utf-8") + b"\n")
+
+        self._start_chunked(writer, "application/json")
+        try:
+            await self._until_disconnect(reader, writer, produce)
+        finally:
+            self._subscribers.discard(queue)
+
+    def stats_sample(self, container, tick):
+        usage = tick * 10_000_000 if container["Running"] else 0
+        return {
+            "read": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "cpu_stats": {"cpu_usage": {"total_usage": usage}, "system_cpu_usage": tick * 1_000_000_000, "online_cpus": 4},
+            "precpu_stats": {"cpu_usage": {"total_usage": max(0, usage - 10_000_000)},
+                             "system_cpu_usage": max(0, tick - 1) * 1_000_000_000},
+            "memory_stats": {"usage": 64 * 2 ** 20, "limit": 2 ** 30, "stats": {"inactive_file": 0}},
+            "networks": {"eth0": {"rx_bytes": tick * 1024, "tx_bytes": tick * 512}}
+        }
+
+    async def stream_stats(self, container, stream, reader, writer):
+        async def produce():
+            tick = 1
+            while True:
+                await self._chunk(writer, json.dumps(self.stats_sample(container, tick)).encode("utf-8") + b"\n")
+                if not stream:
+                    return
+                tick += 1
+                await asyncio.sleep(STATS_INTERVAL)
+
+        self._start_chunked(writer, "application/json")
+        await self._until_disconnect(reader, writer, produce)
+
+    async def stream_logs(self, container, follow, reader, writer):
+        def frame(stream_type, text):
+            data = text.encode("utf-8")
+            return struct.pack(">BxxxL", stream_type, len(data)) + data
+
+        async def produce():
+            await self._chunk(writer, frame(1, f"{container['Name']} started\n") + frame(2, "warning: fake daemon\n"))
+            line = 0
+            while follow:
+                await asyncio.sleep(LOG_INTERVAL)
+                line += 1
+                await self._chunk(writer, frame(1, f"line {line}\n"))
+
+        self._start_chunked(writer, "application/vnd.docker.multiplexed-stream")
+        await self._until_disconnect(reader, writer, produce)
+
+
+async def serve(args):
+    fake = FakeDocker(args.containers, args.latency_ms / 1000)
+    if args.socket:
+        server = await fake.serve_unix(args.socket)
+        print(f"Fake Docker API on unix://{args.socket} with {args.containers} containers", flush=True)
+    else:
+        server = await fake.serve_tcp(args.host, args.port)
+        host, port = server.sockets[0].getsockname()[:2]
+        print(f"Fake Docker API on tcp://{host}:{port} with {args.containers} containers", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve an in-memory fake of the Docker Engine API")
+    parser.add_argument("--socket", help="Unix socket path (default: TCP)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=2375)
+    parser.add_argument("--containers", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay added to every request")
+    try:
+        asyncio.run(serve(parser.parse_args(argv)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import asyncio
+import threading
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+class AsyncBridge(QObject):
+    # Runs one asyncio loop for AsyncDockerClient and delivers results on the
+    # GUI thread. Like qasync, callers hand over coroutines and get their
+    # callbacks back on the Qt side; unlike qasync the loop keeps its own
+    # thread instead of replacing Qt's, so a busy repaint never stalls
+    # in-flight requests and no extra dependency is needed.
+    delivered = pyqtSignal(object, object)  # callback, value
+
+    def __init__(self, client_factory=None, parent=None):
+        super().__init__(parent)
+        self.client_factory = client_factory
+        self.loop = asyncio.new_event_loop()
+        self._client = None
+        self._thread = None
+        self.delivered.connect(self._deliver)
+
+    @property
+    def client(self):
+        # Created on first use, inside the loop thread's world
+        if self._client is None:
+            from backend.async_docker import AsyncDockerClient
+            self._client = (self.client_factory or AsyncDockerClient)()
+        return self._client
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self.loop.run_forever, name="asyncio", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+
+        async def shutdown():
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if self._client is not None:
+                await self._client.close()
+
+        try:
+            asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result(timeout=2)
+        except Exception:
+            pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=2)
+        self._thread = None
+
+    def _deliver(self, callback, value):
+        callback(value)
+
+    def _emit(self, callback, value):
+        if callback is not None:
+            self.delivered.emit(callback, value)
+
+    def submit(self, coro, on_result=None, on_error=None):
+        # Returns a concurrent.futures.Future; on_error receives the message
+        self.start()
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+        def done(future):
+            if future.cancelled():
+                return
+            error = future.exception()
+            if error is not None:
+                self._emit(on_error, str(error))
+            else:
+                self._emit(on_result, future.result())
+
+        future.add_done_callback(done)
+        return future
+
+    def iterate(self, stream, on_item, on_error=None, on_finished=None):
+        # Drains an async iterator (events, stats, logs) on the loop; cancel
+        # the returned future to stop it
+        async def drain():
+            async for item in stream:
+                self._emit(on_item, item)
+
+        return self.submit(drain(), on_result=on_finished and (lambda _: on_finished()), on_error=on_error)
@@ -1,24 +1,44 @@
-from PyQt5.QtWidgets import QFrame, QVBoxLayout, QHBoxLayout, QLabel, QWidget, QSizePolicy, QPushButton, QInputDialog, QMessageBox
+from PyQt5.QtWidgets import QFrame, QVBoxLayout, QHBoxLayout, QLabel, QWidget, QSizePolicy, QPushButton, QInputDialog, QMessageBox, QCheckBox
 from PyQt5.QtGui import QFontMetrics, QColor
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QObject
+from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import QGraphicsDropShadowEffect
-import docker
 import subprocess
-import time
 import sys
 
+from backend.container_cache import image_id_of
+from frontend.sparkline import Sparkline
+from backend.container_actions import (
+    toggle_state, remove_container, commit_container, start_for_terminal, prepare_terminal
+)
+
+def format_bytes(value):
+    for unit in ("B", "KB", "MB", "GB"):
+        if value < 1024:
+            return f"{value:.0f} {unit}"
+        value /= 1024
+    return f"{value:.1f} TB"
+
 class ElidedLabel(QLabel):
     def __init__(self, text, parent=None):
         super().__init__(text, parent)
+        self.full_text = text
         self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
         self.setWordWrap(False)
         self.setAlignment(Qt.AlignCenter)
         self.setStyleSheet("padding-left: 10px;")  # Add padding to the left
     
-    def resizeEvent(self, event):
+    def set_full_text(self, text):
+        # Keep the unelided text so recycled cards and wider labels re-elide correctly
+        self.full_text = text
+        self.elide()
+
+    def elide(self):
         fm = QFontMetrics(self.font())
-        elided_text = fm.elidedText(self.text(), Qt.ElideRight, self.width() - 20)  # Adjust width for padding
+        elided_text = fm.elidedText(self.full_text, Qt.ElideRight, self.width() - 20)  # Adjust width for padding
         self.setText(elided_text)
+
+    def resizeEvent(self, event):
+        self.elide()
         super().resizeEvent(event)
 
 class ContainerCard(QFrame):
@@ -95,15 +115,22 @@ class ContainerCard(QFrame):
         layout.setContentsMargins(10, 10, 10, 10)
         layout.setSpacing(5)
         
+        # Selection for bulk actions (edit mode only)
+        self.select_check = QCheckBox("Select")
+        self.select_check.setStyleSheet("background-color: transparent;")
+        self.select_check.setChecked(self.container.id in self.main_window.selected_ids)
+        self.select_check.toggled.connect(self.selection_toggled)
+        layout.addWidget(self.select_check, alignment=Qt.AlignLeft)
+        
         # Container name (truncated if too long)
-        name_label = ElidedLabel(self.container.name)
-        name_label.setObjectName("nameLabel")
-        layout.addWidget(name_label)
+        self.name_label = ElidedLabel(self.container.name)
+        self.name_label.setObjectName("nameLabel")
+        layout.addWidget(self.name_label)
         
         # Container ID
-        id_label = QLabel(f"ID: {self.container.short_id}")
-        id_label.setObjectName("idLabel")
-        layout.addWidget(id_label)
+        self.id_label = QLabel(f"ID: {self.container.short_id}")
+        self.id_label.setObjectName("idLabel")
+        layout.addWidget(self.id_label)
         
         # Status with colored background
         status_container = QWidget()
@@ -113,6 +140,7 @@ class ContainerCard(QFrame):
         self.status_label = QLabel(self.container.status.upper())
         self.status_label.setObjectName("statusLabel")
         status_color = "#28a745" if self.container.status == "running" else "#dc3545"
+        self.status_color = status_color
         self.status_label.setStyleSheet(f"""
             QLabel#statusLabel {{
                 background-color: {status_color};
@@ -123,11 +151,19 @@ class ContainerCard(QFrame):
         status_layout.addStretch()
         layout.addWidget(status_container)
         
+        # Live resource usage (running containers only)
+        self.stats_label = QLabel()
+        self.stats_label.setAlignment(Qt.AlignCenter)
+        self.stats_label.setStyleSheet("color: #6c757d; font-size: 11px; padding: 0;")
+        layout.addWidget(self.stats_label)
+        self.cpu_sparkline = Sparkline("#28a745", max_value=100)
+        layout.addWidget(self.cpu_sparkline)
+        self.update_stats(None)
+        
         # Image name (truncated if too long)
-        image_name = self.container.image.tags[0] if self.container.image.tags else 'none'
-        image_label = ElidedLabel(image_name)
-        image_label.setObjectName("imageLabel")
-        layout.addWidget(image_label)
+        self.image_label = ElidedLabel(self.image_name(self.container))
+        self.image_label.setObjectName("imageLabel")
+        layout.addWidget(self.image_label)
         
         # Buttons for actions
         self.button_layout = QHBoxLayout()
@@ -136,8 +172,15 @@ class ContainerCard(QFrame):
         self.action_btn.setFixedHeight(30)
         self.action_btn.setFixedWidth(60)
         self.action_btn.clicked.connect(self.toggle_container_state)
+        self.action_pending = None  # Styled by the first set_action_pending()
         self.button_layout.addWidget(self.action_btn)
         
+        self.logs_btn = QPushButton("Logs")
+        self.logs_btn.setFixedHeight(30)
+        self.logs_btn.setFixedWidth(60)
+        self.logs_btn.clicked.connect(self.show_logs)
+        self.button_layout.addWidget(self.logs_btn)
+        
         self.delete_btn = QPushButton("Delete")
         self.delete_btn.clicked.connect(self.delete_container)
         self.button_layout.addWidget(self.delete_btn)
@@ -154,214 +197,209 @@ class ContainerCard(QFrame):
         # Hide buttons initially
         self.set_edit_mode(False)
 
+    def image_name(self, container):
+        # Tags come from the shared cache (one images list for all cards)
+        # instead of container.image, which inspects the image per card
+        tags = self.main_window.container_cache.image_tags(image_id_of(container), refresh=False)
+        return tags[0] if tags else 'none'
+
+    def update_container(self, container):
+        # Refresh the card in place from a newer snapshot of the same container
+        previous = self.container
+        self.container = container
+        if container.name != previous.name:
+            self.name_label.set_full_text(container.name)
+        if image_id_of(container) != image_id_of(previous):
+            self.image_label.set_full_text(self.image_name(container))
+        if container.status != previous.status:
+            self.update_status(container.status)
+            if container.status != "running":
+                self.update_stats(None)
+
+    def bind(self, container):
+        # Point a recycled card at another container. All per-container state
+        # (selection, edit mode, pending operations) lives outside the widget.
+        self.container = container
+        self.name_label.set_full_text(container.name)
+        self.id_label.setText(f"ID: {container.short_id}")
+        self.image_label.set_full_text(self.image_name(container))
+        self.update_status(container.status)
+        self.set_action_pending(self.main_window.operations.is_busy(container.id))
+        self.select_check.blockSignals(True)
+        self.select_check.setChecked(container.id in self.main_window.selected_ids)
+        self.select_check.blockSignals(False)
+        self.set_edit_mode(self.main_window.edit_mode)
+        self.update_stats(self.main_window.stats_monitor.series.get(container.id))
+
+    def update_stats(self, series):
+        if series is None:
+            self.stats_label.setText("")
+            self.cpu_sparkline.set_values([])
+            return
+        self.stats_label.setText(
+            f"CPU {series.cpu_percent:.1f}%  MEM {format_bytes(series.memory_usage)}  "
+            f"NET {format_bytes(series.rx_rate + series.tx_rate)}/s"
+        )
+        self.cpu_sparkline.set_values(series.values("cpu"))
+
+    def is_bound_to(self, container_id):
+        return self.container.id == container_id
+
     def set_edit_mode(self, edit_mode):
+        self.edit_mode = edit_mode
+        self.select_check.setVisible(edit_mode)
         self.delete_btn.setVisible(edit_mode)
         self.snapshot_btn.setVisible(edit_mode)
         self.action_btn.setVisible(not edit_mode)
-        self.button_layout.setSpacing(10 if edit_mode else 0)
+        self.logs_btn.setVisible(not edit_mode)
+        self.button_layout.setSpacing(10)
         self.button_layout.setContentsMargins(0, 0, 0, 0 if edit_mode else 10)
 
+    def run_operation(self, func, *args, on_finished=None, title="Container Action"):
+        # Every Docker call of a card goes through the shared operation queue,
+        # keyed by container id so actions on one container never overlap.
+        # Callbacks get the container id because the card may have been
+        # recycled for another container by the time the operation ends.
+        container_id = self.container.id
+        operation = self.main_window.operations.create(func, *args, key=container_id)
+        operation.signals.progress.connect(
+            lambda percent, message: self.log_message(title, message, "Info")
+        )
+        operation.signals.error.connect(
+            lambda error: self.operation_failed(container_id, title, error)
+        )
+        if on_finished is not None:
+            operation.signals.finished.connect(
+                lambda result: on_finished(container_id, result)
+            )
+        return self.main_window.operations.start(operation)
+
+    def operation_failed(self, container_id, title, error):
+        print(f"{title} failed: {error}")
+        self.log_message(title, f"Error: {error}", "Error")
+        if self.is_bound_to(container_id):
+            self.update_status(self.container.status)
+            self.set_action_pending(False)
+
+    def set_action_pending(self, pending):
+        # The action button stays disabled from click until the operation
+        # ends; status updates from the event stream never re-enable it
+        if pending == self.action_pending:
+            return
+        self.action_pending = pending
+        self.action_btn.setEnabled(not pending)
+        self.action_btn.setStyleSheet("background-color: #003166;" if pending else "background-color: #007bff;")
+
     def toggle_container_state(self):
-        self.action_btn.setEnabled(False)  # Disable the button while updating state
-        self.action_btn.setStyleSheet("background-color: #003166;")  # Change color to indicate loading
+        self.set_action_pending(True)
 
-        self.thread = QThread()
-        self.worker = ContainerStateWorker(self.container.id)
-        self.worker.moveToThread(self.thread)
-        
-        self.thread.started.connect(self.worker.run)
-        self.worker.finished.connect(self.thread.quit)
-        self.worker.finished.connect(self.worker.deleteLater)
-        self.thread.finished.connect(self.thread.deleteLater)
-        
-        self.worker.status_updated.connect(self.update_status)
-        self.worker.log_message.connect(self.log_message)
-        
-        self.thread.start()
+        self.run_operation(
+            toggle_state,
+            self.container.id,
+            on_finished=self.state_toggled,
+            title="Container State Toggle"
+        )
+
+    def state_toggled(self, container_id, status):
+        if self.is_bound_to(container_id):
+            self.update_status(status)
+            self.set_action_pending(False)
 
     def update_status(self, status):
         status_color = "#28a745" if status == "running" else "#dc3545"
 
         self.status_label.setText(status.upper())
-        self.status_label.setStyleSheet(f"""
-            QLabel#statusLabel {{
-                background-color: {status_color};
-            }}
-        """)
+        if status_color != self.status_color:  # Restyling is costly on recycled cards
+            self.status_color = status_color
+            self.status_label.setStyleSheet(f"""
+                QLabel#statusLabel {{
+                    background-color: {status_color};
+                }}
+            """)
         self.action_btn.setText("Stop" if status == "running" else "Start")
-        self.action_btn.setEnabled(True)  # Re-enable the button after updating state
-        self.action_btn.setStyleSheet("background-color: #007bff;")  # Change color to indicate loading
 
-        self.action_btn.repaint()  # Explicitly repaint the button to ensure the text is updated
+    def show_logs(self):
+        self.main_window.open_log_viewer(self.container)
 
     def log_message(self, title, message, level):
         self.main_window.log_panel.add_log(title, message, level)
 
     def delete_container(self):
-        try:
-            client = docker.from_env()
-            container = client.containers.get(self.container.id)
-            container.remove(force=True)
-            self.main_window.log_panel.add_log(
-                "Container Deletion",
-                f"Deleted container: {container.name}",
-                "Success"
-            )
-            self.main_window.refresh_containers()
-        except Exception as e:
-            error_msg = f"Error deleting container: {str(e)}"
-            print(error_msg)
-            self.main_window.log_panel.add_log(
-                "Container Deletion",
-                error_msg,
-                "Error"
-            )
+        self.run_operation(
+            remove_container,
+            self.container.id,
+            on_finished=self.container_deleted,
+            title="Container Deletion"
+        )
+
+    def container_deleted(self, container_id, container_name):
+        self.log_message("Container Deletion", f"Deleted container: {container_name}", "Success")
+        self.main_window.remove_card(container_id)
 
     def snapshot_container(self):
-        try:
-            image_name, ok = QInputDialog.getText(self, 'Snapshot', 'Enter new image name:')
-            if ok and image_name:
-                client = docker.from_env()
-                container = client.containers.get(self.container.id)
-                snapshot = container.commit(repository=image_name)
-                self.main_window.snapshots[snapshot.id] = snapshot
-                self.main_window.log_panel.add_log(
-                    "Snapshot",
-                    f"Created snapshot for container: {container.name} as image: {image_name}",
-                    "Success"
-                )
-        except Exception as e:
-            error_msg = f"Error creating snapshot: {str(e)}"
-            print(error_msg)
-            self.main_window.log_panel.add_log(
-                "Snapshot",
-                error_msg,
-                "Error"
+        image_name, ok = QInputDialog.getText(self, 'Snapshot', 'Enter new image name:')
+        if ok and image_name:
+            self.run_operation(
+                commit_container,
+                self.container.id,
+                image_name,
+                on_finished=self.snapshot_created,
+                title="Snapshot"
             )
 
+    def snapshot_created(self, container_id, result):
+        container_name, image_name, snapshot = result
+        self.log_message(
+            "Snapshot",
+            f"Created snapshot for container: {container_name} as image: {image_name}",
+            "Success"
+        )
+
+    def selection_toggled(self, checked):
+        self.main_window.set_selected(self.container.id, checked)
+
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
-            self.handle_click()
+            if self.edit_mode:
+                # In edit mode a click selects the card instead of opening a terminal
+                self.select_check.toggle()
+            else:
+                self.handle_click()
 
     def handle_click(self):
-        try:
-            client = docker.from_env()
-            container = client.containers.get(self.container.id)
-            
-            if container.status != "running":
-                # Start the container
-                print(f"Starting container {container.name} ({container.id})")
-                container.start()
-                
-                # Wait for container to be running
-                def check_status():
-                    container.reload()
-                    return container.status == "running"
-                
-                # Wait up to 5 seconds for container to start
-                start_time = time.time()
-                while time.time() - start_time < 5:
-                    if check_status():
-                        break
-                    time.sleep(0.5)
-                
-                if container.status == "running":
-                    self.main_window.log_panel.add_log(
-                        "Container Start",
-                        f"Started container: {container.name}",
-                        "Success"
-                    )
-                else:
-                    raise Exception("Container failed to start")
-            
-            # Open terminal
-            self.open_terminal()
-            
-        except Exception as e:
-            print(f"Error handling container click: {str(e)}")
-            self.main_window.log_panel.add_log(
-                "Container Action",
-                f"Error: {str(e)}",
-                "Error"
-            )
+        # Start the container if needed, then open a terminal; both the
+        # start and the shell detection happen off the GUI thread
+        self.run_operation(
+            start_for_terminal,
+            self.container.id,
+            on_finished=self.launch_terminal,
+            title="Container Action"
+        )
 
     def open_terminal(self):
-        try:
-            client = docker.from_env()
-            container = client.containers.get(self.container.id)
-            
-            if container.status == "running":
-                # Detect available shell
-                shell = self.detect_shell(container)
-                print(f"Using shell: {shell}")
-                
-                if sys.platform == "win32":
-                    cmd = f'start cmd.exe /k docker exec -it {container.id} {shell}'
-                else:
-                    cmd = f'x-terminal-emulator -e docker exec -it {container.id} {shell}'
-                
-                subprocess.Popen(cmd, shell=True)
-                
-                self.main_window.log_panel.add_log(
-                    "Terminal",
-                    f"Opened terminal for container: {container.name}",
-                    "Success"
-                )
-            else:
-                raise Exception("Container must be running to open terminal")
-                
-        except Exception as e:
-            print(f"Error opening terminal: {str(e)}")
-            self.main_window.log_panel.add_log(
-                "Terminal",
-                f"Failed to open terminal: {str(e)}",
-                "Error"
-            )
+        self.run_operation(
+            prepare_terminal,
+            self.container.id,
+            on_finished=self.launch_terminal,
+            title="Terminal"
+        )
 
-    def detect_shell(self, container):
+    def launch_terminal(self, container_id, result):
+        container_id, container_name, shell, started = result
+        if started:
+            self.log_message("Container Start", f"Started container: {container_name}", "Success")
+            if self.is_bound_to(container_id):
+                self.update_status("running")
         try:
-            # Try to execute 'which' command for different shells
-            for shell in ['/bin/bash', '/bin/sh', '/bin/ash']:
-                result = container.exec_run(f'test -f {shell}')
-                if result.exit_code == 0:
-                    print(f"Found shell: {shell}")
-                    return shell
-            
-            # If no shell found, default to /bin/sh
-            print("No specific shell found, defaulting to /bin/sh")
-            return '/bin/sh'
-            
-        except Exception as e:
-            print(f"Error detecting shell: {str(e)}, defaulting to /bin/sh")
-            return '/bin/sh'
-
-class ContainerStateWorker(QObject):
-    finished = pyqtSignal()
-    status_updated = pyqtSignal(str)
-    log_message = pyqtSignal(str, str, str)
+            print(f"Using shell: {shell}")
+            if sys.platform == "win32":
+                cmd = f'start cmd.exe /k docker exec -it {container_id} {shell}'
+            else:
+                cmd = f'x-terminal-emulator -e docker exec -it {container_id} {shell}'
 
-    def __init__(self, container_id):
-        super().__init__()
-        self.container_id = container_id
+            subprocess.Popen(cmd, shell=True)
 
-    def run(self):
-        try:
-            client = docker.from_env()
-            container = client.containers.get(self.container_id)
-            
-            if container.status == "running":
-                self.log_message.emit("Stopping Container", f"Stopping container: {container.name} is in progress.", "Info")
-                container.stop()
-                self.log_message.emit("Container Stopped", f"Stopped container: {container.name}", "Success")
-                self.status_updated.emit("exited")
-            else:
-                self.log_message.emit("Starting Container", f"Starting container: {container.name} is in progress.", "Info")
-                container.start()
-                self.log_message.emit("Container Started", f"Started container: {container.name}", "Success")
-                self.status_updated.emit("running")
+            self.log_message("Terminal", f"Opened terminal for container: {container_name}", "Success")
         except Exception as e:
-            error_msg = f"Error toggling container state: {str(e)}"
-            print(error_msg)
-            self.log_message.emit("Container State Toggle", error_msg, "Error")
-        finally:
-            self.finished.emit()
+            print(f"Error opening terminal: {str(e)}")
+            self.log_message("Terminal", f"Failed to open terminal: {str(e)}", "Error")
@@ -0,0 +1,146 @@
+from PyQt5.QtWidgets import QAbstractScrollArea
+from PyQt5.QtCore import Qt, QSize, QRect
+from PyQt5.QtGui import QPainter, QColor
+
+from frontend.container_card import ContainerCard
+
+class ContainerGrid(QAbstractScrollArea):
+    # Virtualized replacement for a QFlowLayout full of cards. It keeps the
+    # containers as plain data and only binds ContainerCard widgets to the
+    # ones inside the viewport; cards that scroll out are hidden and reused
+    # for the next container that scrolls in. Cards have a fixed size, so the
+    # position of any index is a constant-time computation from the cached
+    # column count and resizing or scrolling costs O(visible cards).
+    def __init__(self, main_window, card_size=QSize(250, 300), spacing=20, parent=None):
+        super().__init__(parent)
+        self.main_window = main_window
+        self.card_size = card_size
+        self.spacing = spacing
+        self.containers = {}  # container id -> container
+        self.order = []  # container ids in display order
+        self._bound = {}  # container id -> visible ContainerCard
+        self._free_cards = []
+        self._columns = 1
+        self.loading = False
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+        self.verticalScrollBar().setSingleStep(self.card_size.height() // 4)
+
+    def set_loading(self, loading):
+        # Skeleton cards are painted (not created) until the first listing
+        self.loading = loading
+        self.viewport().update()
+
+    def paintEvent(self, event):
+        if not self.loading:
+            return
+        painter = QPainter(self.viewport())
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(Qt.NoPen)
+        step_x = self.card_size.width() + self.spacing
+        step_y = self.card_size.height() + self.spacing
+        rows = max(1, -(-self.viewport().height() // step_y))
+        for row in range(rows):
+            for column in range(self._columns):
+                x = self.spacing + column * step_x
+                y = self.spacing + row * step_y
+                painter.setBrush(QColor("#e9ecef"))
+                painter.drawRoundedRect(QRect(x, y, self.card_size.width(), self.card_size.height()), 15, 15)
+                painter.setBrush(QColor("#dee2e6"))
+                painter.drawRoundedRect(QRect(x + 20, y + 24, self.card_size.width() - 80, 18), 6, 6)
+                painter.drawRoundedRect(QRect(x + 20, y + 56, self.card_size.width() - 120, 12), 6, 6)
+                painter.drawRoundedRect(QRect(x + 20, y + self.card_size.height() - 60, self.card_size.width() - 40, 32), 8, 8)
+
+    def set_containers(self, containers):
+        self.containers = {container.id: container for container in containers}
+        self.order = [container.id for container in containers]
+        for container_id in list(self._bound):
+            if container_id in self.containers:
+                self._bound[container_id].update_container(self.containers[container_id])
+        self.update_geometry()
+
+    def add_or_update(self, container):
+        if container.id in self.containers:
+            self.containers[container.id] = container
+            card = self._bound.get(container.id)
+            if card is not None:
+                card.update_container(container)
+            return
+        self.containers[container.id] = container
+        self.order.append(container.id)
+        self.update_geometry()
+
+    def remove(self, container_id):
+        if self.containers.pop(container_id, None) is None:
+            return
+        self.order.remove(container_id)
+        self._release(container_id)
+        self.update_geometry()
+
+    def visible_cards(self):
+        return list(self._bound.values())
+
+    def rebind_visible(self):
+        # Re-apply selection and edit mode after they changed outside a card
+        for container_id, card in self._bound.items():
+            card.bind(self.containers[container_id])
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.update_geometry()
+
+    def scrollContentsBy(self, dx, dy):
+        self.update_viewport()
+
+    def update_geometry(self):
+        step_x = self.card_size.width() + self.spacing
+        step_y = self.card_size.height() + self.spacing
+        self._columns = max(1, (self.viewport().width() - self.spacing) // step_x)
+        rows = -(-len(self.order) // self._columns)
+        content_height = self.spacing + rows * step_y
+
+        scrollbar = self.verticalScrollBar()
+        scrollbar.setPageStep(self.viewport().height())
+        scrollbar.setRange(0, max(0, content_height - self.viewport().height()))
+        self.update_viewport()
+
+    def update_viewport(self):
+        step_x = self.card_size.width() + self.spacing
+        step_y = self.card_size.height() + self.spacing
+        top = self.verticalScrollBar().value()
+
+        first_row = max(0, (top - self.spacing) // step_y)
+        last_row = (top + self.viewport().height()) // step_y
+        first = first_row * self._columns
+        last = min(len(self.order), (last_row + 1) * self._columns)
+        visible = self.order[first:last]
+
+        visible_set = set(visible)
+        for container_id in list(self._bound):
+            if container_id not in visible_set:
+                self._release(container_id)
+
+        for index, container_id in enumerate(visible, start=first):
+            card = self._bound.get(container_id)
+            if card is None:
+                card = self._acquire(self.containers[container_id])
+                self._bound[container_id] = card
+            row, column = divmod(index, self._columns)
+            card.move(self.spacing + column * step_x, self.spacing + row * step_y - top)
+            card.show()
+
+    def _acquire(self, container):
+        if self._free_cards:
+            card = self._free_cards.pop()
+            card.bind(container)
+            return card
+        card = ContainerCard(container, self.main_window)
+        card.setParent(self.viewport())
+        card.bind(container)  # Edit mode, selection, pending operations, stats
+        return card
+
+    def _release(self, container_id):
+        card = self._bound.pop(container_id, None)
+        if card is not None:
+            card.hide()
+            self._free_cards.append(card)
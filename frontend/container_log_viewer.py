@@ -0,0 +1,76 @@
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPlainTextEdit, QCheckBox, QPushButton
+from PyQt5.QtCore import QTimer, Qt
+from PyQt5.QtGui import QFont
+
+from backend.log_stream import LogStream, DEFAULT_CAPACITY
+
+REFRESH_FPS = 30
+
+class ContainerLogViewer(QDialog):
+    # Live `docker logs -f` view. The stream thread fills a ring buffer and a
+    # timer drains it at most REFRESH_FPS times per second into a plain-text
+    # widget capped at the same number of lines.
+    def __init__(self, container, docker_service, capacity=DEFAULT_CAPACITY, parent=None):
+        super().__init__(parent)
+        self.container = container
+        self.setWindowTitle(f"Logs - {container.name}")
+        self.setAttribute(Qt.WA_DeleteOnClose)
+        self.resize(900, 600)
+        self.stream = LogStream(docker_service, container.id, capacity=capacity)
+        self.setup_ui(capacity)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(1000 // REFRESH_FPS)
+        self.timer.timeout.connect(self.flush)
+        self.stream.start()
+        self.timer.start()
+
+    def setup_ui(self, capacity):
+        layout = QVBoxLayout(self)
+
+        self.log_view = QPlainTextEdit()
+        self.log_view.setReadOnly(True)
+        self.log_view.setUndoRedoEnabled(False)
+        self.log_view.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.log_view.setMaximumBlockCount(capacity)
+        self.log_view.setFont(QFont("Monospace"))
+        layout.addWidget(self.log_view)
+
+        footer = QHBoxLayout()
+        self.status_label = QLabel()
+        footer.addWidget(self.status_label)
+        footer.addStretch()
+        self.follow_check = QCheckBox("Follow")
+        self.follow_check.setChecked(True)
+        footer.addWidget(self.follow_check)
+        self.pause_check = QCheckBox("Pause")
+        footer.addWidget(self.pause_check)
+        clear_btn = QPushButton("Clear")
+        clear_btn.clicked.connect(self.log_view.clear)
+        footer.addWidget(clear_btn)
+        layout.addLayout(footer)
+
+    def flush(self):
+        if self.pause_check.isChecked():
+            return
+        lines = self.stream.drain()
+        if lines:
+            # One append per frame; the block limit trims the oldest lines
+            self.log_view.appendPlainText("\n".join(lines[-self.log_view.maximumBlockCount():]))
+            if self.follow_check.isChecked():
+                scrollbar = self.log_view.verticalScrollBar()
+                scrollbar.setValue(scrollbar.maximum())
+
+        status = f"{self.stream.total_lines} lines received"
+        if self.stream.dropped_lines:
+            status += f", {self.stream.dropped_lines} dropped"
+        if self.stream.error:
+            status += f" - stream error: {self.stream.error}"
+        elif not self.stream.is_running():
+            status += " - stream ended"
+        self.status_label.setText(status)
+
+    def closeEvent(self, event):
+        self.timer.stop()
+        self.stream.stop()
+        super().closeEvent(event)
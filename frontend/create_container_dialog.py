@@ -1,29 +1,35 @@
 from PyQt5.QtWidgets import QDialog, QVBoxLayout, QGroupBox, QLineEdit, QComboBox, QCheckBox, QPushButton, QLabel, QHBoxLayout, QWidget, QFileDialog, QTextEdit, QMessageBox
 import docker
 
+from backend.docker_service import DockerService
+from backend.container_actions import remove_container as remove_container_action, stop_container as stop_container_action
+from backend.presets import IMAGE_VERSIONS, preset_image_name
+
+# Auto-removal choices: label -> seconds (None never expires)
+TTL_CHOICES = {
+    "Never": None,
+    "1 hour": 3600,
+    "8 hours": 8 * 3600,
+    "1 day": 86400,
+    "7 days": 7 * 86400
+}
+IDLE_CHOICES = {
+    "Never": None,
+    "30 minutes": 1800,
+    "1 hour": 3600,
+    "1 day": 86400
+}
+
 class CreateContainerDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent = parent
         self.setWindowTitle("Create New Container")
         self.setModal(True)
-        self.client = docker.from_env()
+        self.client = DockerService.instance().client
         
         # Define image versions
-        self.image_versions = {
-            "Ubuntu": ["22.04", "20.04", "18.04", "latest"],
-            "Debian": ["12", "11", "10", "latest"],
-            "Alpine": ["3.19", "3.18", "3.17", "latest"],
-            "CentOS": ["7", "latest"],
-            "Fedora": ["39", "38", "latest"],
-            "Python": ["3.12", "3.11", "3.10", "latest"],
-            "Node.js": ["20", "18", "16", "latest"],
-            "Nginx": ["1.24", "1.22", "latest"],
-            "Redis": ["7.2", "7.0", "latest"],
-            "PostgreSQL": ["16", "15", "14", "latest"],
-            "MySQL": ["8.2", "8.0", "latest"],
-            "MongoDB": ["7.0", "6.0", "latest"]
-        }
+        self.image_versions = IMAGE_VERSIONS
         
         self.setup_ui()
 
@@ -70,6 +76,10 @@ class CreateContainerDialog(QDialog):
         preview_layout.addWidget(self.preview_label)
         image_layout.addWidget(preview_widget)
         
+        # Images already present locally are reused unless this is checked
+        self.refresh_check = QCheckBox("Pull latest from registry")
+        image_layout.addWidget(self.refresh_check)
+
         image_group.setLayout(image_layout)
         main_layout.addWidget(image_group)
         
@@ -128,6 +138,29 @@ class CreateContainerDialog(QDialog):
         dockerfile_group.setLayout(dockerfile_layout)
         main_layout.addWidget(dockerfile_group)
         
+        # Auto-removal (stored as container labels, enforced by the reaper)
+        expiry_group = QGroupBox("Auto-Remove")
+        expiry_layout = QVBoxLayout()
+        ttl_widget = QWidget()
+        ttl_layout = QHBoxLayout(ttl_widget)
+        ttl_layout.addWidget(QLabel("Remove after:"))
+        self.ttl_combo = QComboBox()
+        for label, seconds in TTL_CHOICES.items():
+            self.ttl_combo.addItem(label, userData=seconds)
+        ttl_layout.addWidget(self.ttl_combo)
+        expiry_layout.addWidget(ttl_widget)
+
+        idle_widget = QWidget()
+        idle_layout = QHBoxLayout(idle_widget)
+        idle_layout.addWidget(QLabel("Remove when stopped for:"))
+        self.idle_combo = QComboBox()
+        for label, seconds in IDLE_CHOICES.items():
+            self.idle_combo.addItem(label, userData=seconds)
+        idle_layout.addWidget(self.idle_combo)
+        expiry_layout.addWidget(idle_widget)
+        expiry_group.setLayout(expiry_layout)
+        main_layout.addWidget(expiry_group)
+
         # Buttons
         button_widget = QWidget()
         button_layout = QHBoxLayout(button_widget)
@@ -154,13 +187,9 @@ class CreateContainerDialog(QDialog):
 
     def update_preview(self):
         if not self.custom_check.isChecked():
-            image_type = self.image_type.currentText().lower()
+            image_type = preset_image_name(self.image_type.currentText())
             version = self.version_combo.currentText()
             
-            # Special case for Node.js
-            if image_type == "node.js":
-                image_type = "node"
-            
             self.preview_label.setText(f"{image_type}:{version}")
         else:
             self.preview_label.setText(self.custom_input.text())
@@ -176,15 +205,12 @@ class CreateContainerDialog(QDialog):
 
     def refresh_snapshots(self):
         self.snapshot_combo.clear()
-        for container_id, snapshot in self.parent.snapshots.items():
-            try:
-                container = self.parent.client.containers.get(container_id)
-                self.snapshot_combo.addItem(
-                    f"{container.name} ({snapshot.short_id})",
-                    userData=snapshot.id
-                )
-            except:
-                continue
+        # Straight from the on-disk catalog; no Docker calls
+        for snapshot in self.parent.snapshot_catalog.list():
+            self.snapshot_combo.addItem(
+                f"{snapshot.image_name} ({snapshot.short_id}) from {snapshot.container_name}",
+                userData=snapshot.image_id
+            )
 
     def toggle_snapshot(self, state):
         self.snapshot_combo.setEnabled(state)
@@ -225,14 +251,16 @@ class CreateContainerDialog(QDialog):
         elif self.custom_check.isChecked() and self.custom_input.text():
             image = self.custom_input.text()
         else:
-            image_type = self.image_type.currentText().lower()
-            if image_type == "node.js":
-                image_type = "node"
+            image_type = preset_image_name(self.image_type.currentText())
             version = self.version_combo.currentText()
             image = f"{image_type}:{version}"
         
         return name, image, None, False
 
+    def get_expiry(self):
+        # (ttl, idle timeout) in seconds, None where the box never expires
+        return self.ttl_combo.currentData(), self.idle_combo.currentData()
+
     def refresh_container_cards(self):
         # Clear existing cards
         for i in reversed(range(self.container_cards.count())):
@@ -272,9 +300,35 @@ class CreateContainerDialog(QDialog):
         # Logic to edit container
         pass
 
-    def delete_container(self, container_name=None):
+    def parse_container_names(self, container_name):
         if container_name is None:
             container_name = self.name_input.text()
+        return [name.strip() for name in container_name.replace(",", " ").split() if name.strip()]
+
+    def run_bulk(self, title, func, names):
+        # Several names: resolve them from the container cache (at most one
+        # raw /containers/json call) on the operation queue, then fan out
+        # through the main window's bulk engine instead of acting one by one
+        operation = self.parent.operations.create(lambda operation: self.parent.container_cache.list_containers())
+        operation.signals.finished.connect(lambda containers: self.bulk_names_resolved(title, func, names, containers))
+        operation.signals.error.connect(lambda error: QMessageBox.critical(self, "Error", f"Failed to list containers: {error}"))
+        self.parent.operations.start(operation)
+
+    def bulk_names_resolved(self, title, func, names, containers):
+        wanted = set(names)
+        containers = [c for c in containers if c.name in wanted]
+        missing = wanted - {c.name for c in containers}
+        if missing:
+            QMessageBox.warning(self, "Error", f"Containers not found: {', '.join(sorted(missing))}")
+        if containers:
+            self.parent.run_bulk_operation(title, func, containers=containers)
+
+    def delete_container(self, container_name=None):
+        names = self.parse_container_names(container_name)
+        if len(names) > 1:
+            self.run_bulk("Bulk Remove", remove_container_action, names)
+            return
+        container_name = names[0] if names else None
         if container_name:
             try:
                 container = self.client.containers.get(container_name)
@@ -289,8 +343,11 @@ class CreateContainerDialog(QDialog):
             QMessageBox.warning(self, "Error", "Please enter the container name to delete.")
 
     def stop_container(self, container_name=None):
-        if container_name is None:
-            container_name = self.name_input.text()
+        names = self.parse_container_names(container_name)
+        if len(names) > 1:
+            self.run_bulk("Bulk Stop", stop_container_action, names)
+            return
+        container_name = names[0] if names else None
         if container_name:
             try:
                 container = self.client.containers.get(container_name)
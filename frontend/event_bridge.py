@@ -0,0 +1,18 @@
+from PyQt5.QtCore import QObject, pyqtSignal
+
+class ContainerEventBridge(QObject):
+    # Re-emits ContainerEventStream callbacks as Qt signals so that the
+    # slots run on the GUI thread
+    synced = pyqtSignal(list)
+    updated = pyqtSignal(object)
+    removed = pyqtSignal(str)
+    event = pyqtSignal(dict)
+
+    def __init__(self, event_stream, parent=None):
+        super().__init__(parent)
+        event_stream.subscribe(
+            on_sync=self.synced.emit,
+            on_update=self.updated.emit,
+            on_remove=self.removed.emit,
+            on_event=self.event.emit
+        )
@@ -1,50 +1,164 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QScrollArea, QTextEdit
-from PyQt5.QtCore import Qt, QDateTime
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QPlainTextEdit, QComboBox, QFileDialog
+from PyQt5.QtCore import QTimer
+from PyQt5.QtGui import QColor, QFont, QTextCharFormat, QTextCursor
+from collections import deque
+import json
+import time
+
+MAX_ENTRIES = 5000
+RENDER_INTERVAL_MS = 16  # At most one render per frame
+
+STATUS_COLORS = {
+    "Success": "#28a745",
+    "Error": "#dc3545",
+    "Warning": "#ffc107",
+    "Info": "#17a2b8",
+    "In Progress": "#007bff"
+}
+
+class LogEntry:
+    __slots__ = ("timestamp", "title", "message", "status")
+
+    def __init__(self, timestamp, title, message, status):
+        self.timestamp = timestamp
+        self.title = title
+        self.message = message
+        self.status = status
+
+    def time_text(self):
+        return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.timestamp))
+
+    def to_dict(self):
+        return {
+            "timestamp": self.timestamp,
+            "time": self.time_text(),
+            "title": self.title,
+            "message": self.message,
+            "status": self.status
+        }
 
 class LogPanel(QWidget):
-    def __init__(self):
+    def __init__(self, max_entries=MAX_ENTRIES):
         super().__init__()
-        self.setup_ui()
+        # Bounded entry store; the oldest entries are evicted first
+        self.entries = deque(maxlen=max_entries)
+        self.status_filter = None
+        self._unrendered = deque(maxlen=max_entries)  # Entries added since the last render
+        self._formats = {}
+        self._render_timer = QTimer(self)
+        self._render_timer.setSingleShot(True)
+        self._render_timer.setInterval(RENDER_INTERVAL_MS)
+        self._render_timer.timeout.connect(self.render_pending)
+        self.setup_ui(max_entries)
 
-    def setup_ui(self):
+    def setup_ui(self, max_entries):
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
 
         # Header
-        header = QLabel("Activity Log")
-        header.setStyleSheet("""
-            font-weight: bold;
-            padding: 5px;
+        header_widget = QWidget()
+        header_widget.setStyleSheet("""
             background-color: #f0f0f0;
             border-bottom: 1px solid #ddd;
         """)
-        layout.addWidget(header)
+        header_layout = QHBoxLayout(header_widget)
+        header_layout.setContentsMargins(5, 5, 5, 5)
+        header = QLabel("Activity Log")
+        header.setStyleSheet("font-weight: bold;")
+        header_layout.addWidget(header)
+        header_layout.addStretch()
+
+        self.filter_combo = QComboBox()
+        self.filter_combo.addItem("All")
+        self.filter_combo.addItems(STATUS_COLORS.keys())
+        self.filter_combo.currentTextChanged.connect(self.set_status_filter)
+        header_layout.addWidget(self.filter_combo)
 
-        # Log area
-        self.log_area = QTextEdit()
+        export_btn = QPushButton("Export")
+        export_btn.clicked.connect(self.export_dialog)
+        header_layout.addWidget(export_btn)
+        layout.addWidget(header_widget)
+
+        # Log area: plain text blocks capped at the store size
+        self.log_area = QPlainTextEdit()
         self.log_area.setReadOnly(True)
+        self.log_area.setUndoRedoEnabled(False)
+        self.log_area.setMaximumBlockCount(max_entries)
         self.log_area.setMaximumHeight(150)
         layout.addWidget(self.log_area)
 
     def add_log(self, title, message, status="Info"):
-        timestamp = QDateTime.currentDateTime().toString("yyyy-MM-dd hh:mm:ss")
-        
-        # Set color based on status
-        color = {
-            "Success": "#28a745",
-            "Error": "#dc3545",
-            "Warning": "#ffc107",
-            "Info": "#17a2b8",
-            "In Progress": "#007bff"
-        }.get(status, "#212529")
-
-        # Format the log entry
-        log_entry = f'<p style="margin: 2px 0;"><span style="color: #666;">[{timestamp}]</span> ' \
-                   f'<span style="color: {color};"><b>{title}</b></span>: {message}</p>'
-        
-        # Add to log area
-        self.log_area.append(log_entry)
-        
-        # Scroll to bottom
+        entry = LogEntry(time.time(), title, message, status)
+        self.entries.append(entry)
+        if self.status_filter is None or status == self.status_filter:
+            self._unrendered.append(entry)
+            # Coalesce: many add_log calls in one frame cause one render
+            if not self._render_timer.isActive():
+                self._render_timer.start()
+
+    def _format(self, color, bold=False):
+        key = (color, bold)
+        if key not in self._formats:
+            fmt = QTextCharFormat()
+            fmt.setForeground(QColor(color))
+            if bold:
+                fmt.setFontWeight(QFont.Bold)
+            self._formats[key] = fmt
+        return self._formats[key]
+
+    def render_pending(self):
+        entries = list(self._unrendered)
+        self._unrendered.clear()
+        if not entries:
+            return
+
         scrollbar = self.log_area.verticalScrollBar()
-        scrollbar.setValue(scrollbar.maximum())
+        at_bottom = scrollbar.value() >= scrollbar.maximum() - 4
+
+        cursor = QTextCursor(self.log_area.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.beginEditBlock()
+        first = self.log_area.document().isEmpty()
+        for entry in entries:
+            if not first:
+                cursor.insertBlock()
+            first = False
+            cursor.insertText(f"[{entry.time_text()}] ", self._format("#666"))
+            cursor.insertText(entry.title, self._format(STATUS_COLORS.get(entry.status, "#212529"), True))
+            cursor.insertText(f": {entry.message}", self._format("#212529"))
+        cursor.endEditBlock()
+
+        # Only follow the tail if the user has not scrolled up
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
+
+    def set_status_filter(self, status):
+        self.status_filter = None if status == "All" else status
+        self.log_area.clear()
+        self._unrendered.clear()
+        self._unrendered.extend(
+            entry for entry in self.entries
+            if self.status_filter is None or entry.status == self.status_filter
+        )
+        self.render_pending()
+
+    def export_jsonl(self, file, status=None):
+        # Streams entries one JSON object per line without rendering anything
+        count = 0
+        for entry in list(self.entries):
+            if status is not None and entry.status != status:
+                continue
+            file.write(json.dumps(entry.to_dict()))
+            file.write("\n")
+            count += 1
+        return count
+
+    def export_dialog(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Activity Log", "activity_log.jsonl", "JSON Lines (*.jsonl);;All Files (*)")
+        if path:
+            try:
+                with open(path, 'w', encoding='utf-8') as file:
+                    count = self.export_jsonl(file, self.status_filter)
+                self.add_log("Export", f"Exported {count} log entries to {path}", "Success")
+            except Exception as e:
+                self.add_log("Export", f"Error exporting log: {str(e)}", "Error")
@@ -1,71 +1,94 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QFrame, QHBoxLayout, QLabel, QPushButton, QGraphicsDropShadowEffect
-from PyQt5.QtCore import Qt, pyqtSignal, QPropertyAnimation, QRect, QTimer, QEasingCurve, QObject
+import time
+from collections import OrderedDict
+
+from PyQt5.QtWidgets import QApplication, QWidget, QVBoxLayout, QFrame, QHBoxLayout, QLabel, QPushButton, QGraphicsDropShadowEffect
+from PyQt5.QtCore import Qt, pyqtSignal, QTimer, QObject
 from PyQt5.QtGui import QColor
 
+MAX_VISIBLE = 4  # Toasts on screen at once; also the number of widgets ever created
+MAX_QUEUED = 50  # Toasts waiting for a free slot; the oldest are dropped beyond this
+DISPLAY_MS = 5000
+ANIMATION_MS = 300
+FRAME_MS = 16
+WIDTH = 300
+HEIGHT = 100
+MARGIN = 20
+SPACING = 10
+
+COLORS = {
+    "info": "#0984e3",
+    "success": "#00b894",
+    "error": "#d63031",
+    "warning": "#fdcb6e"
+}
+
+ICONS = {
+    "info": "ℹ️",
+    "success": "✅",
+    "error": "❌",
+    "warning": "⚠️"
+}
+
+
+def _ease_out(t):
+    return 1 - (1 - t) ** 3
+
+
+def _ease_in(t):
+    return t ** 3
+
+
 class NotificationWidget(QWidget):
     closed = pyqtSignal()
-    
-    def __init__(self, title: str, message: str, type: str = "info", parent=None):
+
+    # Built once and refilled with set_content(), so the manager can keep a
+    # small pool of them instead of creating a window per notification
+    def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowFlags(Qt.FramelessWindowHint | Qt.Tool | Qt.WindowStaysOnTopHint)
         self.setAttribute(Qt.WA_TranslucentBackground)
-        self.setupUi(title, message, type)
-        
-    def setupUi(self, title, message, type):
+        self.setAttribute(Qt.WA_ShowWithoutActivating)
+        self.setFixedSize(WIDTH, HEIGHT)
+        self.setupUi()
+
+    def setupUi(self):
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
-        
+
         # Main container
         container = QFrame(self)
         container.setObjectName("notificationContainer")
         container_layout = QVBoxLayout(container)
-        
-        # Style based on type
-        colors = {
-            "info": "#0984e3",
-            "success": "#00b894",
-            "error": "#d63031",
-            "warning": "#fdcb6e"
-        }
-        
-        icons = {
-            "info": "ℹ️",
-            "success": "✅",
-            "error": "❌",
-            "warning": "⚠️"
-        }
-        
-        container.setStyleSheet(f"""
-            QFrame#notificationContainer {{
+        container.setStyleSheet("""
+            QFrame#notificationContainer {
                 background-color: white;
                 border-radius: 8px;
                 border: 1px solid #e1e1e1;
-            }}
+            }
         """)
-        
-        # Header
+
+        # Header: icon, title, repeat counter and close button
         header_layout = QHBoxLayout()
-        
-        # Icon and title
-        icon_label = QLabel(icons.get(type, icons['info']))
-        icon_label.setStyleSheet(f"""
-            font-size: 16px;
-            padding: 5px;
-            color: {colors.get(type, colors['info'])};
-        """)
-        
-        title_label = QLabel(title)
-        title_label.setStyleSheet("""
+        self.icon_label = QLabel()
+        self.title_label = QLabel()
+        self.title_label.setStyleSheet("""
             font-size: 14px;
             font-weight: bold;
             color: #2d3436;
         """)
-        
-        header_layout.addWidget(icon_label)
-        header_layout.addWidget(title_label)
+        self.count_label = QLabel()
+        self.count_label.setStyleSheet("""
+            background-color: #dfe6e9;
+            border-radius: 8px;
+            color: #2d3436;
+            font-size: 11px;
+            padding: 1px 6px;
+        """)
+        header_layout.addWidget(self.icon_label)
+        header_layout.addWidget(self.title_label)
+        header_layout.addWidget(self.count_label)
         header_layout.addStretch()
-        
-        # Close button
+
         close_btn = QPushButton("×")
         close_btn.setStyleSheet("""
             QPushButton {
@@ -78,29 +101,27 @@ class NotificationWidget(QWidget):
                 color: #2d3436;
             }
         """)
-        close_btn.clicked.connect(self.close)
+        close_btn.clicked.connect(self.closed)
         header_layout.addWidget(close_btn)
-        
         container_layout.addLayout(header_layout)
-        
+
         # Separator
         separator = QFrame()
         separator.setFrameShape(QFrame.HLine)
         separator.setStyleSheet("background-color: #e1e1e1;")
         container_layout.addWidget(separator)
-        
+
         # Message
-        message_label = QLabel(message)
-        message_label.setWordWrap(True)
-        message_label.setStyleSheet("""
+        self.message_label = QLabel()
+        self.message_label.setWordWrap(True)
+        self.message_label.setStyleSheet("""
             color: #636e72;
             font-size: 13px;
             padding: 5px;
         """)
-        container_layout.addWidget(message_label)
-        
+        container_layout.addWidget(self.message_label)
         layout.addWidget(container)
-        
+
         # Apply shadow
         shadow = QGraphicsDropShadowEffect()
         shadow.setBlurRadius(20)
@@ -109,66 +130,183 @@ class NotificationWidget(QWidget):
         shadow.setColor(QColor(0, 0, 0, 60))
         container.setGraphicsEffect(shadow)
 
-    def closeEvent(self, event):
-        self.closed.emit()
-        super().closeEvent(event)
+    def set_content(self, title, message, type="info", count=1):
+        self.icon_label.setText(ICONS.get(type, ICONS["info"]))
+        self.icon_label.setStyleSheet(f"""
+            font-size: 16px;
+            padding: 5px;
+            color: {COLORS.get(type, COLORS['info'])};
+        """)
+        self.title_label.setText(title)
+        self.message_label.setText(message)
+        self.count_label.setText(f"×{count}")
+        self.count_label.setVisible(count > 1)
+
+
+class Toast:
+    __slots__ = ("key", "title", "message", "type", "count", "widget", "shown_at", "expires_at", "leaving_at", "y")
+
+    def __init__(self, key, title, message, type):
+        self.key = key
+        self.title = title
+        self.message = message
+        self.type = type
+        self.count = 1
+        self.widget = None
+        self.shown_at = None
+        self.expires_at = None
+        self.leaving_at = None  # Set when the slide-out starts
+        self.y = None
+
 
+# Toasts in the top-left corner of the primary screen. Notifications with
+# the same type and title are coalesced: while one is queued or on screen,
+# another only bumps its counter, replaces its message and restarts its
+# countdown, so a bulk failure across 100 containers is a single "×100"
+# toast. At most max_visible are shown; the rest wait in a bounded queue.
+# Widgets are pooled (never more than max_visible exist) and one timer
+# drives every slide, reflow and expiry: it ticks once per frame while
+# something moves and otherwise sleeps until the next toast expires.
 class NotificationManager(QObject):
-    def __init__(self):
-        super().__init__()
-        self.notifications = []
-        self.margin = 20
-        
+    def __init__(self, max_visible=MAX_VISIBLE, duration_ms=DISPLAY_MS, parent=None):
+        super().__init__(parent)
+        self.max_visible = max_visible
+        self.duration = duration_ms / 1000
+        self.visible = []  # Toasts on screen, top to bottom
+        self.queued = OrderedDict()  # key -> Toast waiting for a slot
+        self.dropped = 0
+        self._toasts = {}  # key -> the Toast that absorbs repeats of it
+        self._idle = []  # Pooled widgets not on screen
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._tick)
+
     def show_notification(self, title: str, message: str, type: str = "info"):
-        notification = NotificationWidget(title, message, type)
-        notification.closed.connect(lambda: self.remove_notification(notification))
-        self.notifications.append(notification)
-        
-        # Set initial position (outside screen)
-        screen = QApplication.primaryScreen().availableGeometry()
-        notification_width = 300
-        notification_height = 100
-        
-        y = self.margin + (len(self.notifications) - 1) * (notification_height + 10)
-        notification.setGeometry(-notification_width, y, notification_width, notification_height)
-        notification.show()
-        
-        # Animate in
-        anim = QPropertyAnimation(notification, b"geometry")
-        anim.setDuration(300)
-        anim.setStartValue(notification.geometry())
-        anim.setEndValue(QRect(self.margin, y, notification_width, notification_height))
-        anim.setEasingCurve(QEasingCurve.OutCubic)
-        anim.start()
-        
-        # Auto close after 5 seconds
-        QTimer.singleShot(5000, lambda: self.close_notification(notification))
-    
-    def close_notification(self, notification):
-        if notification in self.notifications:
-            # Animate out
-            anim = QPropertyAnimation(notification, b"geometry")
-            anim.setDuration(300)
-            anim.setStartValue(notification.geometry())
-            anim.setEndValue(QRect(-notification.width(), notification.y(),
-                                 notification.width(), notification.height()))
-            anim.setEasingCurve(QEasingCurve.InCubic)
-            anim.finished.connect(notification.close)
-            anim.start()
-    
-    def remove_notification(self, notification):
-        if notification in self.notifications:
-            self.notifications.remove(notification)
-            self.update_positions()
-    
-    def update_positions(self):
-        for i, notification in enumerate(self.notifications):
-            y = self.margin + i * (notification.height() + 10)
-            
-            anim = QPropertyAnimation(notification, b"geometry")
-            anim.setDuration(300)
-            anim.setStartValue(notification.geometry())
-            anim.setEndValue(QRect(self.margin, y,
-                                 notification.width(), notification.height()))
-            anim.setEasingCurve(QEasingCurve.OutCubic)
-            anim.start()
+        key = (type, title)
+        toast = self._toasts.get(key)
+        if toast is not None:
+            toast.count += 1
+            toast.message = message
+            if toast.widget is not None:
+                toast.widget.set_content(title, message, type, toast.count)
+                toast.expires_at = time.monotonic() + self.duration
+            return toast
+
+        toast = Toast(key, title, message, type)
+        self._toasts[key] = toast
+        self.queued[key] = toast
+        while len(self.queued) > MAX_QUEUED:
+            _, oldest = self.queued.popitem(last=False)
+            del self._toasts[oldest.key]
+            self.dropped += 1
+        self._promote()
+        self._schedule(0)
+        return toast
+
+    def close_notification(self, toast):
+        if toast.widget is not None and toast.leaving_at is None:
+            toast.leaving_at = time.monotonic()
+            self._release_key(toast)  # Repeats from now on get a new toast
+            self._schedule(0)
+        elif self.queued.pop(toast.key, None) is toast:
+            self._release_key(toast)
+
+    def clear(self):
+        self._timer.stop()
+        for toast in self.visible:
+            toast.widget.hide()
+            self._idle.append(toast.widget)
+            toast.widget = None
+        self.visible.clear()
+        self.queued.clear()
+        self._toasts.clear()
+
+    def _release_key(self, toast):
+        if self._toasts.get(toast.key) is toast:
+            del self._toasts[toast.key]
+
+    def _widget(self):
+        if self._idle:
+            return self._idle.pop()
+        widget = NotificationWidget()
+        widget.closed.connect(lambda: self._widget_closed(widget))
+        return widget
+
+    def _widget_closed(self, widget):
+        for toast in self.visible:
+            if toast.widget is widget:
+                self.close_notification(toast)
+                break
+
+    def _promote(self):
+        now = time.monotonic()
+        while self.queued and len(self.visible) < self.max_visible:
+            _, toast = self.queued.popitem(last=False)
+            toast.widget = self._widget()
+            toast.widget.set_content(toast.title, toast.message, toast.type, toast.count)
+            toast.shown_at = now
+            toast.expires_at = now + self.duration
+            toast.y = self._slot_y(len(self.visible))
+            self.visible.append(toast)
+            toast.widget.move(-WIDTH, int(toast.y))
+            toast.widget.show()
+
+    def _origin(self):
+        screen = QApplication.primaryScreen()
+        if screen is None:
+            return 0, 0
+        area = screen.availableGeometry()
+        return area.left(), area.top()
+
+    def _slot_y(self, index):
+        return self._origin()[1] + MARGIN + index * (HEIGHT + SPACING)
+
+    def _schedule(self, delay_ms):
+        remaining = self._timer.remainingTime() if self._timer.isActive() else -1
+        if remaining < 0 or delay_ms < remaining:
+            self._timer.start(delay_ms)
+
+    def _tick(self):
+        now = time.monotonic()
+        animation = ANIMATION_MS / 1000
+
+        for toast in self.visible:
+            if toast.leaving_at is None and now >= toast.expires_at:
+                toast.leaving_at = now
+                self._release_key(toast)
+
+        finished = [t for t in self.visible if t.leaving_at is not None and now - t.leaving_at >= animation]
+        for toast in finished:
+            self.visible.remove(toast)
+            toast.widget.hide()
+            self._idle.append(toast.widget)
+            toast.widget = None
+        if finished:
+            self._promote()
+
+        left, _ = self._origin()
+        moving = False
+        for index, toast in enumerate(self.visible):
+            # Remaining toasts slide up into the freed slots
+            target_y = self._slot_y(index)
+            if abs(target_y - toast.y) < 1:
+                toast.y = target_y
+            else:
+                toast.y += (target_y - toast.y) * 0.3
+                moving = True
+
+            x = left + MARGIN
+            entering = (now - toast.shown_at) / animation
+            if entering < 1:
+                x -= (WIDTH + MARGIN) * (1 - _ease_out(entering))
+                moving = True
+            if toast.leaving_at is not None:
+                x -= (WIDTH + MARGIN) * _ease_in(min(1.0, (now - toast.leaving_at) / animation))
+                moving = True
+            toast.widget.move(int(x), int(toast.y))
+
+        if moving:
+            self._timer.start(FRAME_MS)
+        elif self.visible:
+            next_expiry = min(t.expires_at for t in self.visible)
+            self._timer.start(max(FRAME_MS, int((next_expiry - now) * 1000)))
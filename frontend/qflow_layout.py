@@ -56,17 +56,18 @@ class QFlowLayout(QLayout):
         spacing = self.spacing()
 
         for item in self._items:
-            nextX = x + item.sizeHint().width() + spacing
+            hint = item.sizeHint()  # Query once; it is not free for widgets
+            nextX = x + hint.width() + spacing
             if nextX - spacing > rect.right() and lineHeight > 0:
                 x = rect.x()
                 y = y + lineHeight + spacing
-                nextX = x + item.sizeHint().width() + spacing
+                nextX = x + hint.width() + spacing
                 lineHeight = 0
 
             if not testOnly:
-                item.setGeometry(QRect(QPoint(x, y), item.sizeHint()))
+                item.setGeometry(QRect(QPoint(x, y), hint))
 
             x = nextX
-            lineHeight = max(lineHeight, item.sizeHint().height())
+            lineHeight = max(lineHeight, hint.height())
 
         return y + lineHeight - rect.y()
@@ -0,0 +1,33 @@
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtGui import QPainter, QPen, QColor, QPolygonF
+from PyQt5.QtCore import QPointF, Qt
+
+class Sparkline(QWidget):
+    def __init__(self, color="#007bff", max_value=None, parent=None):
+        super().__init__(parent)
+        self.values = []
+        self.max_value = max_value
+        self.pen = QPen(QColor(color))
+        self.pen.setWidthF(1.5)
+        self.setFixedHeight(24)
+        self.setAttribute(Qt.WA_TranslucentBackground)
+
+    def set_values(self, values):
+        self.values = values
+        self.update()
+
+    def paintEvent(self, event):
+        if len(self.values) < 2:
+            return
+        peak = self.max_value or max(max(self.values), 1e-6)
+        width = self.width() - 2
+        height = self.height() - 2
+        step = width / (len(self.values) - 1)
+        points = QPolygonF([
+            QPointF(1 + i * step, 1 + height - min(value, peak) / peak * height)
+            for i, value in enumerate(self.values)
+        ])
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(self.pen)
+        painter.drawPolyline(points)